@@ -0,0 +1,64 @@
+"""运维管理接口（需要 `X-Admin-Token` 请求头；未配置 `admin_token` 时全部拒绝）"""
+
+import secrets
+from typing import Annotated, Any, Literal
+
+from fastapi import APIRouter, Body, Depends, Header, Query
+
+from app.core.config import settings
+from app.core.exception import (
+    BadRequestException,
+    ForbiddenException,
+    ServiceUnavailableException,
+)
+from app.core.reload import ReloadError, reload_settings
+from app.core.slow_query import slow_query_log
+
+
+async def require_admin(
+    x_admin_token: Annotated[str | None, Header()] = None,
+) -> None:
+    if not (
+        settings.admin_token
+        and x_admin_token
+        and secrets.compare_digest(x_admin_token, settings.admin_token)
+    ):
+        raise ForbiddenException("Admin token required")
+
+
+router = APIRouter(
+    prefix="/admin", tags=["admin"], dependencies=[Depends(require_admin)]
+)
+
+
+@router.get("/slow-queries")
+async def list_slow_queries(
+    limit: Annotated[int, Query(ge=1, le=200, description="返回条数")] = 20,
+    order_by: Annotated[
+        Literal["total", "p95", "count", "max"], Query(description="排序依据")
+    ] = "total",
+):
+    return {
+        "threshold_ms": slow_query_log.threshold * 1e3,
+        "queries": slow_query_log.top(limit, order_by),
+    }
+
+
+@router.delete("/slow-queries", status_code=204)
+async def reset_slow_queries():
+    slow_query_log.reset()
+    return None
+
+
+@router.post("/reload")
+async def reload_config(
+    overrides: Annotated[
+        dict[str, Any] | None, Body(description="要覆盖的配置, 省略时重新读取环境变量")
+    ] = None,
+):
+    try:
+        return await reload_settings(overrides)
+    except ValueError as e:  # 包括 pydantic 的 ValidationError
+        raise BadRequestException(str(e)) from None
+    except ReloadError as e:  # 新连接池建立或预热失败, 配置未改变, 可重试
+        raise ServiceUnavailableException(str(e)) from None
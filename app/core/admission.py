@@ -0,0 +1,204 @@
+"""准入控制：自适应并发上限 + 优先级排队 + 快速 503
+
+并发请求超过连接池容量（`pool_size + max_overflow`）时，多出的请求会在连接池里
+最多等待 `pool_timeout` 秒，延迟整体飙升、客户端重试又进一步放大压力。
+这里在请求进入路由前做准入：
+
+- 并发上限按 AIMD 调整：请求耗时低于目标且未等待连接池时缓慢加一（每轮约 +1），
+  耗时超标或本次请求取连接等待超过阈值时乘性下降（冷却期内只降一次）
+- 超过上限的请求进入有界优先级队列，最多等待 `queue_timeout` 秒；
+  队列满时高优先级请求可以挤掉排在最后的低优先级请求
+- 无法准入时立即返回 503 与按当前排队情况估算的 `Retry-After`
+- 路由优先级按路径前缀配置（`admission_priorities`），`exempt` 表示不受限
+  （健康检查、指标等必须始终可用的接口）
+"""
+
+import asyncio
+import heapq
+import itertools
+import math
+import time
+from typing import Callable, Literal
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.metrics import REGISTRY, pool_wait_var
+
+Priority = Literal["exempt", "high", "normal", "low"]
+PRIORITY_ORDER = {"high": 0, "normal": 1, "low": 2}
+
+ADMISSION_LIMIT = REGISTRY.gauge("admission_concurrency_limit", "当前的自适应并发上限")
+ADMISSION_IN_FLIGHT = REGISTRY.gauge("admission_in_flight", "已准入的请求数")
+ADMISSION_QUEUED = REGISTRY.gauge("admission_queued", "排队等待准入的请求数")
+ADMISSION_REJECTED = REGISTRY.counter(
+    "admission_rejected_total", "被拒绝的请求数", ("priority", "reason")
+)
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, reason: str) -> None:
+        super().__init__(reason)
+        self.reason = reason  # queue_full / evicted / timeout
+
+
+class AdaptiveLimiter:
+    def __init__(
+        self,
+        *,
+        initial_limit: int,
+        min_limit: int = 1,
+        max_limit: int | None = None,
+        max_queue: int = 100,
+        queue_timeout: float = 1.0,
+        latency_target: float = 0.5,
+        pool_wait_threshold: float = 0.05,
+        backoff: float = 0.9,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit or initial_limit * 4
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.latency_target = latency_target
+        self.pool_wait_threshold = pool_wait_threshold
+        self.backoff = backoff
+        self._clock = clock
+        self.in_flight = 0
+        self.waiting = 0
+        # (优先级, 序号, future)；已超时 / 被挤掉的条目在出队时跳过
+        self._queue: list[tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self._last_decrease = -math.inf
+        self._avg_latency = latency_target / 2
+        ADMISSION_LIMIT.set(self.limit)
+
+    @property
+    def limit(self) -> int:
+        return max(self.min_limit, int(self._limit))
+
+    def retry_after(self) -> int:
+        """按排队长度与平均耗时估算的重试等待秒数"""
+        backlog = (self.waiting + 1) / self.limit
+        return max(1, math.ceil(backlog * self._avg_latency))
+
+    async def acquire(self, priority: int) -> None:
+        if self.in_flight < self.limit and self.waiting == 0:
+            self._admit()
+            return
+
+        if self.waiting >= self.max_queue:
+            self._evict_lower_than(priority)
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, (priority, next(self._seq), future))
+        self.waiting += 1
+        ADMISSION_QUEUED.set(self.waiting)
+        try:
+            await asyncio.wait_for(future, self.queue_timeout)
+        except asyncio.TimeoutError:
+            # 名额转交与超时落在同一轮事件循环时 (3.12+ 的 wait_for 会这样),
+            # 名额已经属于本请求, 按已准入处理, 否则这个名额永远不会释放
+            if future.done() and not future.cancelled() and not future.exception():
+                return
+            raise AdmissionRejected("timeout") from None
+        except asyncio.CancelledError:
+            # 名额已转交但请求被取消（如客户端断开），把名额继续传下去
+            if future.done() and not future.cancelled() and not future.exception():
+                self.release_slot()
+            raise
+        finally:
+            self.waiting -= 1
+            ADMISSION_QUEUED.set(self.waiting)
+
+    def _admit(self) -> None:
+        self.in_flight += 1
+        ADMISSION_IN_FLIGHT.set(self.in_flight)
+
+    def _evict_lower_than(self, priority: int) -> None:
+        live = [entry for entry in self._queue if not entry[2].done()]
+        victim = max(live, default=None, key=lambda e: (e[0], e[1]))
+        if victim is None or victim[0] <= priority:
+            raise AdmissionRejected("queue_full")
+        victim[2].set_exception(AdmissionRejected("evicted"))
+
+    def release_slot(self) -> None:
+        """释放一个名额：优先转交给排队中优先级最高的请求"""
+        while self._queue:
+            _, _, future = heapq.heappop(self._queue)
+            if not future.done():
+                future.set_result(None)  # in_flight 不变，名额直接转交
+                return
+        self.in_flight -= 1
+        ADMISSION_IN_FLIGHT.set(self.in_flight)
+
+    def release(self, latency: float, pool_wait: float, ok: bool = True) -> None:
+        self._avg_latency += 0.1 * (latency - self._avg_latency)
+        overloaded = (
+            latency > self.latency_target or pool_wait > self.pool_wait_threshold
+        )
+        if overloaded:
+            now = self._clock()
+            # 冷却期内只下降一次，避免同一波慢请求把上限压到底
+            if now - self._last_decrease >= self.latency_target:
+                self._limit = max(self.min_limit, self._limit * self.backoff)
+                self._last_decrease = now
+        elif ok and self.in_flight >= self.limit:
+            # 只在上限成为瓶颈时增长，空闲时上限不会无限膨胀
+            self._limit = min(self.max_limit, self._limit + 1 / self._limit)
+        ADMISSION_LIMIT.set(self.limit)
+        self.release_slot()
+
+
+class AdmissionControlMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        limiter: AdaptiveLimiter,
+        priorities: dict[str, Priority] | None = None,
+    ) -> None:
+        self.app = app
+        self.limiter = limiter
+        # 最长前缀优先匹配
+        self.priorities = sorted(
+            (priorities or {}).items(), key=lambda item: len(item[0]), reverse=True
+        )
+
+    def priority_for(self, path: str) -> Priority:
+        for prefix, priority in self.priorities:
+            if path.startswith(prefix):
+                return priority
+        return "normal"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        priority = self.priority_for(scope["path"])
+        if priority == "exempt":
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            await self.limiter.acquire(PRIORITY_ORDER[priority])
+        except AdmissionRejected as e:
+            ADMISSION_REJECTED.inc(labels=(priority, e.reason))
+            response = JSONResponse(
+                {"detail": "Service overloaded, please retry later"},
+                status_code=503,
+                headers={"Retry-After": str(self.limiter.retry_after())},
+            )
+            await response(scope, receive, send)
+            return
+
+        waited = [0.0]
+        token = pool_wait_var.set(waited)
+        ok = False
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+            ok = True
+        finally:
+            pool_wait_var.reset(token)
+            self.limiter.release(time.perf_counter() - start, waited[0], ok)
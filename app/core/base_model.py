@@ -19,6 +19,10 @@ class Base(DeclarativeBase):
     metadata = MetaData(naming_convention=database_naming_convention)
 
 
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
 class DateTimeMixin:
     if settings.db_type == "postgres":
         # PostgreSQL 原生支持 now() 和 onupdate
@@ -38,14 +42,14 @@ class DateTimeMixin:
         # SQLite: 使用 Python 层默认值模拟
         created_at: Mapped[datetime] = mapped_column(
             DateTime(timezone=True),
-            # 插入时用应用层时间,生产环境推荐使用 Unix 时间戳
-            default=datetime.now(timezone.utc),
+            # 插入时用应用层时间 (传入函数, 每次插入时取值),生产环境推荐使用 Unix 时间戳
+            default=utcnow,
             nullable=False,
             index=True,
         )
         updated_at: Mapped[datetime] = mapped_column(
             DateTime(timezone=True),
-            default=datetime.now(timezone.utc),
-            onupdate=datetime.now(timezone.utc),
+            default=utcnow,
+            onupdate=utcnow,
             nullable=False,
         )
@@ -0,0 +1,133 @@
+"""进程内 TTL 缓存 - LRU 淘汰 + 失效钩子
+
+用于缓存读多写少的小对象（如当前用户 principal）。本缓存只在单进程内有效，
+跨进程/跨节点的一致性通过失效钩子（invalidation hook）交给外部传播。
+"""
+
+import time
+from collections import OrderedDict
+from typing import Callable, Generic, Hashable, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+# 最多记住多少个最近失效的 key（用于 `set(..., version=...)` 的并发检查）
+INVALIDATION_LOG_SIZE = 1024
+
+# 失效钩子：(缓存名, key) -> None；key 为 None 表示整体清空
+InvalidationHook = Callable[[str, Hashable | None], None]
+
+
+class TTLCache(Generic[K, V]):
+    """带过期时间与容量上限的 LRU 缓存
+
+    - `get` 命中过期条目时视为未命中并删除
+    - 超出 `maxsize` 时淘汰最久未使用的条目
+    - `invalidate` / `clear` 默认会调用已注册的失效钩子，
+      收到其它 worker 的失效消息时应传 `propagate=False`，避免回环
+    - 回源加载前先取 `version()`，加载完成后 `set(key, value, version=...)`：
+      加载期间该 key 被失效过时放弃写入，避免把旧数据缓存整个 TTL
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        maxsize: int = 1024,
+        ttl: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._data: OrderedDict[K, tuple[float, V]] = OrderedDict()
+        self._hooks: list[InvalidationHook] = []
+        self._version = 0  # 每次失效加一
+        self._invalidated: OrderedDict[K, int] = OrderedDict()  # key -> 失效时的版本
+        self._floor = 0  # 早于该版本的加载一律视为过期（整体清空或失效记录被淘汰）
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: object) -> bool:
+        # 不经过 get：不影响命中统计与 LRU 顺序
+        item = self._data.get(key)  # type: ignore[call-overload]
+        return item is not None and item[0] > self._clock()
+
+    def get(self, key: K) -> V | None:
+        item = self._data.get(key)
+        if item is None:
+            self.misses += 1
+            return None
+
+        expires_at, value = item
+        if expires_at <= self._clock():
+            self._data.pop(key, None)
+            self.misses += 1
+            return None
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def version(self) -> int:
+        """回源加载前调用，结果传给 `set` 的 `version` 参数"""
+        return self._version
+
+    def set(self, key: K, value: V, *, version: int | None = None) -> None:
+        if self.maxsize <= 0:
+            return
+        if version is not None and (
+            self._floor > version or self._invalidated.get(key, 0) > version
+        ):
+            return  # 加载期间已失效，数据可能是旧的
+        self._data[key] = (self._clock() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def reconfigure(self, *, maxsize: int, ttl: float) -> None:
+        """运行时调整容量与过期时间：超出容量的旧条目立即淘汰，已有条目的
+        过期时间不会晚于新的 TTL"""
+        self.maxsize = maxsize
+        self.ttl = ttl
+        latest = self._clock() + ttl
+        for key, (expires_at, value) in self._data.items():
+            if expires_at > latest:
+                self._data[key] = (latest, value)
+        while len(self._data) > max(maxsize, 0):
+            self._data.popitem(last=False)
+
+    def invalidate(self, key: K, *, propagate: bool = True) -> None:
+        self._data.pop(key, None)
+        self._version += 1
+        self._invalidated[key] = self._version
+        self._invalidated.move_to_end(key)
+        if len(self._invalidated) > INVALIDATION_LOG_SIZE:
+            _, forgotten = self._invalidated.popitem(last=False)
+            self._floor = max(self._floor, forgotten)
+        if propagate:
+            self._notify(key)
+
+    def clear(self, *, propagate: bool = True) -> None:
+        self._data.clear()
+        self._version += 1
+        self._floor = self._version
+        self._invalidated.clear()
+        if propagate:
+            self._notify(None)
+
+    def add_invalidation_hook(self, hook: InvalidationHook) -> None:
+        """注册失效钩子（例如把失效事件广播给其它 worker）"""
+        self._hooks.append(hook)
+
+    def remove_invalidation_hook(self, hook: InvalidationHook) -> None:
+        if hook in self._hooks:
+            self._hooks.remove(hook)
+
+    def _notify(self, key: K | None) -> None:
+        for hook in list(self._hooks):
+            hook(self.name, key)
@@ -0,0 +1,235 @@
+"""响应压缩中间件（纯 ASGI 实现，不使用 BaseHTTPMiddleware）
+
+- 根据 `Accept-Encoding` 协商 zstd / br / gzip（按 q 值，其次按服务端偏好）
+- 小于 `minimum_size` 的完整响应体不压缩
+- `StreamingResponse` 等分块响应逐块压缩并 flush，不缓冲整个响应
+- zstd 优先使用 Python 3.14 自带的 `compression.zstd`，其次 `zstandard`；
+  brotli 依赖可选的 `brotli` 包；未安装的算法不会参与协商
+"""
+
+import zlib
+from typing import Protocol
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:  # Python 3.14+
+    from compression import zstd as _zstd_std
+except ImportError:  # pragma: no cover - 取决于 Python 版本
+    _zstd_std = None
+
+try:  # 可选依赖：pip install zstandard
+    import zstandard as _zstandard
+except ImportError:  # pragma: no cover - 取决于运行环境
+    _zstandard = None
+
+try:  # 可选依赖：pip install brotli
+    import brotli as _brotli
+except ImportError:  # pragma: no cover - 取决于运行环境
+    _brotli = None
+
+# 只压缩文本类内容，图片/压缩包等二进制内容压缩收益极低
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "application/problem+json",
+    "image/svg+xml",
+)
+
+
+class Compressor(Protocol):
+    def compress(self, data: bytes) -> bytes:
+        """压缩一块数据并 flush，使客户端可以立即解码已收到的部分"""
+        ...
+
+    def finish(self) -> bytes: ...
+
+
+class _GzipCompressor:
+    def __init__(self, level: int) -> None:
+        # wbits=31 -> gzip 容器格式
+        self._obj = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.compress(data) + self._obj.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._obj.flush(zlib.Z_FINISH)
+
+
+class _BrotliCompressor:
+    def __init__(self, quality: int) -> None:
+        self._obj = _brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.process(data) + self._obj.flush()
+
+    def finish(self) -> bytes:
+        return self._obj.finish()
+
+
+class _ZstdCompressor:
+    def __init__(self, level: int) -> None:
+        if _zstd_std is not None:
+            self._obj = _zstd_std.ZstdCompressor(level=level)
+            self._flush_block = self._obj.FLUSH_BLOCK
+            self._flush_frame = self._obj.FLUSH_FRAME
+        else:
+            self._obj = _zstandard.ZstdCompressor(level=level).compressobj()
+            self._flush_block = _zstandard.COMPRESSOBJ_FLUSH_BLOCK
+            self._flush_frame = _zstandard.COMPRESSOBJ_FLUSH_FINISH
+
+    def compress(self, data: bytes) -> bytes:
+        if _zstd_std is not None:
+            return self._obj.compress(data, mode=self._flush_block)
+        return self._obj.compress(data) + self._obj.flush(self._flush_block)
+
+    def finish(self) -> bytes:
+        return self._obj.flush(self._flush_frame)
+
+
+def available_encodings() -> tuple[str, ...]:
+    """当前环境可用的编码，按服务端偏好排序"""
+    encodings = []
+    if _zstd_std is not None or _zstandard is not None:
+        encodings.append("zstd")
+    if _brotli is not None:
+        encodings.append("br")
+    encodings.append("gzip")
+    return tuple(encodings)
+
+
+def negotiate_encoding(accept_encoding: str, supported: tuple[str, ...]) -> str | None:
+    """按 RFC 9110 的 q 值选择编码；q 值相同时按 `supported` 的顺序优先"""
+    weights: dict[str, float] = {}
+    for part in accept_encoding.lower().split(","):
+        token, _, params = part.strip().partition(";")
+        if not token:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[token.strip()] = q
+
+    best, best_q = None, 0.0
+    for encoding in supported:
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+class CompressionMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        minimum_size: int = 500,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+        zstd_level: int = 3,
+        encodings: tuple[str, ...] | None = None,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.zstd_level = zstd_level
+        supported = available_encodings()
+        self.encodings = tuple(e for e in (encodings or supported) if e in supported)
+
+    def make_compressor(self, encoding: str) -> Compressor:
+        if encoding == "zstd":
+            return _ZstdCompressor(self.zstd_level)
+        if encoding == "br":
+            return _BrotliCompressor(self.brotli_quality)
+        return _GzipCompressor(self.gzip_level)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accept = Headers(scope=scope).get("accept-encoding", "")
+        encoding = negotiate_encoding(accept, self.encodings) if accept else None
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressionResponder(self, encoding, send)
+        await self.app(scope, receive, responder)
+
+
+class _CompressionResponder:
+    """包装 send：缓存 response.start，看到第一块 body 后再决定是否压缩"""
+
+    def __init__(
+        self, middleware: CompressionMiddleware, encoding: str, send: Send
+    ) -> None:
+        self.middleware = middleware
+        self.encoding = encoding
+        self.send = send
+        self.start_message: Message | None = None
+        self.compressor: Compressor | None = None
+        self.passthrough = False
+
+    async def __call__(self, message: Message) -> None:
+        message_type = message["type"]
+        if message_type == "http.response.start":
+            headers = Headers(raw=message["headers"])
+            content_type = headers.get("content-type", "")
+            self.passthrough = (
+                "content-encoding" in headers
+                or message["status"] in (204, 304)
+                or not content_type.startswith(COMPRESSIBLE_TYPES)
+            )
+            if self.passthrough:
+                await self.send(message)
+            else:
+                self.start_message = message
+            return
+
+        if message_type != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        body: bytes = message.get("body", b"")
+        more_body: bool = message.get("more_body", False)
+
+        if self.start_message is not None:
+            start, self.start_message = self.start_message, None
+            if not more_body and len(body) < self.middleware.minimum_size:
+                # 完整且较小的响应体，压缩收益抵不过 CPU 开销
+                self.passthrough = True
+                await self.send(start)
+                await self.send(message)
+                return
+
+            self.compressor = self.middleware.make_compressor(self.encoding)
+            headers = MutableHeaders(raw=start["headers"])
+            headers["Content-Encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+            if more_body:
+                # 流式响应：长度未知，改用分块传输
+                del headers["Content-Length"]
+            else:
+                body = self.compressor.compress(body) + self.compressor.finish()
+                headers["Content-Length"] = str(len(body))
+                await self.send(start)
+                await self.send({"type": "http.response.body", "body": body})
+                return
+            await self.send(start)
+
+        assert self.compressor is not None
+        chunk = self.compressor.compress(body) if body else b""
+        if not more_body:
+            chunk += self.compressor.finish()
+        await self.send(
+            {"type": "http.response.body", "body": chunk, "more_body": more_body}
+        )
@@ -1,8 +1,22 @@
 import warnings
 from typing import Literal
+from uuid import uuid4
 
-from pydantic import computed_field
+from pydantic import BaseModel, computed_field
 from pydantic_settings import BaseSettings, SettingsConfigDict
+from sqlalchemy.pool import NullPool
+
+
+def unique_statement_name() -> str:
+    # PgBouncer 事务模式下服务端连接由多个客户端轮流使用, 预编译语句名必须全局唯一
+    return f"__asyncpg_{uuid4()}__"
+
+
+class PoolSettings(BaseModel):
+    # 命名连接池的容量参数, 含义同下方的默认连接池配置
+    pool_size: int = 5
+    max_overflow: int = 5
+    pool_timeout: float = 10
 
 
 class Settings(BaseSettings):
@@ -17,6 +31,123 @@ class Settings(BaseSettings):
     app_name: str = "PAWCARE"
     debug: bool = False
 
+    # 日志 (loguru -> 有界队列 -> 后台写线程, 不在事件循环中格式化与写出)
+    log_level: str = "INFO"
+    log_json: bool = False  # 输出 JSON 行 (便于日志采集), 否则为文本格式
+    log_queue_size: int = 10000  # 队列上限, 写线程跟不上时丢弃新日志并计数
+    log_sample_rates: dict[str, float] = {}  # 按级别抽样, 如 {"DEBUG": 0.01}
+    log_dedup_window: float = 60  # 重复错误限流的时间窗口 (秒)
+    log_dedup_burst: int = 5  # 窗口内同一位置的同类错误最多记录的条数
+
+    # 请求截止时间 (下推为数据库语句超时, 到期返回 504)
+    deadline_enabled: bool = True
+    request_timeout: float = 30  # 默认超时 (秒), 0 表示不限; X-Request-Timeout 只能缩短
+    request_timeout_routes: dict[str, float] = {}  # 按路径前缀覆盖, 如 {"/foods": 5}
+
+    # 优雅停机: 排空请求与后台任务的最长等待时间 (秒), 应小于编排系统的强杀时限
+    shutdown_timeout: float = 20
+
+    # 启动耗时: 领域路由延迟到 lifespan / 首个请求时导入, 启动时预先生成 OpenAPI 文档
+    lazy_routers: bool = True
+    openapi_prebuild: bool = True
+
+    # 启动器 (python -m app.launcher)
+    workers: int = 0  # worker 进程数, 0 表示按可用 CPU 数与数据库连接预算自动计算
+    db_connection_budget: int = (
+        0  # 本实例所有 worker 合计可占用的数据库连接数, 0 表示不限
+    )
+    preload: bool = True  # fork 前导入应用并生成只读状态, 由各 worker 写时复制共享
+    max_requests: int = 0  # worker 处理该数量的请求后重启, 0 表示不重启
+    max_requests_jitter: int = 0  # 在 max_requests 上随机增加 0~N, 避免 worker 同时重启
+
+    # 缓存失效总线: 实体变更后广播给其它 worker / 节点 (见 app.core.invalidation)
+    invalidation_enabled: bool = True
+    # auto: PostgreSQL 时使用 LISTEN/NOTIFY, 否则为进程内回环
+    invalidation_transport: Literal["auto", "local", "postgres"] = "auto"
+    # LISTEN 需要直连数据库 (PgBouncer 事务模式不支持), 默认使用 database_url
+    invalidation_url: str | None = None
+    invalidation_channel: str = "cache_invalidation"
+    invalidation_coalesce_ms: float = 50  # 合并窗口 (毫秒)
+    invalidation_max_keys: int = 100  # 同一实体超过该数量的 key 时改为整体失效
+
+    # 食物目录共享缓存: 同一主机的 worker 共用一张共享内存表 (见 app.foods.catalog);
+    # 非 POSIX 平台上不生效
+    shared_catalog_enabled: bool = True
+    shared_catalog_dir: str | None = None  # 默认 /dev/shm, 不存在时使用临时目录
+    shared_catalog_refresh: float = 60  # 定期重建间隔 (秒), 兜底其它节点的修改
+
+    # 启动预热: 每个连接池预先建立的连接数 (不超过 pool_size), 并执行登记的热点查询
+    warmup_enabled: bool = True
+    warmup_connections: int = 5
+
+    # 深度健康检查: 后台定期检查数据库 / 缓存 / 后台任务, /healthz 返回缓存结果
+    health_interval: float = 5  # 检查间隔 (秒)
+    health_timeout: float = 2  # 单项检查超时 (秒), 超时视为不可用
+    health_degraded_ms: float = 500  # 单项检查耗时超过该值时标记为 degraded
+
+    # JSON 序列化后端: auto 按 orjson > msgspec > stdlib 顺序选择已安装的实现
+    json_backend: Literal["auto", "orjson", "msgspec", "stdlib"] = "auto"
+
+    # 响应压缩 (按 Accept-Encoding 协商 zstd / br / gzip)
+    compression_enabled: bool = True
+    compression_minimum_size: int = 500  # 小于该字节数的响应不压缩
+    compression_gzip_level: int = 6  # 1-9, 低: 快 高: 压缩率高
+    compression_brotli_quality: int = 4  # 0-11, 动态内容建议 4-5
+    compression_zstd_level: int = 3  # 1-22, 默认 3 兼顾速度与压缩率
+
+    # 指标 (Prometheus 格式, GET /metrics)
+    metrics_enabled: bool = True
+    # 多 worker 汇总: 各 worker 把快照写入该目录, /metrics 读取全部文件求和; 为空表示只导出本进程
+    metrics_multiprocess_dir: str | None = None
+    metrics_flush_interval: float = 5.0  # 多 worker 模式下写出快照的间隔 (秒)
+
+    # 事件循环阻塞检测 (心跳测量 loop lag, 超过阈值时由辅助线程抓取阻塞处的调用栈)
+    watchdog_enabled: bool = True
+    watchdog_interval: float = 0.05  # 心跳间隔 (秒)
+    watchdog_threshold_ms: float = 100  # 阻塞超过该时长记录调用栈
+
+    # 请求级 SQL 统计 (Server-Timing 响应头 + N+1 / 语句预算检查)
+    query_stats_enabled: bool = True
+    server_timing_enabled: bool = True  # 在响应头中返回数据库耗时与语句数
+    n_plus_one_threshold: int = 5  # 同一结构语句在单个请求内重复的次数阈值, 0 表示关闭
+    query_budget_default: int = (
+        0  # 未声明 @query_budget 的路由的语句数上限, 0 表示不限制
+    )
+    # 超标时的处理方式: log 只记录日志, raise 抛出异常 (测试中使用, 让超标请求直接失败)
+    query_guard_mode: Literal["log", "raise"] = "log"
+
+    # 慢查询日志 (按 SQL 指纹聚合, 抽样 EXPLAIN, GET /admin/slow-queries 查看)
+    slow_query_enabled: bool = True
+    slow_query_threshold_ms: float = 200  # 超过该耗时的语句记为慢查询
+    slow_query_explain_sample_rate: float = 0.1  # 触发 EXPLAIN 的抽样比例, 0-1
+    slow_query_max_fingerprints: int = 500  # 最多保留的指纹数, 超出淘汰总耗时最小的
+
+    # 管理接口令牌 (请求头 X-Admin-Token), 为空表示关闭 /admin 接口
+    admin_token: str = ""
+
+    # 请求剖析 (需安装 pyinstrument; 关闭时不注册中间件, 无额外开销)
+    # 请求头 X-Profile 等于 admin_token 时剖析该请求, 或按抽样比例随机剖析
+    profiling_enabled: bool = False
+    profiling_dir: str = "./data/profiles"  # 火焰图文件输出目录
+    profiling_sample_rate: float = 0.0  # 随机剖析的请求比例, 0-1
+    profiling_interval: float = 0.001  # 采样间隔 (秒)
+    profiling_format: Literal["speedscope", "html"] = "speedscope"
+
+    # 准入控制 (自适应并发上限, 超出时排队, 队列满或等待超时返回 503 + Retry-After)
+    admission_enabled: bool = True
+    admission_initial_limit: int = 0  # 初始并发上限, 0 表示取 pool_size + max_overflow
+    admission_max_queue: int = 100  # 排队请求数上限
+    admission_queue_timeout: float = 1.0  # 排队最长等待 (秒)
+    admission_latency_target_ms: float = 500  # 请求耗时超过该值时降低并发上限
+    admission_pool_wait_threshold_ms: float = 50  # 取连接等待超过该值时降低并发上限
+    # 按路径前缀设置优先级: exempt 不受限, high / normal / low 依次排队
+    admission_priorities: dict[str, Literal["exempt", "high", "normal", "low"]] = {
+        "/healthz": "exempt",
+        "/readyz": "exempt",
+        "/metrics": "exempt",
+        "/admin": "high",
+    }
+
     # 数据库类型 (支持 PostgreSQL 和 SQLite, 含连接池设置)
     db_type: Literal["postgres", "sqlite"] = "sqlite"
 
@@ -44,6 +175,23 @@ class Settings(BaseSettings):
     )
     echo: bool = False  # 是否打印 SQL, 开发可打开, 生产关闭
 
+    # PgBouncer 事务池模式 (仅 PostgreSQL): 关闭 asyncpg 语句缓存, 预编译语句使用唯一名称
+    pgbouncer_mode: bool = False
+    # 应用侧连接池大小, 0 表示 NullPool (每次事务从 PgBouncer 取连接, 不在进程内保留)
+    pgbouncer_app_pool_size: int = 0
+
+    # 命名连接池 (bulkhead): 不同类型的负载使用独立的引擎与连接池, 互不争抢连接
+    # 路由通过 session_for("<name>") 选择; 未配置的名称回退到默认连接池
+    # 环境变量示例: DB_POOLS='{"batch": {"pool_size": 2, "pool_timeout": 120}}'
+    db_pools: dict[str, PoolSettings] = {
+        # 登录 / 鉴权: 连接少但超时短, 不被其它负载拖住
+        "auth": PoolSettings(pool_size=5, max_overflow=5, pool_timeout=3),
+        # 食物目录等读多的接口
+        "catalog": PoolSettings(pool_size=10, max_overflow=10, pool_timeout=10),
+        # 导入导出等批量任务: 连接少, 允许长时间排队
+        "batch": PoolSettings(pool_size=2, max_overflow=0, pool_timeout=60),
+    }
+
     # SQLite 配置
     sqlite_db_path: str = "./data/db.sqlite3"
 
@@ -52,6 +200,10 @@ class Settings(BaseSettings):
     jwt_algorithm: str = "HS256"
     access_token_expire_minutes: int = 60
 
+    # 当前用户 principal 缓存 (进程内, 过期时间较短以限制跨 worker 的不一致窗口)
+    principal_cache_ttl: int = 30  # 缓存过期时间 (秒), 0 表示关闭缓存
+    principal_cache_size: int = 10000  # 最多缓存的用户数
+
     # Redis 配置
     redis_host: str = "localhost"
     redis_port: int = 6379
@@ -75,6 +227,8 @@ class Settings(BaseSettings):
     @property
     def engine_options(self) -> dict:
         # 统一封装 engine options, 供 create_async_engine 使用
+        if self.db_type == "postgres" and self.pgbouncer_mode:
+            return self._pgbouncer_engine_options()
         if self.db_type == "postgres":
             return {
                 "pool_size": self.pool_size,
@@ -87,6 +241,44 @@ class Settings(BaseSettings):
         # SQLite 不支持 pool 设置，返回最小参数
         return {"echo": self.echo}
 
+    def _pgbouncer_engine_options(self) -> dict:
+        # 事务池模式下同一客户端连接的前后两个事务可能落在不同的服务端连接上:
+        # asyncpg 自带的语句缓存与 SQLAlchemy 的预编译语句缓存都会引用不存在的语句
+        options: dict = {
+            "echo": self.echo,
+            "connect_args": {
+                "statement_cache_size": 0,
+                "prepared_statement_cache_size": 0,
+                "prepared_statement_name_func": unique_statement_name,
+            },
+        }
+        if self.pgbouncer_app_pool_size <= 0:
+            options["poolclass"] = NullPool
+            return options
+        # 只保留少量连接, 省去与 PgBouncer 握手的开销, 连接复用仍交给 PgBouncer
+        options.update(
+            pool_size=self.pgbouncer_app_pool_size,
+            max_overflow=0,
+            pool_timeout=self.pool_timeout,
+            pool_recycle=self.pool_recycle,
+            pool_use_lifo=True,  # 让多余的连接闲置并被 pool_recycle 回收
+        )
+        return options
+
+    def pool_engine_options(self, name: str) -> dict:
+        # 命名连接池的 engine options, 在默认参数上覆盖容量设置
+        options = dict(self.engine_options)
+        pool = self.db_pools.get(name)
+        if pool is None or self.db_type != "postgres":
+            return options
+        if self.pgbouncer_mode:
+            if "pool_size" in options:  # NullPool 没有容量参数
+                options["pool_size"] = min(pool.pool_size, options["pool_size"])
+                options["pool_timeout"] = pool.pool_timeout
+            return options
+        options.update(pool.model_dump())
+        return options
+
     @computed_field
     @property
     def auth_redis_url(self) -> str:
@@ -1,26 +1,185 @@
-from typing import AsyncGenerator
+import asyncio
+import time
+from functools import cache
+from typing import Any, AsyncGenerator, Awaitable, Callable
 
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from loguru import logger
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 
+from app.core import deadline
 from app.core.base_model import Base
-from app.core.config import settings
+from app.core.config import Settings, settings
+from app.core.metrics import (
+    InstrumentedAsyncAdaptedQueuePool,
+    instrument_engine,
+    uninstrument_engine,
+)
+from app.core.query_stats import track_statements
+from app.core.slow_query import slow_query_log
 
-# 创建数据库引擎和会话工厂
-engine = create_async_engine(settings.database_url, **settings.engine_options)
+DEFAULT_POOL = "default"
 
-SessionFactory = async_sessionmaker(
-    engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
-)
+
+class DatabaseRegistry:
+    """按名称管理引擎与会话工厂 (bulkhead)
+
+    每个命名连接池 (`settings.db_pools`) 对应一个独立引擎, 首次使用时创建;
+    连接池指标与语句统计都以池名作为 `pool` 标签, 互不混淆。
+    配置变化时可用 `reload` 整体替换引擎, 调用方不应长期持有引擎引用。
+    """
+
+    def __init__(self, config: Settings) -> None:
+        self.config = config
+        self._engines: dict[str, AsyncEngine] = {}
+        self._factories: dict[str, async_sessionmaker[AsyncSession]] = {}
+        self._retiring: set[asyncio.Task] = set()
+        self._warned: set[str] = set()
+
+    def _resolve(self, name: str) -> str:
+        if name == DEFAULT_POOL or name in self.config.db_pools:
+            return name
+        if name not in self._warned:  # 每个名称只告警一次
+            self._warned.add(name)
+            logger.warning(f"未配置的连接池 {name!r}, 使用默认连接池")
+        return DEFAULT_POOL
+
+    def create_engine(self, name: str, config: Settings | None = None) -> AsyncEngine:
+        """按配置（默认当前配置）新建引擎（不登记），连接池带取连接耗时 / 排队数统计"""
+        config = config or self.config
+        # PgBouncer 模式下 options 可能把 poolclass 换成 NullPool
+        options = {
+            "poolclass": InstrumentedAsyncAdaptedQueuePool,
+            **config.pool_engine_options(name),
+        }
+        engine = create_async_engine(config.database_url, **options)
+        instrument_engine(engine, name)
+        track_statements(engine, name)
+        return engine
+
+    def engine(self, name: str = DEFAULT_POOL) -> AsyncEngine:
+        name = self._resolve(name)
+        engine = self._engines.get(name)
+        if engine is None:
+            engine = self._engines[name] = self.create_engine(name)
+        return engine
+
+    def session_factory(
+        self, name: str = DEFAULT_POOL
+    ) -> async_sessionmaker[AsyncSession]:
+        name = self._resolve(name)
+        factory = self._factories.get(name)
+        if factory is None:
+            factory = async_sessionmaker(
+                self.engine(name),
+                class_=AsyncSession,
+                autoflush=False,
+                expire_on_commit=False,
+            )
+            self._factories[name] = factory
+        return factory
+
+    def engines(self) -> dict[str, AsyncEngine]:
+        """已创建的引擎（未使用过的命名连接池不会出现在这里）"""
+        return dict(self._engines)
+
+    async def reload(
+        self,
+        config: Settings,
+        *,
+        prepare: Callable[[str, AsyncEngine], Awaitable[Any]] | None = None,
+        drain_timeout: float = 30.0,
+    ) -> list[str]:
+        """换用新配置：已创建的引擎按新参数重建并切换，返回被替换的池名
+
+        新引擎全部创建并经过 `prepare`（如预热）后才一次性切换，此前请求继续使用
+        旧引擎；`prepare` 失败时丢弃新引擎，旧引擎与配置保持不变。
+        切换后新请求立即使用新引擎，旧引擎在后台等待借出的连接全部归还
+        （最多 `drain_timeout` 秒）后释放
+        """
+        created: dict[str, AsyncEngine] = {}
+        try:
+            for name in list(self._engines):
+                if name != DEFAULT_POOL and name not in config.db_pools:
+                    continue  # 连接池已从配置中移除，对应路由回退到默认池
+                created[name] = new = self.create_engine(name, config)
+                if prepare is not None:
+                    await prepare(name, new)
+        except BaseException:
+            for new in created.values():
+                uninstrument_engine(new)
+                await new.dispose()
+            raise
+
+        # 引擎、会话工厂与配置一起切换，中间没有 await；
+        # 包括 prepare 期间按旧配置新建的引擎在内，旧引擎全部退役
+        replaced = self._engines
+        self.config = config
+        self._engines = created
+        self._factories = {}
+        for old in replaced.values():
+            task = asyncio.create_task(self._retire(old, drain_timeout))
+            self._retiring.add(task)
+            task.add_done_callback(self._retiring.discard)
+        return list(replaced)
+
+    @staticmethod
+    async def _retire(engine: AsyncEngine, drain_timeout: float) -> None:
+        pool = engine.pool
+        deadline = time.monotonic() + drain_timeout
+        while getattr(pool, "checkedout", lambda: 0)() and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+        uninstrument_engine(engine)
+        await engine.dispose()
+
+    async def dispose_all(self) -> None:
+        # 停机时请求已排空，替换下来还在等待的旧引擎直接释放
+        for task in list(self._retiring):
+            task.cancel()
+        await asyncio.gather(*self._retiring, return_exceptions=True)
+        for engine in self._engines.values():
+            await engine.dispose()
+
+
+# 创建数据库引擎和会话工厂
+# 引擎可能在运行时被替换（见 `app.core.reload`），使用时总是通过 databases 获取
+databases = DatabaseRegistry(settings)
+if settings.slow_query_enabled:
+    slow_query_log.install()
+if settings.deadline_enabled:
+    deadline.install()  # 会话开启事务时把请求剩余时间下推为语句超时
 
 
 # 数据库依赖注入
 async def get_session() -> AsyncGenerator[AsyncSession, None]:
-    async with SessionFactory() as session:
+    async with databases.session_factory()() as session:
         yield session
 
 
+@cache
+def session_for(name: str) -> Callable[[], AsyncGenerator[AsyncSession, None]]:
+    """返回使用指定命名连接池的会话依赖
+
+    同名总是返回同一个函数, 便于 `app.dependency_overrides` 按名称覆盖
+    """
+    if name == DEFAULT_POOL or name not in settings.db_pools:
+        databases._resolve(name)  # 未配置时记录告警
+        return get_session
+
+    async def get_named_session() -> AsyncGenerator[AsyncSession, None]:
+        async with databases.session_factory(name)() as session:
+            yield session
+
+    get_named_session.__name__ = f"get_{name}_session"
+    return get_named_session
+
+
 # 用于临时使用的创建数据库表的函数
 # 请在生产环境中使用 Alembic 进行数据库迁移
 async def create_db_and_tables():
-    async with engine.begin() as conn:
+    async with databases.engine().begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
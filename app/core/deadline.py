@@ -0,0 +1,164 @@
+"""请求截止时间：从请求入口一路传到数据库语句超时
+
+客户端放弃等待后，服务端的查询往往还在跑、继续占着连接池里的连接。这里：
+
+- `DeadlineMiddleware` 按路径前缀取路由的超时上限（`request_timeout_routes`，
+  缺省为 `request_timeout`），客户端可用 `X-Request-Timeout`（秒）进一步缩短；
+  截止时间放入 contextvar，整个请求在 `asyncio.timeout` 内执行
+- 会话每次开启事务时（`after_begin`）把剩余时间下推到数据库：
+  PostgreSQL 以绑定参数调用 `set_config('statement_timeout', ..., true)`
+  （语句文本固定，不会撑爆 asyncpg 的预编译语句缓存；不计入请求的语句统计），SQLite 安装 progress handler，
+  到期后由 SQLite 自己中断正在执行的语句（aiosqlite 的查询跑在独立线程里，
+  取消协程并不能让它停下）
+- 截止时间已过时，超时取消或数据库中断引起的异常统一转换为 504
+"""
+
+import asyncio
+import time
+from contextvars import ContextVar
+from functools import partial
+
+from sqlalchemy import Connection, event, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session, SessionTransaction
+from sqlalchemy.util import await_only
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.metrics import REGISTRY, UNMATCHED_ROUTE
+from app.core.query_stats import UNTRACKED
+
+DEADLINE_EXCEEDED = REGISTRY.counter(
+    "http_request_deadline_exceeded_total", "超过截止时间返回 504 的请求数", ("route",)
+)
+
+# 截止时间（time.monotonic() 时刻），None 表示不限
+deadline_var: ContextVar[float | None] = ContextVar("request_deadline", default=None)
+
+# SQLite 每执行多少条虚拟机指令检查一次截止时间
+SQLITE_PROGRESS_STEPS = 1000
+
+# 等价于 SET LOCAL statement_timeout（is_local=true，只作用于当前事务）
+SET_STATEMENT_TIMEOUT = text("SELECT set_config('statement_timeout', :ms, true)")
+
+
+def remaining() -> float | None:
+    """当前请求剩余的秒数（不小于 0），没有截止时间时返回 None"""
+    deadline = deadline_var.get()
+    if deadline is None:
+        return None
+    return max(0.0, deadline - time.monotonic())
+
+
+def expired() -> bool:
+    left = remaining()
+    return left is not None and left <= 0
+
+
+# ------------------ 下推到数据库 ------------------
+def _past(deadline: float) -> bool:
+    return time.monotonic() >= deadline
+
+
+def _apply_to_connection(
+    session: Session, transaction: SessionTransaction, connection: Connection
+) -> None:
+    deadline = deadline_var.get()
+    dialect = connection.dialect.name
+    if dialect == "postgresql":
+        if deadline is not None:
+            # 至少 1ms，0 在 PostgreSQL 中表示不限
+            ms = max(1, int((deadline - time.monotonic()) * 1000))
+            connection.execute(
+                SET_STATEMENT_TIMEOUT,
+                {"ms": str(ms)},
+                execution_options={UNTRACKED: True},
+            )
+    elif dialect == "sqlite":
+        driver_connection = connection.connection.driver_connection
+        if not hasattr(driver_connection, "set_progress_handler"):
+            return
+        # handler 在 aiosqlite 的线程里执行，读不到 contextvar，直接绑定截止时间；
+        # 连接会被其它请求复用，没有截止时间时也要清掉上一次的 handler
+        handler = partial(_past, deadline) if deadline is not None else None
+        await_only(
+            driver_connection.set_progress_handler(handler, SQLITE_PROGRESS_STEPS)
+        )
+
+
+def install() -> None:
+    """为所有会话注册事务开启时的超时下推（重复调用无副作用）"""
+    if not event.contains(Session, "after_begin", _apply_to_connection):
+        event.listen(Session, "after_begin", _apply_to_connection)
+
+
+# ------------------ 中间件 ------------------
+class DeadlineMiddleware:
+    header = "x-request-timeout"
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        default_timeout: float = 30.0,
+        route_timeouts: dict[str, float] | None = None,
+    ) -> None:
+        self.app = app
+        self.default_timeout = default_timeout
+        # 最长前缀优先匹配
+        self.route_timeouts = sorted(
+            (route_timeouts or {}).items(), key=lambda item: len(item[0]), reverse=True
+        )
+
+    def timeout_for(self, scope: Scope) -> float | None:
+        limit = self.default_timeout
+        for prefix, timeout in self.route_timeouts:
+            if scope["path"].startswith(prefix):
+                limit = timeout
+                break
+        # 客户端只能缩短，不能超过路由的上限
+        requested = Headers(scope=scope).get(self.header)
+        try:
+            wanted = float(requested) if requested else None
+        except ValueError:
+            wanted = None
+        if wanted is not None and wanted > 0:
+            limit = min(limit, wanted) if limit > 0 else wanted
+        return limit if limit > 0 else None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        timeout = self.timeout_for(scope)
+        if timeout is None:
+            await self.app(scope, receive, send)
+            return
+
+        deadline = time.monotonic() + timeout
+        token = deadline_var.set(deadline)
+        started = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal started
+            if message["type"] == "http.response.start":
+                started = True
+            await send(message)
+
+        try:
+            async with asyncio.timeout(timeout):
+                await self.app(scope, receive, send_wrapper)
+        except (TimeoutError, DBAPIError):
+            # 数据库错误只有在截止时间已过时才视为超时，其它情况照常抛出
+            if started or not expired():
+                raise
+            DEADLINE_EXCEEDED.inc(
+                labels=(getattr(scope.get("route"), "path", UNMATCHED_ROUTE),)
+            )
+            response = JSONResponse(
+                {"detail": "Request deadline exceeded"}, status_code=504
+            )
+            await response(scope, receive, send)
+        finally:
+            deadline_var.reset(token)
@@ -0,0 +1,204 @@
+"""健康检查与就绪探针
+
+- `/healthz`：组件健康状态。探针每秒都会打到每个实例，因此不在请求里查数据库，
+  而是由 `HealthMonitor` 在后台按 `health_interval` 并发执行各项检查
+  （数据库 ping、缓存、后台任务），接口直接返回缓存的结果与每个组件的耗时；
+  关键组件不可用或检查结果过期时返回 503
+- `/readyz`：可以接收流量，启动预热完成前、停机排空期间以及不健康时返回 503
+"""
+
+import asyncio
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Awaitable, Callable, Literal
+
+from fastapi import APIRouter, Request
+from fastapi.responses import JSONResponse
+from loguru import logger
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.shutdown import ShutdownManager
+
+State = Literal["ok", "degraded", "down"]
+# 检查函数：返回附加信息（可为 None）；抛出 Degraded 表示降级，其它异常表示不可用
+Check = Callable[[], Awaitable[dict[str, Any] | None]]
+
+
+class Degraded(Exception):
+    pass
+
+
+@dataclass(slots=True)
+class ComponentHealth:
+    state: State
+    latency_ms: float
+    checked_at: float
+    critical: bool
+    detail: dict[str, Any] | None = None
+    error: str | None = None
+
+
+class HealthMonitor:
+    def __init__(
+        self,
+        *,
+        interval: float = 5.0,
+        timeout: float = 2.0,
+        degraded_ms: float = 500,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.interval = interval
+        self.timeout = timeout
+        self.degraded_ms = degraded_ms
+        self._clock = clock
+        self._checks: dict[str, tuple[Check, bool]] = {}
+        self.results: dict[str, ComponentHealth] = {}
+        self.last_run: float | None = None
+        self._task: asyncio.Task | None = None
+
+    def add_check(self, name: str, check: Check, *, critical: bool = True) -> None:
+        """注册检查（同名覆盖）；critical 组件不可用时整体视为不健康"""
+        self._checks[name] = (check, critical)
+
+    async def _run_one(self, check: Check, critical: bool) -> ComponentHealth:
+        start = time.perf_counter()
+        state: State = "ok"
+        detail = error = None
+        try:
+            detail = await asyncio.wait_for(check(), self.timeout)
+        except Degraded as e:
+            state, error = "degraded", str(e)
+        except asyncio.TimeoutError:
+            state, error = "down", f"timed out after {self.timeout}s"
+        except Exception as e:
+            state, error = "down", repr(e)
+        latency_ms = (time.perf_counter() - start) * 1000
+        if state == "ok" and latency_ms > self.degraded_ms:
+            state = "degraded"
+        return ComponentHealth(
+            state=state,
+            latency_ms=round(latency_ms, 2),
+            checked_at=self._clock(),
+            critical=critical,
+            detail=detail,
+            error=error,
+        )
+
+    async def run_checks(self) -> None:
+        names = list(self._checks)
+        results = await asyncio.gather(
+            *(self._run_one(*self._checks[name]) for name in names)
+        )
+        for name, result in zip(names, results):
+            previous = self.results.get(name)
+            if previous is not None and previous.state != result.state:
+                logger.warning(
+                    f"组件 {name} 状态变化: {previous.state} -> {result.state}"
+                )
+            self.results[name] = result
+        self.last_run = self._clock()
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                await self.run_checks()
+            except Exception as e:  # 检查本身出错也不能让循环退出
+                logger.error(f"健康检查执行失败: {e!r}")
+            await asyncio.sleep(self.interval)
+
+    async def start(self) -> None:
+        if self._task is None:
+            await self.run_checks()  # 启动时先跑一轮，探针不会看到空结果
+            self._task = asyncio.create_task(self._loop(), name="health-monitor")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def report(self) -> tuple[bool, dict[str, Any]]:
+        """返回 (是否健康, 响应内容)；未启动时没有组件信息，视为健康"""
+        components = {name: asdict(r) for name, r in self.results.items()}
+        healthy = all(r.state != "down" for r in self.results.values() if r.critical)
+        status = "ok" if healthy else "down"
+        if healthy and any(r.state != "ok" for r in self.results.values()):
+            status = "degraded"
+        if self._task is not None and self.last_run is not None:
+            # 检查循环卡住或退出时，缓存的结果不再可信
+            if self._clock() - self.last_run > 3 * self.interval + self.timeout:
+                healthy, status = False, "stale"
+        return healthy, {"status": status, "components": components}
+
+
+# ------------------ 内置检查 ------------------
+def database_check(get_engine: Callable[[], AsyncEngine]) -> Check:
+    """数据库 ping；引擎可能在运行时被替换，每次检查时重新获取"""
+
+    async def check() -> dict[str, Any]:
+        engine = get_engine()
+        pool = engine.pool
+        detail: dict[str, Any] = {}
+        if hasattr(pool, "checkedout"):
+            detail = {"checked_out": pool.checkedout(), "size": pool.size()}
+            # 连接池已满时 ping 只会排队等待超时，误报数据库不可用
+            if pool.checkedout() >= pool.size() + max(pool._max_overflow, 0):
+                raise Degraded("connection pool saturated")
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+        return detail
+
+    return check
+
+
+def cache_check(cache: TTLCache) -> Check:
+    async def check() -> dict[str, Any]:
+        lookups = cache.hits + cache.misses
+        return {
+            "entries": len(cache),
+            "hit_ratio": round(cache.hits / lookups, 3) if lookups else None,
+        }
+
+    return check
+
+
+def tasks_check(running: Callable[[], dict[str, bool]]) -> Check:
+    """后台任务是否都在运行（任务意外退出时为 down）"""
+
+    async def check() -> dict[str, Any]:
+        states = running()
+        stopped = [name for name, alive in states.items() if not alive]
+        if stopped:
+            raise RuntimeError(f"stopped: {', '.join(stopped)}")
+        return {"tasks": sorted(states)}
+
+    return check
+
+
+health_monitor = HealthMonitor(
+    interval=settings.health_interval,
+    timeout=settings.health_timeout,
+    degraded_ms=settings.health_degraded_ms,
+)
+
+router = APIRouter(tags=["health"])
+
+
+@router.get("/healthz")
+async def healthz():
+    healthy, payload = health_monitor.report()
+    return JSONResponse(payload, status_code=200 if healthy else 503)
+
+
+@router.get("/readyz")
+async def readyz(request: Request):
+    if ShutdownManager.for_app(request.app).draining:
+        return JSONResponse({"status": "draining"}, status_code=503)
+    if not getattr(request.app.state, "warmed_up", False):
+        return JSONResponse({"status": "warming_up"}, status_code=503)
+    if not health_monitor.report()[0]:
+        return JSONResponse({"status": "unhealthy"}, status_code=503)
+    return {"status": "ready"}
@@ -0,0 +1,300 @@
+"""缓存失效总线：实体变更事件在 worker / 节点之间广播
+
+进程内缓存只能看到本进程的写入，其它 worker / 节点修改数据后只能等 TTL 过期。
+有了失效总线，缓存才可以使用较长的 TTL：
+
+- 发布：仓储层提交后调用 `invalidation_bus.publish(entity, key)`（key 为 None
+  表示该实体整体失效）；`attach_cache` 让 `TTLCache.invalidate` 自动发布
+- 订阅：`subscribe(entity, callback)`，只收到其它进程发出的事件，
+  本进程的缓存在发布时已自行失效
+- 合并：发布端在 `coalesce_ms` 内把事件合并成一条消息，同一实体的 key 超过
+  `max_keys` 时退化为整体失效，批量修改不会产生消息风暴
+- 传输：
+  - `LocalTransport`：进程内回环，用于 SQLite、单 worker 与测试
+  - `PostgresTransport`：LISTEN/NOTIFY，独占一个直连（不占用连接池）；
+    连接断开后自动重连，并让所有订阅方整体失效一次，弥补断线期间丢失的事件
+
+总线未启动（脚本、单元测试）时发布不做任何事。
+"""
+
+import asyncio
+import contextvars
+import json
+import os
+import socket
+import uuid
+from typing import Any, Callable, Hashable, Protocol
+
+from loguru import logger
+from sqlalchemy.ext.asyncio import AsyncConnection, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.core.cache import TTLCache
+from app.core.config import Settings, settings
+from app.core.metrics import REGISTRY
+
+INVALIDATION_EVENTS = REGISTRY.counter(
+    "cache_invalidation_events_total",
+    "缓存失效消息数 (sent / received / coalesced / dropped)",
+    ("direction",),
+)
+
+# NOTIFY 的 payload 上限为 8000 字节
+MAX_PAYLOAD = 7900
+
+Subscriber = Callable[[Hashable | None], Any]
+MessageHandler = Callable[[str], None]
+
+
+class Transport(Protocol):
+    async def start(self, on_message: MessageHandler) -> None: ...
+
+    async def send(self, payload: str) -> None: ...
+
+    async def stop(self) -> None: ...
+
+
+class LocalTransport:
+    """进程内回环：同一个 hub 上的总线互相可见（测试中可用独立 hub 模拟多个节点）"""
+
+    def __init__(self, hub: list[MessageHandler] | None = None) -> None:
+        self.hub = _LOCAL_HUB if hub is None else hub
+        self._handler: MessageHandler | None = None
+
+    async def start(self, on_message: MessageHandler) -> None:
+        self._handler = on_message
+        self.hub.append(on_message)
+
+    async def send(self, payload: str) -> None:
+        for handler in list(self.hub):
+            handler(payload)
+
+    async def stop(self) -> None:
+        if self._handler in self.hub:
+            self.hub.remove(self._handler)
+
+
+_LOCAL_HUB: list[MessageHandler] = []
+
+
+class PostgresTransport:
+    def __init__(
+        self, url: str, channel: str, *, on_reconnect: Callable[[], None]
+    ) -> None:
+        # NullPool: 不与应用连接池共享, 连接只用于 LISTEN / NOTIFY
+        self.engine = create_async_engine(url, poolclass=NullPool)
+        self.channel = channel
+        self.on_reconnect = on_reconnect
+        self._conn: AsyncConnection | None = None
+        self._driver: Any = None  # asyncpg.Connection
+        self._handler: MessageHandler | None = None
+        self._send_lock = asyncio.Lock()
+        self._reconnect_task: asyncio.Task | None = None
+        self._closing = False
+
+    def _notify(self, connection, pid, channel, payload: str) -> None:
+        self._handler(payload)
+
+    def _terminated(self, connection) -> None:
+        if not self._closing and (
+            self._reconnect_task is None or self._reconnect_task.done()
+        ):
+            self._reconnect_task = asyncio.create_task(
+                self._reconnect(), name="invalidation-reconnect"
+            )
+
+    async def _connect(self) -> None:
+        self._conn = await self.engine.connect()
+        raw = await self._conn.get_raw_connection()
+        self._driver = raw.driver_connection
+        await self._driver.add_listener(self.channel, self._notify)
+        self._driver.add_termination_listener(self._terminated)
+
+    async def _reconnect(self) -> None:
+        backoff = 0.5
+        while not self._closing:
+            try:
+                await self._close_connection()
+                await self._connect()
+            except Exception as e:
+                logger.error(f"失效总线重连失败, {backoff:.1f}s 后重试: {e!r}")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 10.0)
+                continue
+            logger.warning("失效总线已重连, 断线期间的事件可能丢失, 整体失效一次")
+            self.on_reconnect()
+            return
+
+    async def start(self, on_message: MessageHandler) -> None:
+        self._handler = on_message
+        try:
+            await self._connect()
+        except Exception:
+            await self.engine.dispose()
+            raise
+
+    async def send(self, payload: str) -> None:
+        if self._driver is None or self._driver.is_closed():
+            raise ConnectionError("invalidation listener is not connected")
+        async with self._send_lock:  # asyncpg 连接不能并发执行语句
+            await self._driver.execute(
+                "SELECT pg_notify($1, $2)", self.channel, payload
+            )
+
+    async def _close_connection(self) -> None:
+        conn, self._conn, self._driver = self._conn, None, None
+        if conn is not None:
+            try:
+                await conn.close()
+            except Exception:
+                logger.exception("关闭失效总线连接失败 (连接可能已断开)")
+
+    async def stop(self) -> None:
+        self._closing = True
+        if self._reconnect_task is not None:
+            self._reconnect_task.cancel()
+            await asyncio.gather(self._reconnect_task, return_exceptions=True)
+        await self._close_connection()
+        await self.engine.dispose()
+
+
+class InvalidationBus:
+    def __init__(self, *, coalesce_ms: float = 50, max_keys: int = 100) -> None:
+        self.coalesce = coalesce_ms / 1e3
+        self.max_keys = max_keys
+        # 消息来源标识, 用于跳过自己发出的消息; 启动时生成 (预派生的 worker 各不相同)
+        self.origin = ""
+        self._subscribers: dict[str, list[Subscriber]] = {}
+        # 实体 -> 待发送的 key 集合, None 表示整体失效
+        self._pending: dict[str, set | None] = {}
+        self._transport: Transport | None = None
+        self._flush_task: asyncio.Task | None = None
+
+    @property
+    def started(self) -> bool:
+        return self._transport is not None
+
+    def subscribe(self, entity: str, callback: Subscriber) -> None:
+        self._subscribers.setdefault(entity, []).append(callback)
+
+    def attach_cache(self, cache: TTLCache, entity: str) -> None:
+        """本地失效时广播，收到其它进程的事件时失效本地条目（不再回传）"""
+        cache.add_invalidation_hook(lambda name, key: self.publish(entity, key))
+
+        def on_event(key: Hashable | None) -> None:
+            if key is None:
+                cache.clear(propagate=False)
+            else:
+                cache.invalidate(key, propagate=False)
+
+        self.subscribe(entity, on_event)
+
+    def publish(self, entity: str, key: Hashable | None = None) -> None:
+        """登记实体变更，合并窗口结束后发送（提交之后调用）"""
+        if self._transport is None:
+            return
+        keys = self._pending.get(entity, set())
+        if keys is None:
+            INVALIDATION_EVENTS.inc(labels=("coalesced",))
+        elif key is None or len(keys) >= self.max_keys:
+            self._pending[entity] = None
+        else:
+            if key in keys:
+                INVALIDATION_EVENTS.inc(labels=("coalesced",))
+            keys.add(key)
+            self._pending[entity] = keys
+        if self._flush_task is None or self._flush_task.done():
+            # 独立的上下文: 发送不受触发请求的截止时间影响
+            self._flush_task = asyncio.create_task(
+                self._flush_later(),
+                name="invalidation-flush",
+                context=contextvars.Context(),
+            )
+
+    def encode(self, pending: dict[str, set | None]) -> str:
+        events = {
+            entity: None if keys is None else sorted(keys, key=str)
+            for entity, keys in pending.items()
+        }
+        payload = json.dumps({"o": self.origin, "e": events}, separators=(",", ":"))
+        if len(payload.encode()) > MAX_PAYLOAD:  # 放不下时整体失效
+            payload = json.dumps({"o": self.origin, "e": dict.fromkeys(events)})
+        return payload
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self.coalesce)
+        await self.flush()
+
+    async def flush(self) -> None:
+        if not self._pending or self._transport is None:
+            return
+        pending, self._pending = self._pending, {}
+        try:
+            await self._transport.send(self.encode(pending))
+            INVALIDATION_EVENTS.inc(labels=("sent",))
+        except Exception as e:
+            # 丢失的事件由缓存 TTL 兜底
+            INVALIDATION_EVENTS.inc(labels=("dropped",))
+            logger.error(f"发送缓存失效消息失败: {e!r}")
+
+    def _on_message(self, payload: str) -> None:
+        try:
+            message = json.loads(payload)
+            if message["o"] == self.origin:
+                return
+            events = message["e"]
+        except (ValueError, KeyError, TypeError):
+            logger.warning(f"无法解析的缓存失效消息: {payload[:200]!r}")
+            return
+        INVALIDATION_EVENTS.inc(labels=("received",))
+        for entity, keys in events.items():
+            for key in [None] if keys is None else keys:
+                self._deliver(entity, key)
+
+    def _deliver(self, entity: str, key: Hashable | None) -> None:
+        for callback in self._subscribers.get(entity, ()):
+            try:
+                callback(key)
+            except Exception as e:
+                logger.error(f"缓存失效回调出错 ({entity}): {e!r}")
+
+    def invalidate_all(self) -> None:
+        """让所有订阅方整体失效（传输断线重连后调用）"""
+        for entity in self._subscribers:
+            self._deliver(entity, None)
+
+    async def start(self, transport: Transport) -> None:
+        if self._transport is None:
+            self.origin = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+            await transport.start(self._on_message)
+            self._transport = transport
+
+    async def stop(self) -> None:
+        if self._transport is None:
+            return
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            await asyncio.gather(self._flush_task, return_exceptions=True)
+            self._flush_task = None
+        await self.flush()  # 停机前发出合并窗口内的事件
+        transport, self._transport = self._transport, None
+        await transport.stop()
+
+
+def create_transport(config: Settings, bus: InvalidationBus) -> Transport:
+    kind = config.invalidation_transport
+    if kind == "auto":
+        kind = "postgres" if config.db_type == "postgres" else "local"
+    if kind == "local":
+        return LocalTransport()
+    return PostgresTransport(
+        config.invalidation_url or config.database_url,
+        config.invalidation_channel,
+        on_reconnect=bus.invalidate_all,
+    )
+
+
+invalidation_bus = InvalidationBus(
+    coalesce_ms=settings.invalidation_coalesce_ms,
+    max_keys=settings.invalidation_max_keys,
+)
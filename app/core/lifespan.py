@@ -1,12 +1,25 @@
 import asyncio
 import signal
-from contextlib import asynccontextmanager
+import time
+from contextlib import asynccontextmanager, suppress
+from functools import partial
 
 from fastapi import FastAPI
 from loguru import logger
 
 from app.core.config import settings
-from app.core.database import create_db_and_tables, engine
+from app.core.database import DEFAULT_POOL, create_db_and_tables, databases
+from app.core.health import cache_check, database_check, health_monitor, tasks_check
+from app.core.invalidation import create_transport, invalidation_bus
+from app.core.logging import flush_logging
+from app.core.metrics import start_background_tasks, stop_background_tasks
+from app.core.reload import reload_settings
+from app.core.shutdown import ShutdownManager
+from app.core.slow_query import slow_query_log
+from app.core.warmup import start_warmup
+from app.core.watchdog import LoopWatchdog
+from app.foods.catalog import food_catalog
+from app.users.principal import principal_cache
 
 
 @asynccontextmanager
@@ -15,7 +28,8 @@ async def lifespan(app: FastAPI):
 
     行为：
     - 仅在 `settings.debug` 为 True 时自动创建 DB 表（开发/测试场景）。
-    - 在关闭时释放数据库引擎资源。生产环境应使用 Alembic 进行迁移。
+    - 在关闭时先排空请求与后台任务, 再释放数据库引擎资源 (只释放一次)。
+    - 生产环境应使用 Alembic 进行迁移。
     """
 
     logger.info("应用启动中, 开始初始化资源...")
@@ -28,28 +42,134 @@ async def lifespan(app: FastAPI):
             logger.error(f"调试模式下创建数据库表失败: {str(e)}")
             raise  # 启动失败，避免应用带错运行
 
-    # 注册信号处理器（捕获终止信号，确保优雅退出）
-    def register_shutdown_signals():
-        loop = asyncio.get_running_loop()
-        for sig in (signal.SIGTERM, signal.SIGINT):
-            loop.add_signal_handler(
-                sig, lambda: asyncio.create_task(_shutdown_handler())
+    # 优雅停机: 收到信号时只标记排空, 清理统一在下方 finally 中执行一次
+    shutdown = ShutdownManager.for_app(app)
+    loop = asyncio.get_running_loop()
+    previous_handlers = {}
+
+    def _signal_handler(signum, frame):
+        """信号触发: 开始排空, 再交给原处理器 (如 uvicorn) 停止接收新连接"""
+        loop.call_soon_threadsafe(shutdown.begin_drain)
+        previous = previous_handlers.get(signum)
+        if callable(previous):
+            previous(signum, frame)
+
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        try:
+            previous_handlers[sig] = signal.signal(sig, _signal_handler)
+        except ValueError:
+            pass  # 非主线程中无法注册信号处理器 (如部分测试场景)
+    logger.info("退出信号处理器已注册")
+
+    # SIGHUP: 重新读取配置, 热更新连接池与缓存参数
+    def _reload_handler():
+        shutdown.track(asyncio.create_task(_reload()))
+
+    async def _reload():
+        try:
+            await reload_settings()
+        except Exception as e:
+            logger.error(f"重新加载配置失败: {e!r}")
+
+    try:
+        loop.add_signal_handler(signal.SIGHUP, _reload_handler)
+    except (ValueError, NotImplementedError, AttributeError):
+        pass  # 非主线程或平台不支持 SIGHUP
+
+    # 指标后台任务（多 worker 快照写出）
+    metric_tasks = start_background_tasks() if settings.metrics_enabled else []
+    # 事件循环阻塞检测（同时提供 loop lag 指标）
+    watchdog = LoopWatchdog(
+        threshold_ms=settings.watchdog_threshold_ms,
+        interval=settings.watchdog_interval,
+    )
+    if settings.watchdog_enabled:
+        await watchdog.start()
+
+    def _background_tasks() -> dict[str, bool]:
+        running = {task.get_name(): not task.done() for task in metric_tasks}
+        if settings.watchdog_enabled:
+            running["watchdog"] = watchdog.running
+        return running
+
+    # 完整应用才需要的组件 (单独测试 lifespan 时 app 为 None)
+    warmup_task = None
+    if getattr(app, "state", None) is not None:
+        # 路由此时已全部挂载 (延迟导入的路由在 lifespan 事件到来时挂载),
+        # 预先生成 OpenAPI 文档, 避免第一个 /openapi.json 请求承担生成耗时
+        if settings.openapi_prebuild:
+            start = time.perf_counter()
+            app.openapi()
+            logger.info(
+                f"OpenAPI 文档已生成 ({(time.perf_counter() - start) * 1e3:.1f}ms)"
+            )
+
+        # 深度健康检查: 后台定期执行, /healthz 直接返回缓存结果
+        for name in (DEFAULT_POOL, *settings.db_pools):
+            health_monitor.add_check(
+                f"database:{name}",
+                database_check(partial(databases.engine, name)),
+            )
+        health_monitor.add_check(
+            "cache:principal", cache_check(principal_cache), critical=False
+        )
+        health_monitor.add_check(
+            "background", tasks_check(_background_tasks), critical=False
+        )
+        await health_monitor.start()
+
+        # 缓存失效总线: 连不上时只告警, 跨进程缓存依靠 TTL / 定期重建兜底
+        if settings.invalidation_enabled:
+            try:
+                await invalidation_bus.start(
+                    create_transport(settings, invalidation_bus)
+                )
+            except Exception as e:
+                logger.error(f"缓存失效总线启动失败: {e!r}")
+
+        # 食物目录共享缓存 (后台重建, 完成前查询数据库)
+        if settings.shared_catalog_enabled:
+            await food_catalog.start()
+
+        # 连接池预热 (后台执行, 完成前 /readyz 返回 503)
+        if settings.warmup_enabled:
+            warmup_task = start_warmup(
+                app,
+                databases,
+                connections=settings.warmup_connections,
+                pools=[DEFAULT_POOL, *settings.db_pools],
             )
-        logger.info("退出信号处理器已注册")
+        else:
+            app.state.warmed_up = True
 
-    async def _shutdown_handler():
-        """信号触发的关闭逻辑 (和finally逻辑一致)"""
-        logger.info("收到终止信号, 开始清理数据库资源...")
-        await engine.dispose()
-        logger.success("数据库引擎已销毁, 连接池资源释放完成")
+    async def _cancel_warmup():
+        if warmup_task is not None and not warmup_task.done():
+            warmup_task.cancel()
+            with suppress(asyncio.CancelledError):
+                await warmup_task
 
-    register_shutdown_signals()
+    # 停机回调按注册顺序执行: 先停后台循环、写出缓冲, 最后释放引擎
+    shutdown.on_shutdown(_cancel_warmup)
+    shutdown.on_shutdown(food_catalog.stop)
+    shutdown.on_shutdown(invalidation_bus.stop)  # 发出合并窗口内剩余的事件
+    shutdown.on_shutdown(health_monitor.stop)
+    shutdown.on_shutdown(lambda: stop_background_tasks(metric_tasks))
+    shutdown.on_shutdown(watchdog.stop)
+    shutdown.on_shutdown(slow_query_log.wait_explains)
+    shutdown.on_shutdown(databases.dispose_all)
 
     try:
         yield
 
     # 应用关闭阶段（无论是否异常，必执行）
     finally:
-        logger.info("应用开始关闭, 清理数据库引擎资源...")
-        await engine.dispose()
-        logger.success("数据库引擎已销毁, 连接池资源释放完成")
+        for sig, previous in previous_handlers.items():
+            # 原处理器不是从 Python 安装的时返回 None, 恢复为默认处理
+            signal.signal(sig, signal.SIG_DFL if previous is None else previous)
+        with suppress(ValueError, NotImplementedError, AttributeError):
+            loop.remove_signal_handler(signal.SIGHUP)
+        logger.info("应用开始关闭, 排空请求并清理数据库引擎资源...")
+        await shutdown.shutdown(settings.shutdown_timeout)
+        logger.success("数据库引擎已全部销毁, 连接池资源释放完成")
+        # 退出前写出队列中剩余的日志
+        await asyncio.to_thread(flush_logging)
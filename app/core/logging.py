@@ -0,0 +1,272 @@
+"""日志管道：loguru + 有界队列 + 后台写线程
+
+loguru 默认的 stderr sink 在调用线程内格式化并同步写出；错误风暴时
+`logger.exception` 的回溯格式化与 I/O 会直接阻塞事件循环。这里改为：
+
+- sink 只做准入判断并把 record 放入有界队列（`put_nowait`），队列满时丢弃并计数
+  （sink 可能在任意线程调用，丢弃数加锁累计，由指标采集器在事件循环线程写入）
+- 后台线程负责格式化（JSON 或文本，包括异常回溯）与写出
+- 按级别抽样（如 DEBUG 只保留 1%），重复的错误 / 异常在时间窗口内限流，
+  恢复后在下一条记录上附带被抑制的次数
+- 请求 ID：`RequestIdMiddleware` 读取或生成 `X-Request-ID`，通过 contextvar
+  注入每条日志的 `extra.request_id`，并写回响应头
+"""
+
+import json
+import os
+import queue
+import random
+import sys
+import threading
+import time
+import traceback
+import uuid
+from contextvars import ContextVar
+from typing import Any, Callable, TextIO
+
+from loguru import logger
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.metrics import REGISTRY
+
+LOG_DROPPED = REGISTRY.counter(
+    "log_records_dropped_total", "未写出的日志条数", ("reason",)
+)
+
+# 原因 -> 累计丢弃数; 指标本身无锁, 只能在事件循环线程修改
+_dropped: dict[str, int] = {}
+_dropped_lock = threading.Lock()
+
+
+def _count_dropped(reason: str) -> None:
+    with _dropped_lock:
+        _dropped[reason] = _dropped.get(reason, 0) + 1
+
+
+def _collect_dropped() -> None:
+    with _dropped_lock:
+        totals = list(_dropped.items())
+    for reason, total in totals:
+        LOG_DROPPED.set_total(total, (reason,))
+
+
+REGISTRY.add_collector(_collect_dropped)
+
+request_id_var: ContextVar[str | None] = ContextVar("request_id", default=None)
+
+_STOP = object()
+
+
+# ------------------ 请求 ID ------------------
+class RequestIdMiddleware:
+    header = "x-request-id"
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # 只接受合理长度的上游 ID，防止日志注入超长内容
+        incoming = Headers(scope=scope).get(self.header)
+        request_id = incoming if incoming and len(incoming) <= 128 else uuid.uuid4().hex
+        token = request_id_var.set(request_id)
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message)["X-Request-ID"] = request_id
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            request_id_var.reset(token)
+
+
+def _add_request_id(record: dict) -> None:
+    request_id = request_id_var.get()
+    if request_id is not None:
+        record["extra"].setdefault("request_id", request_id)
+
+
+# ------------------ 日志管道 ------------------
+class LogPipeline:
+    def __init__(
+        self,
+        *,
+        stream: TextIO | None = None,
+        json_format: bool = False,
+        queue_size: int = 10_000,
+        sample_rates: dict[str, float] | None = None,
+        dedup_window: float = 60.0,
+        dedup_burst: int = 5,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._stream = stream  # None 表示每次写出时取当前的 sys.stderr
+        self.json_format = json_format
+        self.sample_rates = {k.upper(): v for k, v in (sample_rates or {}).items()}
+        self.dedup_window = dedup_window
+        self.dedup_burst = dedup_burst
+        self._clock = clock
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        # 去重键 -> [窗口开始时间, 窗口内次数, 被抑制次数]
+        self._dedup: dict[tuple, list] = {}
+        self._thread: threading.Thread | None = None
+
+    # --- 调用线程：只做准入与入队 ---
+    def sink(self, message) -> None:
+        record = message.record
+        if not self._admit(record):
+            return
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            _count_dropped("queue_full")
+
+    def _admit(self, record: dict) -> bool:
+        rate = self.sample_rates.get(record["level"].name)
+        if rate is not None and rate < 1 and random.random() >= rate:
+            _count_dropped("sampled")
+            return False
+
+        exception = record["exception"]
+        if exception is None and record["level"].no < 40:  # 只对 ERROR 及以上限流
+            return True
+        what = exception.type.__name__ if exception else record["message"]
+        key = (record["name"], record["function"], record["line"], what)
+        now = self._clock()
+        state = self._dedup.get(key)
+        if state is None or now - state[0] >= self.dedup_window:
+            suppressed = state[2] if state else 0
+            self._dedup[key] = [now, 1, 0]
+            if suppressed:
+                record["extra"]["suppressed_duplicates"] = suppressed
+            if len(self._dedup) > 10_000:  # 防止键无限增长
+                self._dedup.clear()
+            return True
+        state[1] += 1
+        if state[1] <= self.dedup_burst:
+            return True
+        state[2] += 1
+        _count_dropped("rate_limited")
+        return False
+
+    # --- 写线程：格式化与 I/O ---
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name="log-writer", daemon=True
+            )
+            self._thread.start()
+
+    def _after_fork(self) -> None:
+        # 子进程中没有写线程 (fork 只复制调用线程), 队列的锁也可能处于持有状态
+        global _dropped_lock
+        _dropped_lock = threading.Lock()
+        self._queue = queue.Queue(maxsize=self._queue.maxsize)
+        self._thread = None
+        self.start()
+
+    def flush(self) -> None:
+        """等待队列中的日志全部写出"""
+        if self._thread is not None:
+            self._queue.join()
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._queue.put(_STOP)
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while True:
+            record = self._queue.get()
+            try:
+                if record is _STOP:
+                    return
+                stream = self._stream or sys.stderr
+                stream.write(self.format(record))
+                if self._queue.empty():
+                    stream.flush()
+            except (ValueError, OSError):
+                pass  # 输出流已关闭（如测试结束），丢弃
+            finally:
+                self._queue.task_done()
+
+    def format(self, record: dict) -> str:
+        exception = record["exception"]
+        exc_text = (
+            "".join(
+                traceback.format_exception(
+                    exception.type, exception.value, exception.traceback
+                )
+            )
+            if exception
+            else None
+        )
+        if self.json_format:
+            payload: dict[str, Any] = {
+                "time": record["time"].isoformat(),
+                "level": record["level"].name,
+                "message": record["message"],
+                "logger": record["name"],
+                "function": record["function"],
+                "line": record["line"],
+                **record["extra"],
+            }
+            if exc_text:
+                payload["exception"] = exc_text
+            return json.dumps(payload, ensure_ascii=False, default=str) + "\n"
+
+        extra = record["extra"]
+        rid = f" [{extra['request_id']}]" if "request_id" in extra else ""
+        line = (
+            f"{record['time']:%Y-%m-%d %H:%M:%S.%f}"[:-3]
+            + f" | {record['level'].name:<8} |{rid} "
+            f"{record['name']}:{record['function']}:{record['line']} - "
+            f"{record['message']}"
+        )
+        if "suppressed_duplicates" in extra:
+            line += f" (suppressed {extra['suppressed_duplicates']} duplicates)"
+        return line + "\n" + (exc_text or "")
+
+
+_pipeline: LogPipeline | None = None
+
+
+def setup_logging() -> LogPipeline:
+    """用管道替换 loguru 的默认 sink（重复调用只配置一次）"""
+    global _pipeline
+    if _pipeline is not None:
+        return _pipeline
+    _pipeline = LogPipeline(
+        json_format=settings.log_json,
+        queue_size=settings.log_queue_size,
+        sample_rates=settings.log_sample_rates,
+        dedup_window=settings.log_dedup_window,
+        dedup_burst=settings.log_dedup_burst,
+    )
+    _pipeline.start()
+    # 预派生多 worker (app.launcher): fork 前写完已入队的日志, 子进程重建写线程
+    os.register_at_fork(before=_pipeline.flush, after_in_child=_pipeline._after_fork)
+    logger.remove()
+    logger.configure(patcher=_add_request_id)
+    logger.add(
+        _pipeline.sink,
+        level=settings.log_level,
+        # 调用线程只生成 record，消息与回溯的格式化都在写线程完成
+        format=lambda record: "{message}",
+        backtrace=False,
+        diagnose=False,
+        catch=False,
+    )
+    return _pipeline
+
+
+def flush_logging() -> None:
+    if _pipeline is not None:
+        _pipeline.flush()
@@ -0,0 +1,552 @@
+"""Prometheus 指标：进程内计数器 + 纯 ASGI 中间件 + `/metrics` 导出
+
+- 请求：按路由模板统计延迟直方图、进行中请求数
+- 数据库：语句数与耗时、每个请求的语句数（由 `app.core.query_stats` 写入）
+- 连接池：取连接耗时（含排队等待）、排队中的协程数、池大小 / 已借出 / 溢出连接数
+- 缓存：已登记的 `TTLCache` 的命中 / 未命中次数与条目数
+- 事件循环：延迟与阻塞次数（由 `app.core.watchdog` 的心跳写入）
+
+所有指标只在事件循环线程内修改与读取（连接池的 `_do_get` 也运行在该线程的
+greenlet 中），因此直接对字典中的数值做加法，无需加锁。快照（含采集器）总是在
+事件循环中生成，只有 JSON 编码、文件读写与文本渲染放到线程中执行。
+
+多 worker 部署时设置 `metrics_multiprocess_dir`：各 worker 定期把快照写到该目录，
+任一 worker 响应 `/metrics` 时汇总全部文件。计数器与直方图求和（已退出 worker
+的累计值保留，避免计数回退），仪表盘按各自的 `mode` 求和或取最大值，只统计存活的 worker。
+新 worker 复用了已退出 worker 的 pid 时，先把旧文件改名归档再写入，不会覆盖其计数。
+"""
+
+import asyncio
+import bisect
+import json
+import math
+import os
+import time
+from contextlib import suppress
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Callable, Iterable, Literal
+
+from fastapi import APIRouter
+from loguru import logger
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+# 默认延迟分桶（秒），覆盖 1ms ~ 10s
+DEFAULT_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+UNMATCHED_ROUTE = "<unmatched>"  # 未匹配路由统一归为一类，防止标签基数爆炸
+
+Labels = tuple[str, ...]
+
+
+# ------------------ 指标类型 ------------------
+class Metric:
+    type = "untyped"
+
+    def __init__(
+        self, name: str, documentation: str, labelnames: Iterable[str] = ()
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: dict[Labels, object] = {}
+
+    def snapshot(self) -> dict:
+        return {
+            "type": self.type,
+            "help": self.documentation,
+            "labelnames": list(self.labelnames),
+            "values": [[list(k), v] for k, v in self._values.items()],
+        }
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, amount: float = 1, labels: Labels = ()) -> None:
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def set_total(self, value: float, labels: Labels = ()) -> None:
+        """采集器使用：直接写入外部维护的累计值（如缓存命中数）"""
+        self._values[labels] = value
+
+
+class Gauge(Metric):
+    type = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        mode: Literal["sum", "max"] = "sum",
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.mode = mode  # 多 worker 汇总方式
+
+    def set(self, value: float, labels: Labels = ()) -> None:
+        self._values[labels] = value
+
+    def inc(self, amount: float = 1, labels: Labels = ()) -> None:
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, amount: float = 1, labels: Labels = ()) -> None:
+        self._values[labels] = self._values.get(labels, 0) - amount
+
+    def snapshot(self) -> dict:
+        return {**super().snapshot(), "mode": self.mode}
+
+
+class Histogram(Metric):
+    """固定分桶直方图；每个标签组合保存 [各桶计数(非累计)..., +Inf 桶, sum]"""
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, labels: Labels = ()) -> None:
+        state = self._values.get(labels)
+        if state is None:
+            state = self._values[labels] = [0] * (len(self.buckets) + 2)
+        state[bisect.bisect_left(self.buckets, value)] += 1
+        state[-1] += value
+
+    def snapshot(self) -> dict:
+        snapshot = super().snapshot()
+        # 复制各桶计数, 快照交给其它线程编码时不受后续 observe 影响
+        snapshot["values"] = [[k, list(v)] for k, v in snapshot["values"]]
+        return {**snapshot, "buckets": list(self.buckets)}
+
+
+class Registry:
+    """指标注册表；同名指标只创建一次，重复调用 `create_app` 不会产生重复指标"""
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, Metric] = {}
+        self._collectors: list[Callable[[], None]] = []
+
+    def _get_or_create(self, cls: type[Metric], name: str, *args, **kwargs):
+        metric = self._metrics.get(name)
+        if metric is None:
+            metric = self._metrics[name] = cls(name, *args, **kwargs)
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames=()) -> Counter:
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames=(), mode="sum") -> Gauge:
+        return self._get_or_create(Gauge, name, documentation, labelnames, mode=mode)
+
+    def histogram(
+        self, name: str, documentation: str, labelnames=(), buckets=DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._get_or_create(
+            Histogram, name, documentation, labelnames, buckets=buckets
+        )
+
+    def add_collector(self, collector: Callable[[], None]) -> None:
+        """注册采集器：导出前调用，用于把外部状态（连接池、缓存）同步到指标"""
+        self._collectors.append(collector)
+
+    def remove_collector(self, collector: Callable[[], None]) -> None:
+        if collector in self._collectors:
+            self._collectors.remove(collector)
+
+    def snapshot(self) -> dict[str, dict]:
+        for collector in self._collectors:
+            try:
+                collector()
+            except Exception as e:  # 单个采集器失败不影响其它指标
+                logger.warning(f"指标采集失败: {e!r}")
+        return {name: m.snapshot() for name, m in self._metrics.items()}
+
+
+REGISTRY = Registry()
+
+HTTP_REQUEST_DURATION = REGISTRY.histogram(
+    "http_request_duration_seconds",
+    "HTTP 请求处理耗时",
+    ("method", "route", "status"),
+)
+HTTP_REQUESTS_IN_FLIGHT = REGISTRY.gauge(
+    "http_requests_in_flight", "正在处理的 HTTP 请求数"
+)
+HTTP_REQUEST_QUERIES = REGISTRY.histogram(
+    "http_request_db_queries",
+    "单个请求执行的 SQL 语句数",
+    ("method", "route"),
+    buckets=QUERY_BUCKETS,
+)
+DB_QUERIES = REGISTRY.counter("db_queries_total", "执行的 SQL 语句总数", ("pool",))
+DB_QUERY_SECONDS = REGISTRY.counter(
+    "db_query_seconds_total", "SQL 语句累计执行耗时", ("pool",)
+)
+QUERY_GUARD_VIOLATIONS = REGISTRY.counter(
+    "db_query_guard_violations_total",
+    "超出语句预算或疑似 N+1 的请求数",
+    ("route", "kind"),
+)
+DB_POOL_CHECKOUT = REGISTRY.histogram(
+    "db_pool_checkout_seconds",
+    "从连接池取得连接的耗时（含排队等待与新建连接）",
+    ("pool",),
+)
+DB_POOL_WAITING = REGISTRY.gauge(
+    "db_pool_waiting", "正在等待连接池分配连接的协程数", ("pool",)
+)
+DB_POOL_SIZE = REGISTRY.gauge("db_pool_size", "连接池基础大小", ("pool",))
+DB_POOL_CHECKED_OUT = REGISTRY.gauge("db_pool_checked_out", "已借出的连接数", ("pool",))
+DB_POOL_OVERFLOW = REGISTRY.gauge(
+    "db_pool_overflow", "超出 pool_size 的连接数（负数表示尚未建满）", ("pool",)
+)
+CACHE_HITS = REGISTRY.counter("cache_hits_total", "缓存命中次数", ("cache",))
+CACHE_MISSES = REGISTRY.counter("cache_misses_total", "缓存未命中次数", ("cache",))
+CACHE_ENTRIES = REGISTRY.gauge("cache_entries", "缓存条目数", ("cache",))
+EVENT_LOOP_LAG = REGISTRY.gauge(
+    "event_loop_lag_seconds", "最近一次采样的事件循环延迟", mode="max"
+)
+EVENT_LOOP_LAG_HISTOGRAM = REGISTRY.histogram(
+    "event_loop_lag_distribution_seconds", "事件循环延迟分布"
+)
+EVENT_LOOP_BLOCKS = REGISTRY.counter(
+    "event_loop_blocks_total", "事件循环阻塞超过阈值的次数"
+)
+
+
+# ------------------ Prometheus 文本格式 ------------------
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str]) -> str:
+    pairs = [f'{n}="{_escape(str(v))}"' for n, v in zip(names, values)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def render(snapshot: dict[str, dict]) -> str:
+    """把快照渲染为 Prometheus 文本格式 (0.0.4)"""
+    lines: list[str] = []
+    for name, metric in snapshot.items():
+        lines.append(f"# HELP {name} {metric['help']}")
+        lines.append(f"# TYPE {name} {metric['type']}")
+        labelnames = metric["labelnames"]
+        for labels, value in metric["values"]:
+            if metric["type"] != "histogram":
+                lines.append(
+                    f"{name}{_format_labels(labelnames, labels)} {_format_value(value)}"
+                )
+                continue
+            cumulative = 0
+            bounds = [*metric["buckets"], math.inf]
+            for bound, count in zip(bounds, value[:-1]):
+                cumulative += count
+                le = _format_labels(
+                    [*labelnames, "le"], [*labels, _format_value(bound)]
+                )
+                lines.append(f"{name}_bucket{le} {cumulative}")
+            base = _format_labels(labelnames, labels)
+            lines.append(f"{name}_sum{base} {_format_value(value[-1])}")
+            lines.append(f"{name}_count{base} {cumulative}")
+    return "\n".join(lines) + "\n"
+
+
+# ------------------ 多 worker 汇总 ------------------
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class MultiprocessStore:
+    """每个 worker 一个 JSON 快照文件（原子替换写入），读取时合并
+
+    已退出 worker 的文件（包括 pid 被复用时归档的 `retired-*.json`）只贡献计数器与直方图
+    """
+
+    # 本进程已接管的快照文件；fork 后子进程的 pid 不同，不会误认
+    _claimed: set[Path] = set()
+
+    def __init__(self, directory: str | os.PathLike) -> None:
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def write(self, snapshot: dict[str, dict], pid: int | None = None) -> None:
+        pid = pid or os.getpid()
+        target = self.directory / f"metrics-{pid}.json"
+        if target not in self._claimed:
+            # 首次写入时已存在的同名文件属于复用了该 pid 的已退出 worker
+            with suppress(FileNotFoundError):
+                os.replace(
+                    target, self.directory / f"retired-{pid}-{time.time_ns()}.json"
+                )
+            self._claimed.add(target)
+        tmp = target.with_suffix(".tmp")
+        tmp.write_text(json.dumps(snapshot), encoding="utf-8")
+        os.replace(tmp, target)
+
+    def _snapshots(self) -> Iterable[tuple[bool, dict[str, dict]]]:
+        """(是否存活, 快照)"""
+        for path in sorted(self.directory.glob("*.json")):
+            kind, _, pid = path.stem.partition("-")
+            try:
+                if kind == "metrics":
+                    alive = _pid_alive(int(pid))
+                elif kind == "retired":
+                    alive = False
+                else:
+                    continue
+                snapshot = json.loads(path.read_text("utf-8"))
+            except (ValueError, OSError):
+                continue  # 正在被替换或已损坏的文件，下次再读
+            yield alive, snapshot
+
+    def collect(self) -> dict[str, dict]:
+        merged: dict[str, dict] = {}
+        for alive, snapshot in self._snapshots():
+            for name, metric in snapshot.items():
+                if metric["type"] == "gauge" and not alive:
+                    continue
+                target = merged.setdefault(name, {**metric, "values": {}})
+                values = target["values"]
+                for labels, value in metric["values"]:
+                    key = tuple(labels)
+                    previous = values.get(key)
+                    if previous is None:
+                        values[key] = value
+                    elif metric["type"] == "histogram":
+                        values[key] = [a + b for a, b in zip(previous, value)]
+                    elif metric.get("mode") == "max":
+                        values[key] = max(previous, value)
+                    else:
+                        values[key] = previous + value
+        for metric in merged.values():
+            metric["values"] = [[list(k), v] for k, v in metric["values"].items()]
+        return merged
+
+
+def _store() -> MultiprocessStore | None:
+    if not settings.metrics_multiprocess_dir:
+        return None
+    return MultiprocessStore(settings.metrics_multiprocess_dir)
+
+
+def collect_metrics(snapshot: dict[str, dict]) -> str:
+    """当前进程（或多 worker 汇总后）的指标文本；只做文件读写与渲染，可在线程中执行"""
+    store = _store()
+    if store is not None:
+        store.write(snapshot)
+        snapshot = store.collect()
+    return render(snapshot)
+
+
+router = APIRouter()
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics() -> Response:
+    # 快照在事件循环中生成 (采集器读取连接池与缓存), 汇总与渲染放到线程
+    body = await asyncio.to_thread(collect_metrics, REGISTRY.snapshot())
+    return Response(body, media_type=CONTENT_TYPE)
+
+
+# ------------------ 请求指标中间件 ------------------
+
+
+class MetricsMiddleware:
+    def __init__(self, app: ASGIApp, *, exclude_paths: Iterable[str] = ("/metrics",)):
+        self.app = app
+        self.exclude_paths = frozenset(exclude_paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.exclude_paths:
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500  # 未发出响应头就抛异常时按 500 统计
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        HTTP_REQUESTS_IN_FLIGHT.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            HTTP_REQUESTS_IN_FLIGHT.dec()
+            # 路由匹配后 FastAPI 会把 APIRoute 写入 scope，取其模板（如 /foods/{food_id}）
+            route = getattr(scope.get("route"), "path", UNMATCHED_ROUTE)
+            method = scope["method"]
+            HTTP_REQUEST_DURATION.observe(elapsed, (method, route, str(status_code)))
+
+
+# ------------------ 数据库 / 连接池 ------------------
+# 当前请求累计的取连接耗时（秒）；由准入控制设置并读取，作为过载信号
+pool_wait_var: ContextVar[list[float] | None] = ContextVar("pool_wait", default=None)
+
+
+class InstrumentedAsyncAdaptedQueuePool(AsyncAdaptedQueuePool):
+    """记录取连接耗时与排队协程数的连接池"""
+
+    metrics_label = "default"
+
+    def _will_wait(self) -> bool:
+        """没有空闲连接且不能再溢出新建时，取连接需要排队"""
+        return (
+            self._pool.empty()
+            and self._max_overflow > -1
+            and self._overflow >= self._max_overflow
+        )
+
+    def _do_get(self):
+        labels = (self.metrics_label,)
+        waiting = self._will_wait()
+        if waiting:
+            DB_POOL_WAITING.inc(labels=labels)
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            elapsed = time.perf_counter() - start
+            if waiting:
+                DB_POOL_WAITING.dec(labels=labels)
+            DB_POOL_CHECKOUT.observe(elapsed, labels)
+            waited = pool_wait_var.get()
+            if waited is not None:
+                waited[0] += elapsed
+
+    def recreate(self):
+        # engine.dispose() 会重建连接池，保留标签
+        pool = super().recreate()
+        pool.metrics_label = self.metrics_label
+        return pool
+
+
+def instrument_engine(engine: AsyncEngine, name: str = "default") -> None:
+    """为引擎的连接池挂上采集（重复调用无副作用）
+
+    语句数与耗时由 `app.core.query_stats.track_statements` 统计
+    """
+    sync_engine = engine.sync_engine
+    if getattr(sync_engine, "_metrics_label", None) is not None:
+        return
+    sync_engine._metrics_label = name
+    if isinstance(engine.pool, InstrumentedAsyncAdaptedQueuePool):
+        engine.pool.metrics_label = name
+
+    labels = (name,)
+
+    def collect_pool() -> None:
+        pool = engine.pool
+        if not hasattr(pool, "checkedout"):
+            return  # StaticPool / NullPool 没有池容量概念
+        DB_POOL_SIZE.set(pool.size(), labels)
+        DB_POOL_CHECKED_OUT.set(pool.checkedout(), labels)
+        DB_POOL_OVERFLOW.set(pool.overflow(), labels)
+
+    sync_engine._metrics_collector = collect_pool
+    REGISTRY.add_collector(collect_pool)
+
+
+def uninstrument_engine(engine: AsyncEngine) -> None:
+    """移除引擎的连接池采集（引擎被替换或释放后调用）"""
+    collector = getattr(engine.sync_engine, "_metrics_collector", None)
+    if collector is not None:
+        REGISTRY.remove_collector(collector)
+        engine.sync_engine._metrics_collector = None
+
+
+def watch_cache(cache: TTLCache) -> None:
+    """导出 TTLCache 的命中率与条目数"""
+    labels = (cache.name,)
+
+    def collect_cache() -> None:
+        CACHE_HITS.set_total(cache.hits, labels)
+        CACHE_MISSES.set_total(cache.misses, labels)
+        CACHE_ENTRIES.set(len(cache), labels)
+
+    REGISTRY.add_collector(collect_cache)
+
+
+# ------------------ 后台任务 ------------------
+async def flush_periodically(store: MultiprocessStore, interval: float) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        snapshot = REGISTRY.snapshot()  # 在事件循环中生成, 线程中只编码与写文件
+        try:
+            await asyncio.to_thread(store.write, snapshot)
+        except OSError as e:
+            logger.warning(f"写出指标快照失败: {e!r}")
+
+
+def start_background_tasks() -> list[asyncio.Task]:
+    tasks = []
+    store = _store()
+    if store is not None:
+        tasks.append(
+            asyncio.create_task(
+                flush_periodically(store, settings.metrics_flush_interval),
+                name="metrics-flush",
+            )
+        )
+    return tasks
+
+
+async def stop_background_tasks(tasks: list[asyncio.Task]) -> None:
+    for task in tasks:
+        task.cancel()
+    for task in tasks:
+        with suppress(asyncio.CancelledError):
+            await task
+    store = _store()
+    if tasks and store is not None:
+        # 退出前写出最后一次快照, 避免丢失最近一个周期的计数
+        snapshot = REGISTRY.snapshot()
+        try:
+            await asyncio.to_thread(store.write, snapshot)
+        except OSError as e:
+            logger.warning(f"写出指标快照失败: {e!r}")
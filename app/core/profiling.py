@@ -0,0 +1,105 @@
+"""按需请求剖析：对单个请求运行 pyinstrument 采样剖析器并输出火焰图文件
+
+触发条件（满足其一）：
+- 请求头 `X-Profile` 的值等于 `admin_token`（未配置令牌时不接受请求头触发）
+- 按 `profiling_sample_rate` 随机抽样
+
+结果写入 `profiling_dir`，文件名包含时间、方法、路由模板与耗时，例如
+`20250101T120000-GET-foods-412ms.speedscope.json`，可直接拖入 https://www.speedscope.app
+查看；`profiling_format=html` 时输出 pyinstrument 自带的 HTML 报告。
+
+`profiling_enabled=False`（默认）时中间件不会被注册，对请求没有任何额外开销；
+pyinstrument 为可选依赖（`pip install pyinstrument`），未安装时同样不注册。
+"""
+
+import asyncio
+import random
+import re
+import secrets
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Literal
+
+from loguru import logger
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.metrics import UNMATCHED_ROUTE
+
+try:  # 可选依赖：pip install pyinstrument
+    from pyinstrument import Profiler
+    from pyinstrument.renderers import HTMLRenderer, SpeedscopeRenderer
+except ImportError:  # pragma: no cover - 取决于运行环境
+    Profiler = None
+
+ProfileFormat = Literal["speedscope", "html"]
+_SLUG = re.compile(r"[^A-Za-z0-9]+")
+
+
+def profiling_available() -> bool:
+    return Profiler is not None
+
+
+def profile_filename(
+    method: str, route: str, elapsed: float, fmt: ProfileFormat
+) -> str:
+    slug = _SLUG.sub("-", route).strip("-") or "root"
+    stamp = datetime.now().strftime("%Y%m%dT%H%M%S")
+    suffix = "speedscope.json" if fmt == "speedscope" else "html"
+    return f"{stamp}-{method}-{slug}-{elapsed * 1e3:.0f}ms.{suffix}"
+
+
+class ProfilingMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        directory: str | Path,
+        token: str = "",
+        sample_rate: float = 0.0,
+        interval: float = 0.001,
+        fmt: ProfileFormat = "speedscope",
+    ) -> None:
+        self.app = app
+        self.directory = Path(directory)
+        self.token = token
+        self.sample_rate = sample_rate
+        self.interval = interval
+        self.fmt = fmt
+
+    def should_profile(self, scope: Scope) -> bool:
+        if self.token:
+            value = Headers(scope=scope).get("x-profile")
+            if value and secrets.compare_digest(value, self.token):
+                return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        # async_mode="enabled"：只采样当前请求所在的任务，其它并发请求不计入
+        profiler = Profiler(interval=self.interval, async_mode="enabled")
+        start = time.perf_counter()
+        profiler.start()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            profiler.stop()
+            elapsed = time.perf_counter() - start
+            route = getattr(scope.get("route"), "path", UNMATCHED_ROUTE)
+            path = self.directory / profile_filename(
+                scope["method"], route, elapsed, self.fmt
+            )
+            try:
+                await asyncio.to_thread(self._write, profiler, path)
+                logger.info(f"请求剖析已保存: {path}")
+            except Exception as e:  # 剖析结果写入失败不影响请求
+                logger.warning(f"请求剖析写入失败: {e!r}")
+
+    def _write(self, profiler: "Profiler", path: Path) -> None:
+        renderer = SpeedscopeRenderer() if self.fmt == "speedscope" else HTMLRenderer()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(profiler.output(renderer), encoding="utf-8")
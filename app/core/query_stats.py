@@ -0,0 +1,213 @@
+"""请求级 SQL 统计与 N+1 检测（基于 SQLAlchemy cursor 事件）
+
+- 每个请求统计执行的语句数与数据库耗时，写入 `Server-Timing` 响应头
+- 同一请求内相同结构的语句重复出现 `n_plus_one_threshold` 次以上时视为 N+1
+  （典型场景：遍历结果时逐个触发 `Profile.reminders` / `RefreshToken.user` 懒加载）
+- 路由可用 `@query_budget(n)` 声明语句数上限；测试环境设置
+  `QUERY_GUARD_MODE=raise` 后，超出预算或出现 N+1 会直接让测试失败
+
+语句按原始 SQL 文本计数（参数已绑定为占位符，同一结构的文本相同），
+仅在需要报告时才调用 `fingerprint` 做归一化，避免每条语句都跑正则。
+"""
+
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterator, Literal, TypeVar
+
+from loguru import logger
+from sqlalchemy import Connection, event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.metrics import (
+    DB_QUERIES,
+    DB_QUERY_SECONDS,
+    HTTP_REQUEST_QUERIES,
+    QUERY_GUARD_VIOLATIONS,
+    UNMATCHED_ROUTE,
+)
+
+F = TypeVar("F", bound=Callable)
+
+_WHITESPACE = re.compile(r"\s+")
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(
+    r"\(\s*(?:\?|%s|\$\d+|:\w+)(?:\s*,\s*(?:\?|%s|\$\d+|:\w+))+\s*\)"
+)
+
+
+def fingerprint(statement: str) -> str:
+    """SQL 归一化：去掉字面量、合并 IN 列表，使同一结构的语句得到相同的指纹"""
+    sql = _WHITESPACE.sub(" ", statement).strip()
+    sql = _STRING.sub("?", sql)
+    sql = _PLACEHOLDER_LIST.sub("(...)", sql)
+    sql = _NUMBER.sub("?", sql)
+    return sql
+
+
+class QueryBudgetExceeded(AssertionError):
+    """请求的 SQL 语句数超出预算或出现 N+1（仅 `raise` 模式下抛出）"""
+
+
+@dataclass(slots=True)
+class QueryStats:
+    count: int = 0
+    duration: float = 0.0  # 秒
+    statements: Counter[str] = field(default_factory=Counter)
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        """重复次数达到阈值的语句结构（按指纹合并）"""
+        if threshold <= 0 or self.count < threshold:
+            return []
+        shapes: Counter[str] = Counter()
+        for statement, n in self.statements.items():
+            shapes[fingerprint(statement)] += n
+        return [(shape, n) for shape, n in shapes.most_common() if n >= threshold]
+
+    def server_timing(self) -> str:
+        return f'db;dur={self.duration * 1e3:.2f};desc="{self.count} queries"'
+
+
+_current: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+# 执行选项：内部簿记语句（如截止时间下推）带上后不计入任何统计，也不交给观察者，
+# 否则每个事务都会多出一条语句，触发 `@query_budget` 并干扰 N+1 / 慢查询统计
+UNTRACKED = "query_stats_untracked"
+
+# 每条语句执行完后的回调 (连接, SQL, 参数, 耗时秒, 是否 executemany)，如慢查询日志
+StatementObserver = Callable[[Connection, str, Any, float, bool], None]
+statement_observers: list[StatementObserver] = []
+
+
+def current_stats() -> QueryStats | None:
+    return _current.get()
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """在代码块内统计 SQL（测试与基准中使用）"""
+    stats = QueryStats()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+def track_statements(engine: AsyncEngine, name: str = "default") -> None:
+    """为引擎注册 cursor 事件（重复调用无副作用）"""
+    sync_engine = engine.sync_engine
+    if getattr(sync_engine, "_query_stats_label", None) is not None:
+        return
+    sync_engine._query_stats_label = name
+    labels = (name,)
+
+    # 开始时间记在本次执行的 context 上 (监听器内可能嵌套执行其它语句), 语句出错时
+    # 不会触发 after_cursor_execute, 开始时间随 context 一起丢弃, 不会在连接上累积。
+    # 没有 context 的内部执行 (个别方言的序列预取) 不计入统计
+    def before_cursor_execute(conn, cursor, statement, parameters, context, many):
+        if context is not None:
+            context._query_start = time.perf_counter()
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, many):
+        if context is None or context.execution_options.get(UNTRACKED):
+            return
+        elapsed = time.perf_counter() - context._query_start
+        DB_QUERIES.inc(labels=labels)
+        DB_QUERY_SECONDS.inc(elapsed, labels=labels)
+        stats = _current.get()
+        if stats is not None:
+            stats.count += 1
+            stats.duration += elapsed
+            stats.statements[statement] += 1
+        for observer in statement_observers:
+            observer(conn, statement, parameters, elapsed, many)
+
+    event.listen(sync_engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", after_cursor_execute)
+
+
+def query_budget(limit: int) -> Callable[[F], F]:
+    """声明路由的 SQL 语句数上限（放在 `@router.get(...)` 下方）"""
+
+    def decorator(endpoint: F) -> F:
+        endpoint.__query_budget__ = limit
+        return endpoint
+
+    return decorator
+
+
+class QueryStatsMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        server_timing: bool = True,
+        n_plus_one_threshold: int = 5,
+        default_budget: int = 0,
+        mode: Literal["log", "raise"] = "log",
+    ) -> None:
+        self.app = app
+        self.server_timing = server_timing
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.default_budget = default_budget
+        self.mode = mode
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = _current.set(stats)
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start" and self.server_timing:
+                # 流式响应开始后执行的语句不会计入响应头
+                MutableHeaders(scope=message).append(
+                    "Server-Timing", stats.server_timing()
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            HTTP_REQUEST_QUERIES.observe(
+                stats.count, (scope["method"], self._route_path(scope))
+            )
+        self.check(scope, stats)
+
+    @staticmethod
+    def _route_path(scope: Scope) -> str:
+        return getattr(scope.get("route"), "path", UNMATCHED_ROUTE)
+
+    def check(self, scope: Scope, stats: QueryStats) -> None:
+        route = scope.get("route")
+        budget = getattr(
+            getattr(route, "endpoint", None), "__query_budget__", self.default_budget
+        )
+        path = self._route_path(scope)
+        label = f"{scope['method']} {path}"
+
+        problems: list[tuple[str, str]] = []
+        if budget and stats.count > budget:
+            problems.append(
+                ("budget", f"{label}: {stats.count} queries, budget {budget}")
+            )
+        for shape, n in stats.repeated(self.n_plus_one_threshold):
+            problems.append(("n_plus_one", f"{label}: possible N+1, {n}x {shape}"))
+        if not problems:
+            return
+
+        for kind, message in problems:
+            QUERY_GUARD_VIOLATIONS.inc(labels=(path, kind))
+            logger.warning(message)
+        if self.mode == "raise":
+            raise QueryBudgetExceeded("; ".join(message for _, message in problems))
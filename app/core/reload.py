@@ -0,0 +1,123 @@
+"""运行时重新加载配置（无需重启）
+
+连接池与缓存参数原本只在启动时读取一次，调参只能重新发布。这里支持：
+
+- 连接池参数：按新参数重建已创建的引擎，预热后切换，新请求立即使用新连接池；
+  旧连接池等借出的连接全部归还后再释放（见 `DatabaseRegistry.reload`）
+- 缓存容量 / TTL 等：各模块用 `on_reload` 注册回调，原地调整
+- 其它字段需要重启才能生效：接口请求中出现时拒绝，SIGHUP 时忽略并告警
+
+触发方式：`POST /admin/reload`（请求体为要覆盖的字段，省略时重新读取
+环境变量与 .env），或向进程发送 SIGHUP（重新读取环境变量与 .env）。
+"""
+
+import asyncio
+import inspect
+from typing import Any, Callable
+
+from loguru import logger
+
+from app.core.config import Settings, settings
+from app.core.database import databases
+from app.core.warmup import registered_queries, warm_engine
+
+# 修改后需要重建引擎的字段
+POOL_FIELDS = frozenset(
+    {
+        "pool_size",
+        "max_overflow",
+        "pool_timeout",
+        "pool_recycle",
+        "pool_use_lifo",
+        "db_pools",
+        "pgbouncer_mode",
+        "pgbouncer_app_pool_size",
+        "echo",
+    }
+)
+
+
+class ReloadError(RuntimeError):
+    """重建连接池失败；全局配置与现有连接池保持不变"""
+
+
+# (关心的字段, 回调)
+_hooks: list[tuple[frozenset[str], Callable[[Settings], Any]]] = []
+_lock = asyncio.Lock()
+
+
+def on_reload(fields: set[str], callback: Callable[[Settings], Any]) -> None:
+    """注册重新加载回调：`fields` 中任一字段变化时以新配置调用（可为协程函数）"""
+    _hooks.append((frozenset(fields), callback))
+
+
+def reloadable_fields() -> frozenset[str]:
+    return POOL_FIELDS.union(*(fields for fields, _ in _hooks))
+
+
+async def _prepare(name: str, engine) -> None:
+    if settings.warmup_enabled:
+        await warm_engine(
+            engine,
+            connections=settings.warmup_connections,
+            queries=registered_queries(name),
+        )
+
+
+async def reload_settings(overrides: dict[str, Any] | None = None) -> dict[str, Any]:
+    """应用新配置，返回变化的字段、重建的连接池与被忽略的字段
+
+    `overrides` 为 None 时重新读取环境变量与 .env；否则在当前配置上覆盖，
+    其中包含不支持热更新的字段时抛出 ValueError。
+    连接池先按新配置重建并预热，成功后才写入全局配置并调用回调；
+    重建失败时抛出 ReloadError，配置不变，之后可以重试
+    """
+    allowed = reloadable_fields()
+    async with _lock:
+        if overrides is None:
+            new = Settings()
+        else:
+            unsupported = sorted(set(overrides) - allowed)
+            if unsupported:
+                raise ValueError(f"fields require a restart: {', '.join(unsupported)}")
+            current = settings.model_dump(exclude=set(Settings.model_computed_fields))
+            new = Settings(**{**current, **overrides})
+
+        fields = set(Settings.model_fields)
+        differs = {f for f in fields if getattr(new, f) != getattr(settings, f)}
+        ignored = sorted(differs - allowed)
+        if ignored:
+            logger.warning(f"以下配置需要重启才能生效, 已忽略: {', '.join(ignored)}")
+        changed = differs & allowed
+        updates = {field: getattr(new, field) for field in changed}
+
+        pools: list[str] = []
+        if changed & POOL_FIELDS:
+            # 只带上允许热更新的字段, 需要重启的字段 (如 database_url) 不会生效
+            candidate = settings.model_copy(update=updates)
+            try:
+                pools = await databases.reload(
+                    candidate, prepare=_prepare, drain_timeout=settings.shutdown_timeout
+                )
+            except Exception as e:
+                logger.error(f"重建连接池失败, 配置保持不变: {e!r}")
+                raise ReloadError(f"failed to rebuild connection pools: {e}") from e
+
+        # 原地修改全局配置, 其它模块持有的 settings 引用随之更新
+        for field, value in updates.items():
+            setattr(settings, field, value)
+        if pools:
+            databases.config = settings  # 字段已一致, 注册表继续跟随全局配置对象
+        for hook_fields, callback in _hooks:
+            if changed & hook_fields:
+                result = callback(settings)
+                if inspect.isawaitable(result):
+                    await result
+
+        if changed:
+            logger.success(f"配置已重新加载: {', '.join(sorted(changed))}")
+        return {
+            "changed": {field: getattr(settings, field) for field in sorted(changed)},
+            "reloaded_pools": pools,
+            "ignored": ignored,
+        }
@@ -0,0 +1,99 @@
+"""高性能 JSON 响应类
+
+FastAPI 默认的 `JSONResponse` 使用标准库 `json`，列表接口上序列化开销明显。
+这里按可用性选择 orjson / msgspec，均未安装时退回标准库，保证行为一致：
+
+- `datetime` / `date` / `time` 统一输出 ISO 8601 字符串
+- 非 ASCII 字符原样输出（与 `JSONResponse` 的 `ensure_ascii=False` 一致）
+"""
+
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+from enum import Enum
+from functools import lru_cache
+from typing import Any, Callable, Literal
+from uuid import UUID
+
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+try:  # 可选依赖：pip install orjson
+    import orjson
+except ImportError:  # pragma: no cover - 取决于运行环境
+    orjson = None
+
+try:  # 可选依赖：pip install msgspec
+    import msgspec
+except ImportError:  # pragma: no cover - 取决于运行环境
+    msgspec = None
+
+JSONBackend = Literal["auto", "orjson", "msgspec", "stdlib"]
+Dumps = Callable[[Any], bytes]
+
+
+def _default(obj: Any) -> Any:
+    """各后端共用的兜底编码（与 jsonable_encoder 的常见类型保持一致）"""
+    if isinstance(obj, (datetime, date, time)):
+        return obj.isoformat()
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, UUID):
+        return str(obj)
+    if isinstance(obj, Enum):
+        return obj.value
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _stdlib_dumps(content: Any) -> bytes:
+    return json.dumps(
+        content,
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+        default=_default,
+    ).encode("utf-8")
+
+
+def _orjson_dumps(content: Any) -> bytes:
+    # orjson 原生支持 datetime/date/dataclass；非字符串 key 与 stdlib 行为对齐
+    return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+def _msgspec_dumps() -> Dumps:
+    encoder = msgspec.json.Encoder(enc_hook=_default)
+    return encoder.encode
+
+
+@lru_cache
+def resolve_json_backend(backend: JSONBackend = "auto") -> tuple[str, Dumps]:
+    """解析序列化后端，返回 (实际后端名, dumps 函数)
+
+    `auto` 依次尝试 orjson、msgspec、stdlib；显式指定但未安装时抛出 RuntimeError。
+    """
+    if backend in ("auto", "orjson") and orjson is not None:
+        return "orjson", _orjson_dumps
+    if backend in ("auto", "msgspec") and msgspec is not None:
+        return "msgspec", _msgspec_dumps()
+    if backend in ("auto", "stdlib"):
+        return "stdlib", _stdlib_dumps
+    raise RuntimeError(f"JSON backend '{backend}' is not installed")
+
+
+@lru_cache
+def json_response_class(backend: JSONBackend = "auto") -> type[JSONResponse]:
+    """生成绑定了指定后端的响应类，供 `FastAPI(default_response_class=...)` 使用"""
+    name, dumps = resolve_json_backend(backend)
+
+    class FastJSONResponse(JSONResponse):
+        json_backend = name
+
+        def render(self, content: Any) -> bytes:
+            return dumps(content)
+
+    return FastJSONResponse
@@ -0,0 +1,87 @@
+"""领域路由注册表：自动发现并按需导入
+
+约定：领域包 `app/<name>/` 下的 `router.py` 暴露 `router: APIRouter`。
+新增领域包（如 users、auth 补上 router.py）后无需修改 `create_app`。
+
+发现阶段只用 `importlib.util.find_spec` 定位模块，不执行导入。`lazy=True` 时
+`create_app` 只登记，路由模块（连同其 schema / service / model）在应用收到
+第一个 ASGI 事件时才导入并挂载：服务器下是 lifespan 启动，否则是首个请求。
+这样 `import app.main`（迁移脚本、命令行工具、测试收集）不必承担路由导入与
+路由构建的开销；多进程预派生时由主进程调用 `include_pending` 提前挂载。
+"""
+
+import importlib
+import importlib.util
+import pkgutil
+import time
+from dataclasses import dataclass
+
+from fastapi import FastAPI
+from loguru import logger
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+# 不是领域包的子包
+EXCLUDED_PACKAGES = frozenset({"core"})
+
+
+@dataclass(frozen=True, slots=True)
+class RouterSpec:
+    package: str
+    module: str
+
+
+def discover(package: str = "app") -> list[RouterSpec]:
+    """查找 `<package>.<name>.router` 模块（不导入），按包名排序"""
+    root = importlib.import_module(package)
+    specs = []
+    for info in pkgutil.iter_modules(root.__path__):
+        if not info.ispkg or info.name in EXCLUDED_PACKAGES:
+            continue
+        module = f"{package}.{info.name}.router"
+        if importlib.util.find_spec(module) is None:
+            continue  # 尚未提供接口的领域包（如 users）
+        specs.append(RouterSpec(package=info.name, module=module))
+    return sorted(specs, key=lambda spec: spec.package)
+
+
+def _include(app: FastAPI, specs: list[RouterSpec]) -> None:
+    for spec in specs:
+        start = time.perf_counter()
+        module = importlib.import_module(spec.module)
+        app.include_router(module.router)
+        logger.debug(
+            f"路由 {spec.package} 已挂载 ({(time.perf_counter() - start) * 1e3:.1f}ms)"
+        )
+
+
+def include_pending(app: FastAPI) -> None:
+    """立即导入并挂载尚未挂载的路由（重复调用无副作用）"""
+    specs = getattr(app.state, "pending_routers", None)
+    if specs:
+        app.state.pending_routers = []  # 先清空, 导入失败时不会重复挂载一半
+        _include(app, specs)
+
+
+class LazyRoutersMiddleware:
+    """首个 ASGI 事件到来时挂载延迟登记的路由（lifespan 事件同样经过这里, 启动处理前即已挂载）"""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        self.ready = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if not self.ready:
+            # 挂载是同步的, 检查与标记之间没有 await, 并发请求不会重复挂载
+            include_pending(scope["app"])
+            self.ready = True
+        await self.app(scope, receive, send)
+
+
+def register_routers(app: FastAPI, *, lazy: bool = False) -> list[RouterSpec]:
+    specs = discover()
+    if lazy:
+        app.state.pending_routers = specs
+        app.add_middleware(LazyRoutersMiddleware)
+    else:
+        _include(app, specs)
+    return specs
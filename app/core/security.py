@@ -9,6 +9,10 @@ from app.core.config import settings
 password_hash = PasswordHash.recommended()
 
 
+class TokenError(Exception):
+    """令牌无效（签名错误、格式错误或已过期）"""
+
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """验证密码是否匹配
 
@@ -41,7 +45,7 @@ def create_access_token(subject: str, expires_delta: timedelta | None = None) ->
 
     说明：
     - 使用 UTC 时区（timezone-aware）计算过期时间，并将 `exp` 存为整型秒级时间戳（Unix epoch）。
-    - 解码/验证建议使用 `jwt.decode(token, settings.jwt_secret, algorithms=[settings.jwt_algorithm])` 并处理 `jwt.PyJWTError`。
+    - 解码/验证使用 `decode_access_token`，令牌无效或过期时抛出 `TokenError`。
     """
     if expires_delta:
         expire = datetime.now(timezone.utc) + expires_delta
@@ -55,3 +59,18 @@ def create_access_token(subject: str, expires_delta: timedelta | None = None) ->
         to_encode, settings.jwt_secret, algorithm=settings.jwt_algorithm
     )
     return encoded_jwt
+
+
+def decode_access_token(token: str) -> dict:
+    """解码并验证访问令牌（JWT）
+
+    :param token: `create_access_token` 生成的 JWT 字符串
+    :return: 令牌 payload（dict），其中 `sub` 为用户标识
+    :raises TokenError: 签名不匹配、格式错误或已过期
+    """
+    try:
+        return jwt.decode(
+            token, settings.jwt_secret, algorithms=[settings.jwt_algorithm]
+        )
+    except jwt.PyJWTError as e:
+        raise TokenError(str(e)) from e
@@ -0,0 +1,39 @@
+"""响应序列化管道：ORM 对象只验证一次，直接输出 JSON bytes
+
+服务层用 `ResponseSerializer.validate` 把 ORM 行转成响应模型（一次验证），
+路由层用 `ResponseSerializer.response` 返回已序列化好的 `Response`。
+FastAPI 遇到直接返回的 `Response` 会跳过 `response_model` 的二次验证与编码，
+`response_model` 仍保留在路由上，仅用于生成 OpenAPI 文档。
+"""
+
+from typing import Any, Generic, TypeVar
+
+from fastapi import Response
+from pydantic import TypeAdapter
+
+T = TypeVar("T")
+
+
+class PreSerializedJSONResponse(Response):
+    """内容已是 JSON bytes 的响应，不再经过任何编码"""
+
+    media_type = "application/json"
+
+
+class ResponseSerializer(Generic[T]):
+    """绑定到某个响应类型的预编译 TypeAdapter（模块级创建，进程内复用）"""
+
+    def __init__(self, type_: type[T] | Any) -> None:
+        self.adapter: TypeAdapter[T] = TypeAdapter(type_)
+
+    def validate(self, obj: Any) -> T:
+        """ORM 对象（或其列表）-> 响应模型，整个列表只调用一次 pydantic-core"""
+        return self.adapter.validate_python(obj, from_attributes=True)
+
+    def dump_json(self, value: T) -> bytes:
+        return self.adapter.dump_json(value)
+
+    def response(
+        self, value: T, *, status_code: int = 200
+    ) -> PreSerializedJSONResponse:
+        return PreSerializedJSONResponse(self.dump_json(value), status_code=status_code)
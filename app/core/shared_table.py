@@ -0,0 +1,217 @@
+"""共享内存只读表：多 worker 共享同一份数据，按键读取时不反序列化整张表
+
+适合小而热、读多写少的数据（如食物目录）。每条记录是 (整数 id, 字符串键, 值)，
+值是已序列化好的 bytes（通常是响应 JSON），读取时只切出这一条。
+
+文件格式（小端）::
+
+    头部   magic "SHT1" | generation u64 | built_at f64 | count u32
+    条目   count x (id i64, value_off u32, value_len u32, key_off u32, key_len u32)，按 id 排序
+    键序   count x u32，条目下标按键（UTF-8 字节序）排序
+    数据   各记录的键与值
+
+写入：生成完整的新文件后 `os.replace` 原子替换，再把 generation 写入控制文件
+（`<path>.gen`，8 字节，同样 mmap）。读取：每次查找先比较控制文件中的 generation，
+变化时重新 mmap；已替换的旧文件在旧映射释放前仍然有效，读取不会看到写了一半的数据。
+多个写入方由调用方用 `WriterLock` 串行化。
+
+依赖 POSIX 的 flock 与“替换已映射文件”语义，其它平台上 `SUPPORTED` 为 False。
+"""
+
+import mmap
+import os
+import struct
+import time
+from pathlib import Path
+from typing import Iterable
+
+try:
+    import fcntl
+except ImportError:  # 非 POSIX 平台
+    fcntl = None
+
+SUPPORTED = os.name == "posix" and fcntl is not None
+
+MAGIC = b"SHT1"
+HEADER = struct.Struct("<4sQdI")
+ENTRY = struct.Struct("<qIIII")
+POSITION = struct.Struct("<I")
+GENERATION = struct.Struct("<Q")
+
+Record = tuple[int, str, bytes]
+
+
+def _control_path(path: Path) -> Path:
+    return path.with_name(path.name + ".gen")
+
+
+def _open_control(path: Path) -> mmap.mmap:
+    fd = os.open(_control_path(path), os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        if os.fstat(fd).st_size < GENERATION.size:
+            os.ftruncate(fd, GENERATION.size)
+        return mmap.mmap(fd, GENERATION.size)
+    finally:
+        os.close(fd)  # 映射建立后不再需要文件描述符
+
+
+class WriterLock:
+    """跨进程写锁（flock）；进程退出时由内核释放"""
+
+    def __init__(self, path: str | os.PathLike) -> None:
+        self.path = Path(path).with_name(Path(path).name + ".lock")
+        self._fd: int | None = None
+
+    def acquire(self) -> None:
+        """阻塞直到获得锁（在事件循环中使用时放到线程里调用）"""
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        self._fd = fd
+
+    def release(self) -> None:
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def __enter__(self) -> "WriterLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.release()
+
+
+def encode(
+    records: Iterable[Record], generation: int, built_at: float | None = None
+) -> bytes:
+    records = sorted(records, key=lambda record: record[0])
+    count = len(records)
+    data_start = HEADER.size + count * (ENTRY.size + POSITION.size)
+    entries = bytearray()
+    data = bytearray()
+    keys: list[bytes] = []
+    for record_id, key, value in records:
+        key_bytes = key.encode()
+        keys.append(key_bytes)
+        key_off = data_start + len(data)
+        data += key_bytes
+        value_off = data_start + len(data)
+        data += value
+        entries += ENTRY.pack(record_id, value_off, len(value), key_off, len(key_bytes))
+    order = sorted(range(count), key=keys.__getitem__)
+    return b"".join(
+        (
+            HEADER.pack(MAGIC, generation, built_at or time.time(), count),
+            bytes(entries),
+            b"".join(POSITION.pack(i) for i in order),
+            bytes(data),
+        )
+    )
+
+
+def write_table(
+    path: str | os.PathLike, records: Iterable[Record], built_at: float | None = None
+) -> int:
+    """写出新版本并通知读取方，返回新的 generation（调用方需持有 `WriterLock`）
+
+    `built_at` 为读取数据源的时间（默认当前时间），读取方据此判断数据是否足够新
+    """
+    path = Path(path)
+    control = _open_control(path)
+    try:
+        generation = GENERATION.unpack_from(control)[0] + 1
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp.write_bytes(encode(records, generation, built_at))
+        os.replace(tmp, path)
+        GENERATION.pack_into(control, 0, generation)
+    finally:
+        control.close()
+    return generation
+
+
+class SharedTableReader:
+    """按 id / 键查找；返回值为该记录的 bytes（只复制这一条）"""
+
+    def __init__(self, path: str | os.PathLike) -> None:
+        self.path = Path(path)
+        self._control = _open_control(self.path)
+        self._map: mmap.mmap | None = None
+        self._seen = 0  # 最近一次检查时控制文件中的 generation
+        self.generation = 0
+        self.built_at = 0.0
+        self.count = 0
+
+    def _current(self) -> mmap.mmap | None:
+        self.refresh()
+        return self._map
+
+    def refresh(self) -> None:
+        """控制文件中的 generation 变化时重新映射（一次内存读取，无系统调用）
+
+        只在控制 generation 变化时尝试一次：文件缺失或与控制文件不一致（写入方在
+        替换文件后、更新控制文件前退出）时保留当前映射，不会每次查找都重新打开
+        """
+        control = GENERATION.unpack_from(self._control)[0]
+        if control != self._seen:
+            self._seen = control
+            self._load()
+
+    def _load(self) -> None:
+        try:
+            with open(self.path, "rb") as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (FileNotFoundError, ValueError):  # 尚未写出 / 空文件
+            return
+        magic, generation, built_at, count = HEADER.unpack_from(mapped)
+        if magic != MAGIC:
+            mapped.close()
+            raise ValueError(f"{self.path} is not a shared table")
+        if self._map is not None:
+            self._map.close()
+        self._map = mapped
+        self.generation, self.built_at, self.count = generation, built_at, count
+
+    def _entry(self, mapped: mmap.mmap, index: int) -> tuple[int, int, int, int, int]:
+        return ENTRY.unpack_from(mapped, HEADER.size + index * ENTRY.size)
+
+    def get(self, record_id: int) -> bytes | None:
+        mapped = self._current()
+        if mapped is None:
+            return None
+        lo, hi = 0, self.count
+        while lo < hi:  # 条目按 id 排序, 二分查找
+            mid = (lo + hi) // 2
+            entry = self._entry(mapped, mid)
+            if entry[0] < record_id:
+                lo = mid + 1
+            elif entry[0] > record_id:
+                hi = mid
+            else:
+                return mapped[entry[1] : entry[1] + entry[2]]
+        return None
+
+    def get_by_key(self, key: str) -> bytes | None:
+        mapped = self._current()
+        if mapped is None:
+            return None
+        target = key.encode()
+        order_start = HEADER.size + self.count * ENTRY.size
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            index = POSITION.unpack_from(mapped, order_start + mid * POSITION.size)[0]
+            _, value_off, value_len, key_off, key_len = self._entry(mapped, index)
+            candidate = mapped[key_off : key_off + key_len]
+            if candidate < target:
+                lo = mid + 1
+            elif candidate > target:
+                hi = mid
+            else:
+                return mapped[value_off : value_off + value_len]
+        return None
+
+    def close(self) -> None:
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._control.close()
@@ -0,0 +1,143 @@
+"""优雅停机：先排空请求与后台任务，再释放连接池
+
+滚动发布时收到 SIGTERM 后立即 `engine.dispose()`，进行中的请求会丢失连接、
+返回 500。`ShutdownManager` 把停机拆成几个阶段：
+
+1. 开始排空（收到信号时）：新请求直接返回 503 + `Connection: close`，
+   健康检查随之失败，负载均衡把流量切走
+2. 等待进行中的请求与登记的后台任务，总耗时不超过 `shutdown_timeout`，
+   超时后取消剩余的后台任务
+3. 按注册顺序执行停机回调（写出缓冲区、停止后台循环、释放引擎），只执行一次
+
+信号处理只负责标记排空，并转交给原有的处理器（如 uvicorn 的退出逻辑），
+真正的清理在 lifespan 的关闭阶段完成。
+"""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable
+
+from loguru import logger
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.metrics import REGISTRY
+
+SHUTDOWN_REJECTED = REGISTRY.counter("shutdown_rejected_total", "排空期间拒绝的请求数")
+
+
+class ShutdownManager:
+    def __init__(self) -> None:
+        self.draining = False
+        self.in_flight = 0
+        self._idle: asyncio.Event | None = None
+        self._tasks: set[asyncio.Task] = set()
+        self._callbacks: list[Callable[[], Awaitable[Any]]] = []
+        self._done: asyncio.Future | None = None
+
+    @classmethod
+    def for_app(cls, app: Any) -> "ShutdownManager":
+        """取应用上挂载的实例（没有则创建），中间件与 lifespan 共用同一个"""
+        state = getattr(app, "state", None)
+        if state is None:
+            return cls()
+        if getattr(state, "shutdown", None) is None:
+            state.shutdown = cls()
+        return state.shutdown
+
+    # --- 登记 ---
+    def track(self, task: asyncio.Task) -> asyncio.Task:
+        """登记需要在停机前等待完成的后台任务"""
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    def on_shutdown(self, callback: Callable[[], Awaitable[Any]]) -> None:
+        """注册停机回调，请求与后台任务排空后按注册顺序执行"""
+        self._callbacks.append(callback)
+
+    # --- 请求计数 ---
+    def request_started(self) -> None:
+        self.in_flight += 1
+
+    def request_finished(self) -> None:
+        self.in_flight -= 1
+        if self.in_flight == 0 and self._idle is not None:
+            self._idle.set()
+
+    # --- 停机 ---
+    def begin_drain(self) -> None:
+        if not self.draining:
+            self.draining = True
+            logger.info(f"开始排空, 进行中的请求 {self.in_flight} 个")
+
+    async def shutdown(self, timeout: float) -> None:
+        """排空并执行停机回调；重复调用只执行一次，后来者等待第一次完成"""
+        if self._done is not None:
+            await asyncio.shield(self._done)
+            return
+        self._done = asyncio.get_running_loop().create_future()
+        try:
+            await self._drain(timeout)
+            for callback in self._callbacks:
+                try:
+                    await callback()
+                except Exception as e:
+                    logger.error(f"停机回调 {callback!r} 失败: {e!r}")
+        finally:
+            self._done.set_result(None)
+
+    async def _drain(self, timeout: float) -> None:
+        self.begin_drain()
+        deadline = time.monotonic() + timeout
+
+        if self.in_flight:
+            self._idle = asyncio.Event()
+            try:
+                await asyncio.wait_for(self._idle.wait(), timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f"等待请求超时, 仍有 {self.in_flight} 个请求未完成")
+
+        tasks = list(self._tasks)
+        if tasks:
+            _, pending = await asyncio.wait(
+                tasks, timeout=max(0.0, deadline - time.monotonic())
+            )
+            for task in pending:
+                task.cancel()
+            if pending:
+                logger.warning(f"取消 {len(pending)} 个未完成的后台任务")
+                await asyncio.wait(pending)
+
+
+class ShutdownMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        manager: ShutdownManager,
+        exclude_paths: tuple[str, ...] = ("/metrics",),
+    ) -> None:
+        self.app = app
+        self.manager = manager
+        self.exclude_paths = exclude_paths
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.exclude_paths:
+            await self.app(scope, receive, send)
+            return
+        if self.manager.draining:
+            SHUTDOWN_REJECTED.inc()
+            response = JSONResponse(
+                {"detail": "Server is shutting down"},
+                status_code=503,
+                headers={"Connection": "close", "Retry-After": "1"},
+            )
+            await response(scope, receive, send)
+            return
+
+        self.manager.request_started()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.manager.request_finished()
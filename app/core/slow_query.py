@@ -0,0 +1,190 @@
+"""慢查询日志：指纹聚合 + 抽样 EXPLAIN
+
+- 耗时超过 `slow_query_threshold_ms` 的语句按指纹（`query_stats.fingerprint`）聚合，
+  记录次数、总耗时、最大耗时以及最近若干次耗时的 p95
+- 对 SELECT / UPDATE / DELETE 按 `slow_query_explain_sample_rate` 抽样执行
+  `EXPLAIN`（SQLite 为 `EXPLAIN QUERY PLAN`），同一指纹在 `explain_interval`
+  秒内最多采集一次；EXPLAIN 在独立连接的后台任务中执行，不阻塞当前请求
+- 结果写入 loguru，并由 `/admin/slow-queries` 提供 top-N 报告
+
+挂在引擎级的 cursor 事件上，覆盖所有仓储发出的语句。
+"""
+
+import asyncio
+import contextvars
+import random
+import time
+from collections import deque
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Literal
+
+from loguru import logger
+from sqlalchemy import Connection
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import settings
+from app.core.query_stats import fingerprint, statement_observers
+
+RECENT_SAMPLES = 200  # 计算 p95 使用的最近样本数
+EXPLAINABLE = ("SELECT", "WITH", "UPDATE", "DELETE")
+
+# 正在执行 EXPLAIN 的任务内为 True，避免 EXPLAIN 语句本身被记录
+_explaining: ContextVar[bool] = ContextVar("slow_query_explaining", default=False)
+
+
+@dataclass(slots=True)
+class SlowQueryStats:
+    fingerprint: str
+    example: str  # 首次出现时的原始 SQL（参数为占位符）
+    count: int = 0
+    total: float = 0.0
+    max: float = 0.0
+    recent: deque[float] = field(default_factory=lambda: deque(maxlen=RECENT_SAMPLES))
+    last_seen: float = 0.0
+    plan: list[str] | None = None
+    plan_captured_at: float | None = None
+
+    def record(self, elapsed: float) -> None:
+        self.count += 1
+        self.total += elapsed
+        self.max = max(self.max, elapsed)
+        self.recent.append(elapsed)
+        self.last_seen = time.time()
+
+    @property
+    def p95(self) -> float:
+        values = sorted(self.recent)
+        return values[max(0, round(0.95 * len(values)) - 1)] if values else 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "fingerprint": self.fingerprint,
+            "example": self.example,
+            "count": self.count,
+            "total_ms": round(self.total * 1e3, 3),
+            "mean_ms": round(self.total / self.count * 1e3, 3),
+            "p95_ms": round(self.p95 * 1e3, 3),
+            "max_ms": round(self.max * 1e3, 3),
+            "last_seen": self.last_seen,
+            "plan": self.plan,
+            "plan_captured_at": self.plan_captured_at,
+        }
+
+
+class SlowQueryLog:
+    def __init__(
+        self,
+        *,
+        threshold_ms: float = 200,
+        explain_sample_rate: float = 0.1,
+        max_fingerprints: int = 500,
+        explain_interval: float = 60.0,
+    ) -> None:
+        self.threshold = threshold_ms / 1e3
+        self.explain_sample_rate = explain_sample_rate
+        self.max_fingerprints = max_fingerprints
+        self.explain_interval = explain_interval
+        self._entries: dict[str, SlowQueryStats] = {}
+        self._tasks: set[asyncio.Task] = set()
+
+    def install(self) -> None:
+        """注册到 `query_stats` 的语句回调（重复调用无副作用）"""
+        if self.observe not in statement_observers:
+            statement_observers.append(self.observe)
+
+    def uninstall(self) -> None:
+        if self.observe in statement_observers:
+            statement_observers.remove(self.observe)
+
+    def observe(
+        self,
+        conn: Connection,
+        statement: str,
+        parameters: Any,
+        elapsed: float,
+        many: bool,
+    ) -> None:
+        if elapsed < self.threshold or _explaining.get():
+            return
+
+        fp = fingerprint(statement)
+        entry = self._entries.get(fp)
+        if entry is None:
+            if len(self._entries) >= self.max_fingerprints:
+                # 淘汰总耗时最小的指纹，保留最值得关注的
+                victim = min(self._entries.values(), key=lambda e: e.total)
+                del self._entries[victim.fingerprint]
+            entry = self._entries[fp] = SlowQueryStats(fp, statement)
+        entry.record(elapsed)
+        logger.warning(f"慢查询 {elapsed * 1e3:.1f}ms (第 {entry.count} 次): {fp}")
+
+        if not many and self._should_explain(entry, statement):
+            entry.plan_captured_at = time.time()  # 先占位，避免并发重复采集
+            # 独立的上下文: 不计入触发请求的语句统计, 也不受其截止时间约束
+            task = asyncio.get_running_loop().create_task(
+                self._explain(AsyncEngine(conn.engine), entry, statement, parameters),
+                context=contextvars.Context(),
+            )
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    def _should_explain(self, entry: SlowQueryStats, statement: str) -> bool:
+        if not statement.lstrip().upper().startswith(EXPLAINABLE):
+            return False
+        if (
+            entry.plan_captured_at is not None
+            and time.time() - entry.plan_captured_at < self.explain_interval
+        ):
+            return False
+        return random.random() < self.explain_sample_rate
+
+    async def _explain(
+        self,
+        engine: AsyncEngine,
+        entry: SlowQueryStats,
+        statement: str,
+        parameters: Any,
+    ) -> None:
+        _explaining.set(True)  # 仅影响当前任务的上下文
+        prefix = "EXPLAIN QUERY PLAN" if engine.dialect.name == "sqlite" else "EXPLAIN"
+        try:
+            async with engine.connect() as conn:
+                result = await conn.exec_driver_sql(f"{prefix} {statement}", parameters)
+                rows = result.all()
+        except Exception as e:  # EXPLAIN 失败不影响业务，只记录
+            logger.warning(f"慢查询 EXPLAIN 失败: {e!r}")
+            return
+        # SQLite 的计划描述在最后一列，PostgreSQL 只有一列
+        entry.plan = [str(row[-1]) for row in rows]
+        entry.plan_captured_at = time.time()
+        logger.info(f"慢查询执行计划 {entry.fingerprint}\n" + "\n".join(entry.plan))
+
+    async def wait_explains(self) -> None:
+        """等待进行中的 EXPLAIN 任务完成（测试与关闭时使用）"""
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def top(
+        self,
+        limit: int = 20,
+        order_by: Literal["total", "p95", "count", "max"] = "total",
+    ) -> list[dict]:
+        keys = {
+            "total": lambda e: e.total,
+            "p95": lambda e: e.p95,
+            "count": lambda e: e.count,
+            "max": lambda e: e.max,
+        }
+        entries = sorted(self._entries.values(), key=keys[order_by], reverse=True)
+        return [e.as_dict() for e in entries[:limit]]
+
+    def reset(self) -> None:
+        self._entries.clear()
+
+
+slow_query_log = SlowQueryLog(
+    threshold_ms=settings.slow_query_threshold_ms,
+    explain_sample_rate=settings.slow_query_explain_sample_rate,
+    max_fingerprints=settings.slow_query_max_fingerprints,
+)
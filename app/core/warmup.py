@@ -0,0 +1,128 @@
+"""启动预热：提前建立连接、准备热点语句
+
+连接池启动时是空的，发布后的第一批请求要承担建连、TLS / 认证握手，
+以及 asyncpg 的类型自省与语句准备，冷启动 p99 是稳态的数倍。这里在启动后：
+
+- 每个连接池同时打开 `warmup_connections` 个连接（不超过 pool_size），
+  归还后留在池中
+- 在每个连接上执行一遍各模块用 `@warmup_query` 登记的热点查询：
+  asyncpg 的预编译语句缓存是按连接的，需要逐个连接准备；
+  同时填充 SQLAlchemy 的编译缓存与各类进程内缓存
+- 全部完成后把 `app.state.warmed_up` 置为 True，`/readyz` 才报告就绪
+
+预热在后台执行，不阻塞 lifespan；连不上数据库时按退避间隔重试。
+"""
+
+import asyncio
+from contextlib import AsyncExitStack
+from typing import Any, Awaitable, Callable, Iterable
+
+from loguru import logger
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from app.core.database import DEFAULT_POOL, DatabaseRegistry
+from app.core.query_stats import track_queries
+
+WarmupQuery = Callable[[AsyncSession], Awaitable[Any]]
+
+# 连接池名 -> 热点查询
+_queries: dict[str, list[WarmupQuery]] = {}
+
+
+def warmup_query(pool: str = DEFAULT_POOL) -> Callable[[WarmupQuery], WarmupQuery]:
+    """登记在指定连接池的每个预热连接上执行的查询"""
+
+    def decorator(query: WarmupQuery) -> WarmupQuery:
+        _queries.setdefault(pool, []).append(query)
+        return query
+
+    return decorator
+
+
+def registered_queries(pool: str) -> list[WarmupQuery]:
+    return list(_queries.get(pool, ()))
+
+
+async def warm_engine(
+    engine: AsyncEngine, *, connections: int, queries: Iterable[WarmupQuery] = ()
+) -> int:
+    """同时打开多个连接并执行热点查询，返回预热的连接数"""
+    pool = engine.pool
+    if not hasattr(pool, "size"):
+        return 0  # NullPool（PgBouncer 模式）不保留连接，无需预热
+    connections = min(connections, pool.size())
+    queries = list(queries)
+
+    async with AsyncExitStack() as stack:
+        # 预热语句单独统计，不计入触发预热的请求（如 /admin/reload）的 N+1 检测
+        stack.enter_context(track_queries())
+        # 同时持有 N 个连接，连接池才会真正扩到 N
+        conns = await asyncio.gather(
+            *(stack.enter_async_context(engine.connect()) for _ in range(connections))
+        )
+        for conn in conns:
+            await conn.execute(text("SELECT 1"))
+            async with AsyncSession(bind=conn, expire_on_commit=False) as session:
+                for query in queries:
+                    try:
+                        await query(session)
+                    except Exception as e:
+                        # 查询失败（如表尚未迁移）不影响连接预热
+                        logger.warning(f"预热查询 {query.__qualname__} 失败: {e!r}")
+                await session.rollback()
+    return len(conns)
+
+
+async def warm_pool(
+    databases: DatabaseRegistry,
+    name: str,
+    *,
+    connections: int,
+    queries: Iterable[WarmupQuery] = (),
+) -> int:
+    return await warm_engine(
+        databases.engine(name), connections=connections, queries=queries
+    )
+
+
+async def warm_up(
+    databases: DatabaseRegistry, *, connections: int, pools: Iterable[str]
+) -> None:
+    for name in pools:
+        warmed = await warm_pool(
+            databases,
+            name,
+            connections=connections,
+            queries=registered_queries(name),
+        )
+        logger.info(f"连接池 {name} 预热完成: {warmed} 个连接")
+
+
+def start_warmup(
+    app: Any,
+    databases: DatabaseRegistry,
+    *,
+    connections: int,
+    pools: Iterable[str],
+    max_backoff: float = 5.0,
+) -> asyncio.Task:
+    """后台执行预热，完成后标记 `app.state.warmed_up`"""
+    app.state.warmed_up = False
+    pools = list(pools)
+
+    async def run() -> None:
+        backoff = 0.5
+        while True:
+            try:
+                await warm_up(databases, connections=connections, pools=pools)
+            except Exception as e:
+                logger.error(f"连接池预热失败, {backoff:.1f}s 后重试: {e!r}")
+                await asyncio.sleep(backoff)
+                backoff = min(max_backoff, backoff * 2)
+                continue
+            app.state.warmed_up = True
+            logger.success("预热完成, 实例已就绪")
+            return
+
+    return asyncio.create_task(run(), name="warmup")
@@ -0,0 +1,127 @@
+"""事件循环阻塞检测
+
+事件循环里的同步调用（如 argon2 哈希、同步日志 sink、CPU 密集的序列化）
+会让同一 worker 上的所有请求一起等待。检测方式：
+
+- 心跳协程每 `interval` 秒醒来一次，记录时间戳，并把实际唤醒延迟写入 loop lag 指标
+- 辅助线程定期检查心跳；超过 `threshold_ms` 未更新说明事件循环被阻塞，
+  立即通过 `sys._current_frames()` 抓取事件循环线程的调用栈（即阻塞发生的位置），
+  写入日志并计数（计数交给事件循环线程执行，见 `_monitor`）
+- `raise_on_block=True`（测试 / 调试模式）时，停止检测时若发生过阻塞则抛出
+  `EventLoopBlocked`，用于让阻塞事件循环的测试失败：
+
+    async with LoopWatchdog(threshold_ms=50, raise_on_block=True):
+        await client.get("/foods/")
+"""
+
+import asyncio
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from contextlib import suppress
+from dataclasses import dataclass
+
+from loguru import logger
+
+from app.core.metrics import EVENT_LOOP_BLOCKS, EVENT_LOOP_LAG, EVENT_LOOP_LAG_HISTOGRAM
+
+
+class EventLoopBlocked(AssertionError):
+    """调试模式下检测到事件循环阻塞"""
+
+
+@dataclass(frozen=True, slots=True)
+class LoopStall:
+    blocked_for: float  # 检测到阻塞时已阻塞的秒数（实际阻塞时长不小于该值）
+    stack: str
+    detected_at: float
+
+
+class LoopWatchdog:
+    def __init__(
+        self,
+        *,
+        threshold_ms: float = 100,
+        interval: float = 0.05,
+        raise_on_block: bool = False,
+        max_records: int = 100,
+    ) -> None:
+        self.threshold = threshold_ms / 1e3
+        self.interval = interval
+        self.raise_on_block = raise_on_block
+        self.stalls: deque[LoopStall] = deque(maxlen=max_records)
+        self._expected_beat = 0.0  # 下一次心跳的预期时间
+        self._reported_beat = 0.0
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._loop_thread_id: int | None = None
+        self._task: asyncio.Task | None = None
+        self._thread: threading.Thread | None = None
+        self._stop = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        if self._task is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._expected_beat = time.perf_counter() + self.interval
+        self._stop.clear()
+        self._task = asyncio.create_task(self._heartbeat())
+        self._thread = threading.Thread(
+            target=self._monitor, name="loop-watchdog", daemon=True
+        )
+        self._thread.start()
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._stop.set()
+        self._task.cancel()
+        with suppress(asyncio.CancelledError):
+            await self._task
+        await asyncio.to_thread(self._thread.join)
+        self._task = self._thread = None
+        if self.raise_on_block and self.stalls:
+            stalls, self.stalls = list(self.stalls), deque(maxlen=self.stalls.maxlen)
+            raise EventLoopBlocked(
+                f"event loop blocked {len(stalls)} time(s), first at:\n{stalls[0].stack}"
+            )
+
+    async def __aenter__(self) -> "LoopWatchdog":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.stop()
+
+    async def _heartbeat(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            now = time.perf_counter()
+            lag = max(0.0, now - self._expected_beat)
+            self._expected_beat = now + self.interval
+            EVENT_LOOP_LAG.set(lag)
+            EVENT_LOOP_LAG_HISTOGRAM.observe(lag)
+
+    def _monitor(self) -> None:
+        check_every = min(self.interval, self.threshold / 2)
+        while not self._stop.wait(check_every):
+            expected = self._expected_beat
+            blocked_for = time.perf_counter() - expected
+            # 同一次阻塞只上报一次（心跳恢复后 expected 才会变化）
+            if blocked_for < self.threshold or expected == self._reported_beat:
+                continue
+            self._reported_beat = expected
+            frame = sys._current_frames().get(self._loop_thread_id)
+            stack = "".join(traceback.format_stack(frame)) if frame else "<unknown>\n"
+            self.stalls.append(LoopStall(blocked_for, stack, time.time()))
+            # 指标是无锁的, 只在事件循环线程上修改; 计数在阻塞结束后才会落地
+            self._loop.call_soon_threadsafe(EVENT_LOOP_BLOCKS.inc)
+            logger.warning(
+                f"事件循环已阻塞 {blocked_for * 1e3:.0f}ms, 阻塞位置:\n{stack.rstrip()}"
+            )
@@ -0,0 +1,208 @@
+"""食物目录的跨 worker 共享缓存（基于 `app.core.shared_table`）
+
+食物目录小而热，各 worker 各缓存一份既成倍占用内存，又会彼此不一致。
+这里把全部食物的响应 JSON 写进一张共享内存表，所有 worker 按 id / 名称直接读取：
+
+- 启动后在后台重建一次才开始使用，不会读到上次运行留下的旧文件；
+  重建前后及出错时都回退到数据库查询
+- 本 worker 写入（创建 / 修改 / 删除）后调用 `changed()`：短暂合并后在后台重建，
+  重建完成前本 worker 的读取绕过共享表，保证读到自己的写入
+- 其它 worker 在下一次查找时发现 generation 变化并重新映射
+- 多个 worker 的重建用文件锁串行化，锁内读取数据库，最后写入的总是最新数据
+- 其它节点的修改经失效总线（`app.core.invalidation`）通知，收到后重建；
+  同一主机上的多个 worker 都会收到，只有第一个真正重建，其余发现共享表
+  已晚于事件时间后跳过。另按 `refresh_interval` 定期重建兜底
+"""
+
+import asyncio
+import contextvars
+import hashlib
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable
+
+from loguru import logger
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import Settings, settings
+from app.core.database import databases
+from app.core.invalidation import invalidation_bus
+from app.core.shared_table import (
+    SUPPORTED,
+    SharedTableReader,
+    WriterLock,
+    write_table,
+)
+from app.foods.repository import FoodRepository
+from app.foods.schema import food_list_serializer, food_serializer
+
+
+def default_path(config: Settings) -> Path:
+    """同一主机上连接同一数据库的进程共用一个文件"""
+    directory = config.shared_catalog_dir or (
+        "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    )
+    digest = hashlib.sha1(config.database_url.encode()).hexdigest()[:8]
+    return Path(directory) / f"{config.app_name.lower()}-{digest}-foods.table"
+
+
+class FoodCatalog:
+    def __init__(
+        self,
+        path: str | os.PathLike,
+        *,
+        pool: str = "catalog",
+        session_factory: Callable[[], AsyncSession] | None = None,
+        refresh_interval: float = 60.0,
+        debounce: float = 0.05,
+    ) -> None:
+        self.path = Path(path)
+        self.pool = pool
+        self.session_factory = session_factory  # 默认使用 `pool` 对应的连接池
+        self.refresh_interval = refresh_interval
+        self.debounce = debounce
+        self._reader: SharedTableReader | None = None
+        self._armed = False  # 本次运行至少成功重建过一次
+        self._changes = 0  # 本 worker 的写入次数
+        self._built = 0  # 已反映到共享表中的写入次数
+        self._lock = asyncio.Lock()
+        self._rebuild_task: asyncio.Task | None = None
+        self._refresh_task: asyncio.Task | None = None
+        self._remote_task: asyncio.Task | None = None
+        self._remote_since: float | None = None  # 最近一次收到其它节点事件的时间
+
+    @property
+    def ready(self) -> bool:
+        return self._armed and self._built == self._changes
+
+    def get(self, food_id: int) -> bytes | None:
+        """食物的响应 JSON；共享表不可用或不存在该食物时返回 None（调用方查数据库）"""
+        return self._reader.get(food_id) if self.ready else None
+
+    def get_by_name(self, name: str) -> bytes | None:
+        return self._reader.get_by_key(name) if self.ready else None
+
+    async def rebuild(self, *, newer_than: float | None = None) -> bool:
+        """从数据库重建共享表，返回是否重建
+
+        共享表的数据是在 `newer_than` 之后读取的（其它 worker 刚重建过）时跳过
+        """
+        async with self._lock:
+            changes = self._changes
+            lock = WriterLock(self.path)
+            # flock 会阻塞, 放到线程中等待; 等待期间被取消时, 拿到锁后立即释放
+            acquiring = asyncio.ensure_future(asyncio.to_thread(lock.acquire))
+            try:
+                await asyncio.shield(acquiring)
+            except asyncio.CancelledError:
+                acquiring.add_done_callback(lambda _: lock.release())
+                raise
+            try:
+                self._reader.refresh()
+                if newer_than is not None and self._reader.built_at >= newer_than:
+                    self._armed = True
+                    return False
+                started = time.time()  # 记录读取开始的时间, 之前提交的修改都已包含
+                factory = self.session_factory or databases.session_factory(self.pool)
+                async with factory() as session:
+                    foods = await FoodRepository(session).list_all()
+                records = [
+                    (food.id, food.name, food_serializer.dump_json(food))
+                    for food in food_list_serializer.validate(foods)
+                ]
+                await asyncio.to_thread(write_table, self.path, records, started)
+            finally:
+                lock.release()
+            self._built = changes
+            self._armed = True
+            return True
+
+    def changed(self) -> None:
+        """本 worker 修改了食物数据（提交之后调用）"""
+        if self._reader is None:
+            return  # 未启动（脚本、单元测试）
+        self._changes += 1
+        if self._rebuild_task is None or self._rebuild_task.done():
+            # 独立的上下文: 不继承请求的截止时间与语句统计
+            self._rebuild_task = asyncio.create_task(
+                self._rebuild_pending(),
+                name="food-catalog-rebuild",
+                context=contextvars.Context(),
+            )
+
+    def remote_changed(self) -> None:
+        """其它节点修改了食物数据（收到失效事件时调用）"""
+        if self._reader is None:
+            return
+        self._remote_since = time.time()
+        if self._remote_task is None or self._remote_task.done():
+            self._remote_task = asyncio.create_task(
+                self._rebuild_remote(),
+                name="food-catalog-remote-rebuild",
+                context=contextvars.Context(),
+            )
+
+    async def _rebuild_remote(self) -> None:
+        await asyncio.sleep(self.debounce)
+        while self._remote_since is not None:
+            since, self._remote_since = self._remote_since, None
+            try:
+                await self.rebuild(newer_than=since)
+            except Exception as e:
+                logger.error(f"食物目录重建失败: {e!r}")
+                return
+
+    async def _rebuild_pending(self) -> None:
+        await asyncio.sleep(self.debounce)  # 合并短时间内的连续写入
+        while self._built != self._changes:
+            try:
+                await self.rebuild()
+            except Exception as e:
+                logger.error(f"食物目录重建失败, 改为查询数据库直到下次重建: {e!r}")
+                return
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            try:
+                # 启动时总是重建; 之后只在共享表超过 refresh_interval 未重建时重建
+                newer_than = time.time() - self.refresh_interval
+                await self.rebuild(newer_than=newer_than if self.ready else None)
+            except Exception as e:
+                logger.error(f"食物目录重建失败: {e!r}")
+            await asyncio.sleep(self.refresh_interval if self.ready else 1.0)
+
+    async def start(self) -> None:
+        if not SUPPORTED:
+            logger.warning("当前平台不支持共享内存表, 食物目录改为直接查询数据库")
+            return
+        if self._refresh_task is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._reader = SharedTableReader(self.path)
+            self._refresh_task = asyncio.create_task(
+                self._refresh_loop(),
+                name="food-catalog-refresh",
+                context=contextvars.Context(),
+            )
+
+    async def stop(self) -> None:
+        tasks = [
+            task
+            for task in (self._refresh_task, self._rebuild_task, self._remote_task)
+            if task is not None
+        ]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._refresh_task = self._rebuild_task = self._remote_task = None
+        self._armed = False
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
+
+
+food_catalog = FoodCatalog(
+    default_path(settings), refresh_interval=settings.shared_catalog_refresh
+)
+invalidation_bus.subscribe("food", lambda key: food_catalog.remote_changed())
@@ -4,6 +4,7 @@ from sqlalchemy import asc, desc, or_, select
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.invalidation import invalidation_bus
 from app.foods.model import Food
 
 
@@ -65,6 +66,10 @@ class FoodRepository:
 
         return foods
 
+    async def list_all(self) -> list[Food]:
+        """全部食物（按 id 排序），用于重建共享目录"""
+        return list(await self.session.scalars(select(Food).order_by(Food.id)))
+
     async def create(self, food_data: Mapping[str, Any]) -> Food:
         food = Food(**food_data)
         self.session.add(food)
@@ -73,6 +78,7 @@ class FoodRepository:
         except IntegrityError:
             await self.session.rollback()
             raise
+        invalidation_bus.publish("food", food.id)
         await self.session.refresh(food)
         return food
 
@@ -88,6 +94,7 @@ class FoodRepository:
         for key, value in food_data.items():
             setattr(food, key, value)
         await self.session.commit()
+        invalidation_bus.publish("food", food.id)
         await self.session.refresh(food)
         return food
 
@@ -98,4 +105,5 @@ class FoodRepository:
 
         await self.session.delete(food)
         await self.session.commit()
+        invalidation_bus.publish("food", food_id)
         return True
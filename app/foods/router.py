@@ -1,12 +1,20 @@
-from typing import Annotated
+from typing import Annotated, Literal
 
-from fastapi import APIRouter, Depends, Path
+from fastapi import APIRouter, Depends, Path, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_session
-from app.core.exception import NotFoundException
+from app.core.database import session_for
+from app.core.query_stats import query_budget
+from app.core.serialization import PreSerializedJSONResponse
+from app.core.warmup import warmup_query
 from app.foods.repository import FoodRepository
-from app.foods.schema import FoodCreate, FoodResponse, FoodUpdate
+from app.foods.schema import (
+    FoodCreate,
+    FoodResponse,
+    FoodUpdate,
+    food_list_serializer,
+    food_serializer,
+)
 from app.foods.service import FoodService
 
 router = APIRouter(prefix="/foods", tags=["foods"])
@@ -14,30 +22,61 @@ router = APIRouter(prefix="/foods", tags=["foods"])
 
 # 依赖注入：为路由请求提供 FoodService
 async def get_food_service(
-    session: Annotated[AsyncSession, Depends(get_session)],
+    session: Annotated[AsyncSession, Depends(session_for("catalog"))],
 ) -> FoodService:
     repository = FoodRepository(session)
     return FoodService(repository)
 
 
+# 启动预热: 列表与详情查询在每个预热连接上执行一次
+@warmup_query("catalog")
+async def warm_foods(session: AsyncSession) -> None:
+    repository = FoodRepository(session)
+    await repository.get_all(limit=1)
+    await repository.get_by_id(0)
+
+
 @router.post("/", response_model=FoodResponse, status_code=201)
 async def create_food(
     food_data: Annotated[FoodCreate, Depends()],
     service: Annotated[FoodService, Depends(get_food_service)],
 ):
     new_food = await service.create_food(food_data)
-    return new_food
+    return food_serializer.response(new_food, status_code=201)
+
+
+# 路由直接返回已序列化的响应, response_model 仅用于 OpenAPI 文档
+@router.get("/", response_model=list[FoodResponse])
+@query_budget(1)
+async def list_foods(
+    service: Annotated[FoodService, Depends(get_food_service)],
+    search: Annotated[str | None, Query(description="模糊搜索关键字")] = None,
+    order_by: Annotated[
+        str, Query(description="排序字段: id, name, created_at")
+    ] = "id",
+    direction: Annotated[Literal["asc", "desc"], Query(description="排序方向")] = "asc",
+    limit: Annotated[int, Query(ge=1, le=500, description="每页数量")] = 10,
+    offset: Annotated[int, Query(ge=0, description="偏移量")] = 0,
+):
+    foods = await service.list_foods(
+        search=search,
+        order_by=order_by,
+        direction=direction,
+        limit=limit,
+        offset=offset,
+    )
+    return food_list_serializer.response(foods)
 
 
 @router.get("/{food_name}", response_model=FoodResponse)
+@query_budget(1)
 async def read_food(
     food_name: Annotated[str, Path(..., description="食物名称")],
     service: Annotated[FoodService, Depends(get_food_service)],
 ):
-    food = await service.get_food_by_name(food_name)
-    if not food:
-        raise NotFoundException("Food not found")
-    return food
+    # 命中共享目录时直接返回其中的 JSON, 不查询数据库也不经过模型
+    body = await service.get_food_json_by_name(food_name)
+    return PreSerializedJSONResponse(body)
 
 
 @router.patch("/{food_id}", response_model=FoodResponse)
@@ -46,7 +85,8 @@ async def update_food(
     food: FoodUpdate,
     service: Annotated[FoodService, Depends(get_food_service)],
 ):
-    return await service.update_food(food_id, food)
+    updated = await service.update_food(food_id, food)
+    return food_serializer.response(updated)
 
 
 @router.delete("/{food_id}", status_code=204)
@@ -2,6 +2,8 @@ from typing import Annotated
 
 from pydantic import BaseModel, ConfigDict, Field
 
+from app.core.serialization import ResponseSerializer
+
 
 class FoodBase(BaseModel):
     name: Annotated[str, Field(..., max_length=100, description="名称")]
@@ -27,3 +29,8 @@ class FoodResponse(FoodBase):
     id: int
 
     model_config = ConfigDict(from_attributes=True)
+
+
+# 预编译的序列化器：服务层验证一次，路由层直接输出 JSON bytes
+food_serializer = ResponseSerializer(FoodResponse)
+food_list_serializer = ResponseSerializer(list[FoodResponse])
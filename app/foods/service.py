@@ -1,27 +1,50 @@
 from sqlalchemy.exc import IntegrityError
 
 from app.core.exception import AlreadyExistsException, NotFoundException
+from app.foods.catalog import FoodCatalog, food_catalog
 from app.foods.repository import FoodRepository
-from app.foods.schema import FoodCreate, FoodResponse, FoodUpdate
+from app.foods.schema import (
+    FoodCreate,
+    FoodResponse,
+    FoodUpdate,
+    food_list_serializer,
+    food_serializer,
+)
 
 
 class FoodService:
     """Food 服务层：封装业务逻辑并调用 repository"""
 
-    def __init__(self, repository: FoodRepository) -> None:
+    def __init__(
+        self, repository: FoodRepository, catalog: FoodCatalog = food_catalog
+    ) -> None:
         self.repository = repository
+        self.catalog = catalog
 
     async def get_food_by_name(self, name: str) -> FoodResponse:
+        cached = self.catalog.get_by_name(name)
+        if cached is not None:
+            return FoodResponse.model_validate_json(cached)
         food = await self.repository.get_by_name(name)
         if not food:
             raise NotFoundException("Food not found")
-        return FoodResponse.model_validate(food)
+        return food_serializer.validate(food)
+
+    async def get_food_json_by_name(self, name: str) -> bytes:
+        """响应 JSON；命中共享目录时直接返回其中的 bytes，不经过模型"""
+        cached = self.catalog.get_by_name(name)
+        if cached is not None:
+            return cached
+        return food_serializer.dump_json(await self.get_food_by_name(name))
 
     async def get_food_by_id(self, id: int) -> FoodResponse:
+        cached = self.catalog.get(id)
+        if cached is not None:
+            return FoodResponse.model_validate_json(cached)
         food = await self.repository.get_by_id(id)
         if not food:
             raise NotFoundException("Food not found")
-        return FoodResponse.model_validate(food)
+        return food_serializer.validate(food)
 
     async def list_foods(
         self,
@@ -40,13 +63,14 @@ class FoodService:
             limit=limit,
             offset=offset,
         )
-        return [FoodResponse.model_validate(food) for food in foods]
+        return food_list_serializer.validate(foods)
 
     async def create_food(self, food_data: FoodCreate) -> FoodResponse:
         data = food_data.model_dump()
         try:
             food = await self.repository.create(data)
-            return FoodResponse.model_validate(food)
+            self.catalog.changed()
+            return food_serializer.validate(food)
         except IntegrityError as e:
             raise AlreadyExistsException("Food with this name already exists") from e
 
@@ -60,7 +84,8 @@ class FoodService:
             updated = await self.repository.update(food_id, update_data)
             if not updated:
                 raise NotFoundException("Food not found")
-            return FoodResponse.model_validate(updated)
+            self.catalog.changed()
+            return food_serializer.validate(updated)
         except IntegrityError as e:
             raise AlreadyExistsException("Food with this name already exists") from e
 
@@ -68,4 +93,5 @@ class FoodService:
         deleted = await self.repository.delete(id)
         if not deleted:
             raise NotFoundException("Food not found")
+        self.catalog.changed()
         return True
@@ -0,0 +1,264 @@
+"""生产入口：多 worker 启动器
+
+    python -m app.launcher --host 0.0.0.0 --port 8000
+
+- 事件循环与 HTTP 解析：安装了 uvloop / httptools 时使用，否则退回 asyncio / h11
+- worker 数：默认取可用 CPU 数（考虑 CPU 亲和性与 cgroup 配额），设置了
+  `db_connection_budget` 时不超过 预算 / 每个 worker 最多占用的连接数
+- 预派生（`preload`）：主进程先导入应用、挂载全部路由、生成 OpenAPI 文档，
+  再 `gc.freeze()` 后 fork；这些只读对象由各 worker 写时复制共享，
+  worker 启动只需执行 lifespan。数据库连接、后台任务都在 worker 内创建
+- 重启策略：worker 处理 `max_requests` (+ `max_requests_jitter` 内的随机量) 个
+  请求后优雅退出，由主进程 fork 新 worker 补上；异常退出同样补上
+- 信号：SIGTERM / SIGINT 转发给 worker 并等待其排空退出；SIGHUP 转发给 worker
+  热更新配置（见 `app.core.reload`），主进程同步更新，之后补上的 worker 沿用新配置
+
+单 worker 时不 fork，直接在当前进程运行。
+"""
+
+import argparse
+import asyncio
+import gc
+import importlib.util
+import math
+import os
+import signal
+import time
+from pathlib import Path
+
+import uvicorn
+from loguru import logger
+
+from app.core.config import Settings, settings
+from app.core.database import DEFAULT_POOL
+from app.core.logging import flush_logging
+
+APP = "app.main:app"
+
+
+def available_cpus(cgroup_root: str = "/sys/fs/cgroup") -> int:
+    """当前进程可用的 CPU 数：亲和性掩码与 cgroup v2 配额 (cpu.max) 取小"""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:  # 非 Linux
+        cpus = os.cpu_count() or 1
+    try:
+        quota, period = Path(cgroup_root, "cpu.max").read_text().split()
+        if quota != "max":
+            cpus = min(cpus, max(1, math.ceil(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+    return cpus
+
+
+def connections_per_worker(config: Settings) -> int:
+    """每个 worker 最多占用的数据库连接数（全部连接池用满时）；不限时返回 0"""
+    total = 0
+    for name in (DEFAULT_POOL, *config.db_pools):
+        options = config.pool_engine_options(name)
+        # SQLite 与 NullPool 没有容量参数
+        total += options.get("pool_size", 0) + options.get("max_overflow", 0)
+    return total
+
+
+def worker_count(config: Settings, cpus: int) -> int:
+    if config.workers > 0:
+        return config.workers
+    workers = cpus
+    per_worker = connections_per_worker(config)
+    if config.db_connection_budget > 0 and per_worker > 0:
+        workers = min(workers, config.db_connection_budget // per_worker)
+    return max(1, workers)
+
+
+def _available(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+def build_config(host: str, port: int, config: Settings) -> uvicorn.Config:
+    return uvicorn.Config(
+        APP,
+        host=host,
+        port=port,
+        loop="uvloop" if _available("uvloop") else "asyncio",
+        http="httptools" if _available("httptools") else "h11",
+        limit_max_requests=config.max_requests or None,
+        limit_max_requests_jitter=config.max_requests_jitter,
+        # 停机排空由应用的 ShutdownManager 负责, 这里只需留出足够时间
+        timeout_graceful_shutdown=int(config.shutdown_timeout) + 5,
+    )
+
+
+def preload(config: uvicorn.Config) -> None:
+    """fork 前导入应用并生成只读状态，之后冻结 GC 以免破坏写时复制"""
+    start = time.perf_counter()
+    config.load()
+    from app.core.routers import include_pending
+    from app.main import app
+
+    include_pending(app)
+    if settings.openapi_prebuild:
+        app.openapi()
+    # 冻结前先回收, 冻结后这些对象移入永久代, worker 的 GC 不再遍历 (写入引用计数所在页)
+    gc.collect()
+    gc.freeze()
+    logger.info(
+        f"应用已预加载 ({(time.perf_counter() - start) * 1e3:.0f}ms), "
+        f"冻结对象 {gc.get_freeze_count()} 个"
+    )
+
+
+class Supervisor:
+    """预派生 worker 并保持数量；主进程不运行事件循环，只处理信号与回收子进程"""
+
+    def __init__(
+        self,
+        config: uvicorn.Config,
+        workers: int,
+        *,
+        preload: bool = True,
+        stop_timeout: float = 30.0,
+    ) -> None:
+        self.config = config
+        self.workers = workers
+        self.preload = preload
+        self.stop_timeout = stop_timeout
+        self.children: dict[int, float] = {}  # pid -> 启动时间
+        self._stopping = False
+        self._reload = False
+
+    def _handle_stop(self, signum, frame) -> None:
+        self._stopping = True
+
+    def _handle_reload(self, signum, frame) -> None:
+        self._reload = True
+
+    def spawn(self, sock) -> int:
+        pid = os.fork()
+        if pid:
+            self.children[pid] = time.monotonic()
+            return pid
+        # worker: 独立进程组, 终端的 Ctrl-C 只发给主进程, 由主进程统一转发一次
+        os.setpgid(0, 0)
+        # 恢复默认信号处理, 交给 uvicorn 与 lifespan 重新注册
+        for sig in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP):
+            signal.signal(sig, signal.SIG_DFL)
+        code = 0
+        try:
+            uvicorn.Server(self.config).run(sockets=[sock])
+        except BaseException:
+            logger.exception("worker 异常退出")
+            code = 1
+        finally:
+            flush_logging()
+            os._exit(code)
+
+    def reap(self) -> None:
+        while self.children:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                self.children.clear()
+                return
+            if pid == 0:
+                return
+            started = self.children.pop(pid, None)
+            if started is None or self._stopping:
+                continue
+            code = os.waitstatus_to_exitcode(status)
+            if code != 0:
+                logger.warning(f"worker {pid} 异常退出 (code {code})")
+                if time.monotonic() - started < 1:
+                    time.sleep(1)  # 启动即崩溃时避免疯狂 fork
+            else:
+                logger.info(f"worker {pid} 已退出 (达到 max_requests), 启动新 worker")
+
+    def signal_children(self, sig: int) -> None:
+        for pid in list(self.children):
+            try:
+                os.kill(pid, sig)
+            except ProcessLookupError:
+                self.children.pop(pid, None)
+
+    def reload(self) -> None:
+        from app.core.reload import reload_settings
+
+        self._reload = False
+        logger.info("收到 SIGHUP, 重新加载配置")
+        self.signal_children(signal.SIGHUP)
+        try:
+            asyncio.run(reload_settings())  # 之后 fork 的 worker 使用新配置
+        except Exception as e:
+            logger.error(f"主进程重新加载配置失败: {e!r}")
+
+    def stop(self) -> None:
+        self.signal_children(signal.SIGTERM)
+        deadline = time.monotonic() + self.stop_timeout
+        while self.children and time.monotonic() < deadline:
+            self.reap()
+            time.sleep(0.1)
+        if self.children:
+            logger.warning(f"{len(self.children)} 个 worker 未按时退出, 强制结束")
+            self.signal_children(signal.SIGKILL)
+            while self.children:
+                self.reap()
+                time.sleep(0.05)
+
+    def run(self) -> None:
+        sock = self.config.bind_socket()
+        if self.preload:
+            preload(self.config)
+        signal.signal(signal.SIGTERM, self._handle_stop)
+        signal.signal(signal.SIGINT, self._handle_stop)
+        signal.signal(signal.SIGHUP, self._handle_reload)
+        logger.info(
+            f"主进程 {os.getpid()} 启动 {self.workers} 个 worker "
+            f"(loop={self.config.loop}, http={self.config.http})"
+        )
+        try:
+            while not self._stopping:
+                self.reap()
+                while len(self.children) < self.workers and not self._stopping:
+                    self.spawn(sock)
+                if self._reload:
+                    self.reload()
+                time.sleep(0.2)
+        finally:
+            self.stop()
+            sock.close()
+            logger.info("全部 worker 已退出")
+            flush_logging()
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=None, help="覆盖自动计算")
+    args = parser.parse_args(argv)
+
+    config = build_config(args.host, args.port, settings)
+    workers = args.workers or worker_count(settings, available_cpus())
+    if (
+        workers > 1
+        and settings.metrics_enabled
+        and not settings.metrics_multiprocess_dir
+    ):
+        logger.warning(
+            "多 worker 未设置 metrics_multiprocess_dir, /metrics 只反映单个 worker"
+        )
+    if workers == 1:
+        uvicorn.Server(config).run()
+        return
+    Supervisor(
+        config,
+        workers,
+        preload=settings.preload,
+        stop_timeout=settings.shutdown_timeout + 10,
+    ).run()
+
+
+if __name__ == "__main__":
+    main()
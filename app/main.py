@@ -1,19 +1,40 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from loguru import logger
 
+from app.core.admin import router as admin_router
+from app.core.admission import AdaptiveLimiter, AdmissionControlMiddleware
+from app.core.compression import CompressionMiddleware
+from app.core.config import settings
+from app.core.deadline import DeadlineMiddleware
 from app.core.exception import register_exception_handlers
+from app.core.health import router as health_router
 from app.core.lifespan import lifespan
-from app.profiles import router as profile_routers
+from app.core.logging import RequestIdMiddleware, setup_logging
+from app.core.metrics import MetricsMiddleware
+from app.core.metrics import router as metrics_router
+from app.core.profiling import ProfilingMiddleware, profiling_available
+from app.core.query_stats import QueryStatsMiddleware
+from app.core.responses import json_response_class
+from app.core.routers import register_routers
+from app.core.shutdown import ShutdownManager, ShutdownMiddleware
 
 
 def create_app() -> FastAPI:
+    setup_logging()  # 非阻塞日志管道, 需在其它模块输出日志前配置
+
     app = FastAPI(
         title="fastapi_sqlmodel_demo",
         version="0.1.0",
         description="Demo API for FastAPI + SQLModel",
         lifespan=lifespan,  # 绑定生命周期管理器
+        # 全局默认响应类 (orjson / msgspec / stdlib)
+        default_response_class=json_response_class(settings.json_backend),
     )
 
+    # 领域路由: 自动发现 app/*/router.py; 延迟导入时添加的中间件位于最内层
+    register_routers(app, lazy=settings.lazy_routers)
+
     # 中间件（按需启用）
     app.add_middleware(
         CORSMiddleware,
@@ -22,14 +43,70 @@ def create_app() -> FastAPI:
         allow_methods=["*"],
         allow_headers=["*"],
     )
+    if settings.compression_enabled:
+        app.add_middleware(
+            CompressionMiddleware,
+            minimum_size=settings.compression_minimum_size,
+            gzip_level=settings.compression_gzip_level,
+            brotli_quality=settings.compression_brotli_quality,
+            zstd_level=settings.compression_zstd_level,
+        )
+    if settings.query_stats_enabled:
+        app.add_middleware(
+            QueryStatsMiddleware,
+            server_timing=settings.server_timing_enabled,
+            n_plus_one_threshold=settings.n_plus_one_threshold,
+            default_budget=settings.query_budget_default,
+            mode=settings.query_guard_mode,
+        )
+    if settings.admission_enabled:
+        # 位于指标中间件内层: 被拒绝的 503 也会计入请求指标
+        app.add_middleware(
+            AdmissionControlMiddleware,
+            limiter=AdaptiveLimiter(
+                initial_limit=settings.admission_initial_limit
+                or settings.pool_size + settings.max_overflow,
+                max_queue=settings.admission_max_queue,
+                queue_timeout=settings.admission_queue_timeout,
+                latency_target=settings.admission_latency_target_ms / 1e3,
+                pool_wait_threshold=settings.admission_pool_wait_threshold_ms / 1e3,
+            ),
+            priorities=settings.admission_priorities,
+        )
+    if settings.deadline_enabled:
+        # 位于准入控制外层: 排队等待的时间也计入截止时间
+        app.add_middleware(
+            DeadlineMiddleware,
+            default_timeout=settings.request_timeout,
+            route_timeouts=settings.request_timeout_routes,
+        )
+    if settings.metrics_enabled:
+        # 后添加的在外层，统计的耗时包含压缩等其它中间件
+        app.add_middleware(MetricsMiddleware)
+    if settings.profiling_enabled:
+        if profiling_available():
+            app.add_middleware(
+                ProfilingMiddleware,
+                directory=settings.profiling_dir,
+                token=settings.admin_token,
+                sample_rate=settings.profiling_sample_rate,
+                interval=settings.profiling_interval,
+                fmt=settings.profiling_format,
+            )
+        else:
+            logger.warning(
+                "已开启 profiling_enabled 但未安装 pyinstrument, 跳过请求剖析"
+            )
+    # 停机排空: 位于准入与指标外层, 排空期间的请求直接返回 503
+    app.add_middleware(ShutdownMiddleware, manager=ShutdownManager.for_app(app))
+    # 最外层: 请求 ID 对所有中间件与路由的日志可见
+    app.add_middleware(RequestIdMiddleware)
 
-    # 路由注册
-    app.include_router(profile_routers.router, prefix="", tags=["profile"])
-
-    # 健康检查
-    @app.get("/healthz", tags=["health"])
-    async def healthz():
-        return {"status": "ok"}
+    # 基础设施路由
+    if settings.metrics_enabled:
+        app.include_router(metrics_router, tags=["metrics"])
+    app.include_router(admin_router)
+    app.include_router(health_router)  # /healthz 与 /readyz
 
     # 注册全局异常处理
     register_exception_handlers(app)
@@ -24,6 +24,5 @@ class Profile(Base, DateTimeMixin):
     description: Mapped[str | None] = mapped_column(
         String(255), nullable=True, comment="描述"
     )
-    reminders: Mapped[list["Reminder"]] = relationship(
-        back_populates="profile", comment="提醒事项列表"
-    )
+    # 提醒事项列表
+    reminders: Mapped[list["Reminder"]] = relationship(back_populates="profile")
@@ -4,6 +4,7 @@ from sqlalchemy import asc, desc, or_, select
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.invalidation import invalidation_bus
 from app.profiles.model import Profile
 
 
@@ -70,6 +71,7 @@ class ProfileRepository:
         except IntegrityError:
             await self.session.rollback()
             raise
+        invalidation_bus.publish("profile", profile.id)
         await self.session.refresh(profile)
         return profile
 
@@ -85,6 +87,7 @@ class ProfileRepository:
         for key, value in profile_data.items():
             setattr(profile, key, value)
         await self.session.commit()
+        invalidation_bus.publish("profile", profile.id)
         await self.session.refresh(profile)
         return profile
 
@@ -95,4 +98,5 @@ class ProfileRepository:
 
         await self.session.delete(profile)
         await self.session.commit()
+        invalidation_bus.publish("profile", profile_id)
         return True
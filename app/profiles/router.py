@@ -1,12 +1,20 @@
-from typing import Annotated
+from typing import Annotated, Literal
 
-from fastapi import APIRouter, Depends, Path
+from fastapi import APIRouter, Depends, Path, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_session
 from app.core.exception import NotFoundException
+from app.core.query_stats import query_budget
+from app.core.warmup import warmup_query
 from app.profiles.repository import ProfileRepository
-from app.profiles.schema import ProfileCreate, ProfileResponse, ProfileUpdate
+from app.profiles.schema import (
+    ProfileCreate,
+    ProfileResponse,
+    ProfileUpdate,
+    profile_list_serializer,
+    profile_serializer,
+)
 from app.profiles.service import ProfileService
 
 router = APIRouter(prefix="/profiles", tags=["profiles"])
@@ -20,16 +28,48 @@ async def get_profile_service(
     return ProfileService(repository)
 
 
+# 启动预热: 列表与详情查询在每个预热连接上执行一次
+@warmup_query()
+async def warm_profiles(session: AsyncSession) -> None:
+    repository = ProfileRepository(session)
+    await repository.get_all(limit=1)
+    await repository.get_by_id(0)
+
+
 @router.post("/", response_model=ProfileResponse, status_code=201)
 async def create_profile(
     profile_data: Annotated[ProfileCreate, Depends()],
     service: Annotated[ProfileService, Depends(get_profile_service)],
 ):
     new_profile = await service.create_profile(profile_data)
-    return new_profile
+    return profile_serializer.response(new_profile, status_code=201)
+
+
+# 路由直接返回已序列化的响应, response_model 仅用于 OpenAPI 文档
+@router.get("/", response_model=list[ProfileResponse])
+@query_budget(1)
+async def list_profiles(
+    service: Annotated[ProfileService, Depends(get_profile_service)],
+    search: Annotated[str | None, Query(description="模糊搜索关键字")] = None,
+    order_by: Annotated[
+        str, Query(description="排序字段: id, name, created_at")
+    ] = "id",
+    direction: Annotated[Literal["asc", "desc"], Query(description="排序方向")] = "asc",
+    limit: Annotated[int, Query(ge=1, le=500, description="每页数量")] = 10,
+    offset: Annotated[int, Query(ge=0, description="偏移量")] = 0,
+):
+    profiles = await service.list_profiles(
+        search=search,
+        order_by=order_by,
+        direction=direction,
+        limit=limit,
+        offset=offset,
+    )
+    return profile_list_serializer.response(profiles)
 
 
 @router.get("/{profile_name}", response_model=ProfileResponse)
+@query_budget(1)
 async def get_profile(
     profile_name: Annotated[str, Path(..., description="宠物名称")],
     service: Annotated[ProfileService, Depends(get_profile_service)],
@@ -37,7 +77,7 @@ async def get_profile(
     profile = await service.get_profile_by_name(profile_name)
     if not profile:
         raise NotFoundException("Profile not found")
-    return profile
+    return profile_serializer.response(profile)
 
 
 @router.patch("/{profile_id}", response_model=ProfileResponse)
@@ -46,7 +86,8 @@ async def update_profile(
     profile: ProfileUpdate,
     service: Annotated[ProfileService, Depends(get_profile_service)],
 ):
-    return await service.update_profile(profile_id, profile)
+    updated = await service.update_profile(profile_id, profile)
+    return profile_serializer.response(updated)
 
 
 @router.delete("/{profile_id}", status_code=204)
@@ -3,6 +3,8 @@ from typing import Annotated
 
 from pydantic import BaseModel, ConfigDict, Field
 
+from app.core.serialization import ResponseSerializer
+
 
 class ProfileBase(BaseModel):
     """基类"""
@@ -35,3 +37,8 @@ class ProfileResponse(ProfileBase):
 
     id: int
     model_config = ConfigDict(from_attributes=True)
+
+
+# 预编译的序列化器：服务层验证一次，路由层直接输出 JSON bytes
+profile_serializer = ResponseSerializer(ProfileResponse)
+profile_list_serializer = ResponseSerializer(list[ProfileResponse])
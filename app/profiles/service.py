@@ -2,7 +2,13 @@ from sqlalchemy.exc import IntegrityError
 
 from app.core.exception import AlreadyExistsException, NotFoundException
 from app.profiles.repository import ProfileRepository
-from app.profiles.schema import ProfileCreate, ProfileResponse, ProfileUpdate
+from app.profiles.schema import (
+    ProfileCreate,
+    ProfileResponse,
+    ProfileUpdate,
+    profile_list_serializer,
+    profile_serializer,
+)
 
 
 class ProfileService:
@@ -16,14 +22,14 @@ class ProfileService:
         if not profile:
             raise NotFoundException("Profile not found")
 
-        return ProfileResponse.model_validate(profile)
+        return profile_serializer.validate(profile)
 
     async def get_profile_by_id(self, profile_id: int) -> ProfileResponse:
         profile = await self.repository.get_by_id(profile_id)
         if not profile:
             raise NotFoundException("Profile not found")
 
-        return ProfileResponse.model_validate(profile)
+        return profile_serializer.validate(profile)
 
     async def list_profiles(
         self,
@@ -43,14 +49,14 @@ class ProfileService:
             offset=offset,
         )
 
-        return [ProfileResponse.model_validate(profile) for profile in profiles]
+        return profile_list_serializer.validate(profiles)
 
     async def create_profile(self, profile_data: ProfileCreate) -> ProfileResponse:
         data = profile_data.model_dump()
         try:
             profile = await self.repository.create(data)
 
-            return ProfileResponse.model_validate(profile)
+            return profile_serializer.validate(profile)
         except IntegrityError as e:
             raise AlreadyExistsException("Profile with this name already exists") from e
 
@@ -65,7 +71,7 @@ class ProfileService:
             if not updated:
                 raise NotFoundException("Profile not found")
 
-            return ProfileResponse.model_validate(updated)
+            return profile_serializer.validate(updated)
         except IntegrityError as e:
             raise AlreadyExistsException("Profile with this name already exists") from e
 
@@ -1,8 +1,12 @@
+from typing import TYPE_CHECKING
+
 from sqlalchemy import Boolean, ForeignKey, String
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.core.base_model import Base, DateTimeMixin
-from app.profiles.model import Profile
+
+if TYPE_CHECKING:
+    from app.profiles.model import Profile  # for type checkers only
 
 
 class Reminder(Base, DateTimeMixin):
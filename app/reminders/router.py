@@ -1,12 +1,20 @@
-from typing import Annotated
+from typing import Annotated, Literal
 
-from fastapi import APIRouter, Depends, Path
+from fastapi import APIRouter, Depends, Path, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_session
 from app.core.exception import NotFoundException
+from app.core.query_stats import query_budget
+from app.core.warmup import warmup_query
 from app.reminders.repository import ReminderRepository
-from app.reminders.schema import ReminderCreate, ReminderResponse, ReminderUpdate
+from app.reminders.schema import (
+    ReminderCreate,
+    ReminderResponse,
+    ReminderUpdate,
+    reminder_list_serializer,
+    reminder_serializer,
+)
 from app.reminders.service import ReminderService
 
 router = APIRouter(prefix="/reminders", tags=["reminders"])
@@ -20,16 +28,48 @@ async def get_reminder_service(
     return ReminderService(repository)
 
 
+# 启动预热: 列表与详情查询在每个预热连接上执行一次
+@warmup_query()
+async def warm_reminders(session: AsyncSession) -> None:
+    repository = ReminderRepository(session)
+    await repository.get_all(limit=1)
+    await repository.get_by_id(0)
+
+
 @router.post("/", response_model=ReminderResponse, status_code=201)
 async def create_reminder(
     reminder_data: Annotated[ReminderCreate, Depends()],
     service: Annotated[ReminderService, Depends(get_reminder_service)],
 ):
     new_reminder = await service.create_reminder(reminder_data)
-    return new_reminder
+    return reminder_serializer.response(new_reminder, status_code=201)
+
+
+# 路由直接返回已序列化的响应, response_model 仅用于 OpenAPI 文档
+@router.get("/", response_model=list[ReminderResponse])
+@query_budget(1)
+async def list_reminders(
+    service: Annotated[ReminderService, Depends(get_reminder_service)],
+    search: Annotated[str | None, Query(description="模糊搜索关键字")] = None,
+    order_by: Annotated[
+        str, Query(description="排序字段: id, title, created_at")
+    ] = "id",
+    direction: Annotated[Literal["asc", "desc"], Query(description="排序方向")] = "asc",
+    limit: Annotated[int, Query(ge=1, le=500, description="每页数量")] = 10,
+    offset: Annotated[int, Query(ge=0, description="偏移量")] = 0,
+):
+    reminders = await service.list_reminders(
+        search=search,
+        order_by=order_by,
+        direction=direction,
+        limit=limit,
+        offset=offset,
+    )
+    return reminder_list_serializer.response(reminders)
 
 
 @router.get("/{reminder_title}", response_model=ReminderResponse)
+@query_budget(1)
 async def get_reminder(
     reminder_title: Annotated[str, Path(..., description="提醒事项标题")],
     service: Annotated[ReminderService, Depends(get_reminder_service)],
@@ -37,7 +77,7 @@ async def get_reminder(
     reminder = await service.get_reminder_by_title(reminder_title)
     if not reminder:
         raise NotFoundException("Reminder not found")
-    return reminder
+    return reminder_serializer.response(reminder)
 
 
 @router.patch("/{reminder_id}", response_model=ReminderResponse)
@@ -46,7 +86,8 @@ async def update_reminder(
     reminder: ReminderUpdate,
     service: Annotated[ReminderService, Depends(get_reminder_service)],
 ):
-    return await service.update_reminder(reminder_id, reminder)
+    updated = await service.update_reminder(reminder_id, reminder)
+    return reminder_serializer.response(updated)
 
 
 @router.delete("/{reminder_id}", status_code=204)
@@ -3,6 +3,8 @@ from typing import Annotated
 
 from pydantic import BaseModel, ConfigDict, Field
 
+from app.core.serialization import ResponseSerializer
+
 
 class ReminderBase(BaseModel):
     """基类"""
@@ -39,3 +41,8 @@ class ReminderResponse(ReminderBase):
 
     id: int
     model_config = ConfigDict(from_attributes=True)
+
+
+# 预编译的序列化器：服务层验证一次，路由层直接输出 JSON bytes
+reminder_serializer = ResponseSerializer(ReminderResponse)
+reminder_list_serializer = ResponseSerializer(list[ReminderResponse])
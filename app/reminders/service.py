@@ -2,7 +2,13 @@ from sqlalchemy.exc import IntegrityError
 
 from app.core.exception import AlreadyExistsException, NotFoundException
 from app.reminders.repository import ReminderRepository
-from app.reminders.schema import ReminderCreate, ReminderResponse, ReminderUpdate
+from app.reminders.schema import (
+    ReminderCreate,
+    ReminderResponse,
+    ReminderUpdate,
+    reminder_list_serializer,
+    reminder_serializer,
+)
 
 
 class ReminderService:
@@ -15,14 +21,14 @@ class ReminderService:
         if not reminder:
             raise NotFoundException("Reminder not found")
 
-        return ReminderResponse.model_validate(reminder)
+        return reminder_serializer.validate(reminder)
     
     async def get_reminder_by_id(self, reminder_id: int) -> ReminderResponse:
         reminder = await self.repository.get_by_id(reminder_id)
         if not reminder:
             raise NotFoundException("Reminder not found")
 
-        return ReminderResponse.model_validate(reminder)
+        return reminder_serializer.validate(reminder)
     
     async def list_reminders(
         self,
@@ -42,14 +48,14 @@ class ReminderService:
             offset=offset,
         )
 
-        return [ReminderResponse.model_validate(reminder) for reminder in reminders]
+        return reminder_list_serializer.validate(reminders)
     
     async def create_reminder(self, reminder_data: ReminderCreate) -> ReminderResponse:
         data = reminder_data.model_dump()
         try:
             reminder = await self.repository.create(data)
 
-            return ReminderResponse.model_validate(reminder)
+            return reminder_serializer.validate(reminder)
         except IntegrityError as e:
             raise AlreadyExistsException("Reminder with this title already exists") from e
 
@@ -64,7 +70,7 @@ class ReminderService:
             if not updated:
                 raise NotFoundException("Reminder not found")
 
-            return ReminderResponse.model_validate(updated)
+            return reminder_serializer.validate(updated)
         except IntegrityError as e:
             raise AlreadyExistsException("Reminder with this title already exists") from e
         
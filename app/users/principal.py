@@ -0,0 +1,54 @@
+"""当前用户 principal 快照与进程内缓存
+
+鉴权路由只需要用户的少量字段（是否激活、是否超管等），
+缓存这些字段的不可变快照，避免每个请求都查询 `users` 表。
+路由通过 `app.users.router.get_current_principal`（或 `CurrentPrincipal`）获取。
+"""
+
+from dataclasses import dataclass
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.invalidation import invalidation_bus
+from app.core.metrics import watch_cache
+from app.core.reload import on_reload
+from app.users.model import User
+
+
+@dataclass(frozen=True, slots=True)
+class Principal:
+    """鉴权相关的用户字段快照（不可变，可安全地跨请求共享）"""
+
+    id: int
+    username: str
+    is_active: bool
+    is_superuser: bool
+    is_verified: bool
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        return cls(
+            id=user.id,
+            username=user.username,
+            is_active=user.is_active,
+            is_superuser=user.is_superuser,
+            is_verified=user.is_verified,
+        )
+
+
+# 以用户 ID 为 key；UserRepository 在修改用户后负责失效，并经失效总线广播给其它
+# worker / 节点；容量与 TTL 支持热更新
+principal_cache: TTLCache[int, Principal] = TTLCache(
+    "principal",
+    maxsize=settings.principal_cache_size if settings.principal_cache_ttl > 0 else 0,
+    ttl=settings.principal_cache_ttl,
+)
+watch_cache(principal_cache)
+invalidation_bus.attach_cache(principal_cache, "user")
+on_reload(
+    {"principal_cache_size", "principal_cache_ttl"},
+    lambda config: principal_cache.reconfigure(
+        maxsize=config.principal_cache_size if config.principal_cache_ttl > 0 else 0,
+        ttl=config.principal_cache_ttl,
+    ),
+)
@@ -8,6 +8,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.security import get_password_hash, verify_password
 from app.users.model import User
+from app.users.principal import Principal, principal_cache
 from app.users.schema import UserCreate, UserUpdate
 
 
@@ -20,6 +21,23 @@ class UserRepository:
         result = await db.get(User, user_id)
         return result
 
+    @staticmethod
+    async def get_principal(db: AsyncSession, user_id: int) -> Optional[Principal]:
+        """Get auth-relevant user snapshot, served from the principal cache"""
+        principal = principal_cache.get(user_id)
+        if principal is not None:
+            return principal
+
+        # Skip caching if the user is invalidated while the query is in flight
+        version = principal_cache.version()
+        db_user = await UserRepository.get_by_id(db, user_id)
+        if not db_user:
+            return None
+
+        principal = Principal.from_user(db_user)
+        principal_cache.set(user_id, principal, version=version)
+        return principal
+
     @staticmethod
     async def get_by_username(db: AsyncSession, username: str) -> Optional[User]:
         """Get user by username"""
@@ -79,6 +97,7 @@ class UserRepository:
 
         db_user.updated_at = datetime.now(timezone.utc)
         await db.commit()
+        principal_cache.invalidate(user_id)
         await db.refresh(db_user)
         return db_user
 
@@ -91,6 +110,7 @@ class UserRepository:
 
         await db.delete(db_user)
         await db.commit()
+        principal_cache.invalidate(user_id)
         return True
 
     @staticmethod
@@ -124,6 +144,7 @@ class UserRepository:
 
         db_user.is_verified = True
         await db.commit()
+        principal_cache.invalidate(user_id)
         await db.refresh(db_user)
         return db_user
 
@@ -139,6 +160,7 @@ class UserRepository:
         db_user.hashed_password = get_password_hash(new_password)
         db_user.updated_at = datetime.now(timezone.utc)
         await db.commit()
+        principal_cache.invalidate(user_id)
         await db.refresh(db_user)
         return db_user
 
@@ -0,0 +1,54 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Depends
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_session
+from app.core.exception import ForbiddenException, UnauthorizedException
+from app.core.query_stats import query_budget
+from app.core.security import TokenError, decode_access_token
+from app.users.principal import Principal
+from app.users.repo import user_repository
+from app.users.schema import PrincipalResponse
+
+router = APIRouter(prefix="/users", tags=["users"])
+
+bearer_scheme = HTTPBearer(auto_error=False)
+
+
+# 鉴权依赖：Bearer 令牌的 sub 为用户 ID，用户快照优先从 principal 缓存读取，
+# 缓存命中时不查询数据库
+async def get_current_principal(
+    credentials: Annotated[HTTPAuthorizationCredentials | None, Depends(bearer_scheme)],
+    session: Annotated[AsyncSession, Depends(get_session)],
+) -> Principal:
+    if credentials is None:
+        raise UnauthorizedException("Not authenticated")
+    try:
+        user_id = int(decode_access_token(credentials.credentials)["sub"])
+    except (TokenError, KeyError, ValueError):
+        raise UnauthorizedException("Invalid or expired token")
+
+    principal = await user_repository.get_principal(session, user_id)
+    if principal is None or not principal.is_active:
+        raise UnauthorizedException("Inactive or unknown user")
+    return principal
+
+
+async def get_current_superuser(
+    principal: Annotated[Principal, Depends(get_current_principal)],
+) -> Principal:
+    if not principal.is_superuser:
+        raise ForbiddenException("Superuser required")
+    return principal
+
+
+CurrentPrincipal = Annotated[Principal, Depends(get_current_principal)]
+CurrentSuperuser = Annotated[Principal, Depends(get_current_superuser)]
+
+
+@router.get("/me", response_model=PrincipalResponse)
+@query_budget(1)
+async def read_current_user(principal: CurrentPrincipal):
+    return principal
@@ -54,6 +54,18 @@ class UserResponse(UserBase):
     model_config = ConfigDict(from_attributes=True)
 
 
+class PrincipalResponse(BaseModel):
+    """current user (principal snapshot) response Schema"""
+
+    id: int
+    username: str
+    is_active: bool
+    is_superuser: bool
+    is_verified: bool
+
+    model_config = ConfigDict(from_attributes=True)
+
+
 # ========== authenticationrelated Schema ==========
 
 
@@ -4,6 +4,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.exception import AlreadyExistsException, NotFoundException
 from app.users.model import User
+from app.users.principal import Principal
 from app.users.repo import user_repository
 from app.users.schema import UserCreate, UserUpdate
 
@@ -17,6 +18,13 @@ class UserService:
     async def get_by_id(self, user_id: int) -> Optional[User]:
         return await user_repository.get_by_id(self._session, user_id)
 
+    async def get_principal(self, user_id: int) -> Principal:
+        """获取鉴权用的用户快照（优先走 principal 缓存）"""
+        principal = await user_repository.get_principal(self._session, user_id)
+        if not principal:
+            raise NotFoundException("User not found")
+        return principal
+
     async def get_by_username(self, username: str) -> Optional[User]:
         return await user_repository.get_by_username(self._session, username)
 
@@ -0,0 +1 @@
+"""性能基准测试 (不随应用发布, 通过 `python -m benchmarks.<name>` 运行)"""
@@ -0,0 +1,119 @@
+"""基准测试公共工具：数据库准备、分位数统计、报告输出"""
+
+import json
+import os
+import platform
+import subprocess
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+# 注册全部模型到 Base.metadata
+import app.auth.models
+import app.foods.model
+import app.profiles.model
+import app.reminders.model
+import app.users.model  # noqa: F401
+from app.core.base_model import Base
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """最近秩法分位数（输入需已排序）"""
+    if not sorted_values:
+        return 0.0
+    rank = max(
+        0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values)) - 1)
+    )
+    return sorted_values[rank]
+
+
+def summarize(latencies: list[float], elapsed: float, errors: int = 0) -> dict:
+    """延迟列表（秒）-> 吞吐与 p50/p95/p99（毫秒）"""
+    values = sorted(latencies)
+    return {
+        "requests": len(values),
+        "errors": errors,
+        "throughput_rps": round(len(values) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(values, 50) * 1e3, 3),
+        "p95_ms": round(percentile(values, 95) * 1e3, 3),
+        "p99_ms": round(percentile(values, 99) * 1e3, 3),
+        "max_ms": round(values[-1] * 1e3, 3) if values else 0.0,
+    }
+
+
+class StatementRecorder:
+    """记录引擎执行的 SQL（基于 before_cursor_execute 事件），用于统计语句数"""
+
+    def __init__(self, engine: AsyncEngine) -> None:
+        self.engine = engine
+        self.statements: list[tuple[str, object]] = []
+        self.active = False
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        if self.active:
+            self.statements.append((statement, parameters))
+
+    def __enter__(self) -> "StatementRecorder":
+        event.listen(self.engine.sync_engine, "before_cursor_execute", self._record)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        event.remove(self.engine.sync_engine, "before_cursor_execute", self._record)
+
+
+def sqlite_url(path: Path) -> str:
+    return f"sqlite+aiosqlite:///{path}"
+
+
+async def create_engine_or_none(url: str) -> AsyncEngine | None:
+    """创建引擎并探活；连接不上（例如本地没有 Postgres）时返回 None"""
+    engine = create_async_engine(url)
+    try:
+        async with engine.connect():
+            pass
+    except Exception as e:  # noqa: BLE001 - 任何连接错误都视为不可用
+        print(f"skip {engine.url.render_as_string()}: {e}", file=sys.stderr)
+        await engine.dispose()
+        return None
+    return engine
+
+
+async def reset_schema(engine: AsyncEngine) -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def write_report(
+    path: str | os.PathLike, name: str, params: dict, results: dict
+) -> None:
+    """写出可在不同提交之间 diff 的 JSON 报告（键排序、缩进固定）"""
+    report = {
+        "benchmark": name,
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "params": params,
+        "results": results,
+    }
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    Path(path).write_text(
+        json.dumps(report, indent=2, sort_keys=True, ensure_ascii=False) + "\n",
+        encoding="utf-8",
+    )
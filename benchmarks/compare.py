@@ -0,0 +1,52 @@
+"""对比两份基准报告，列出各指标的变化百分比
+
+用法:
+    python -m benchmarks.compare base.json head.json [--threshold 10]
+"""
+
+import argparse
+import json
+from pathlib import Path
+
+# 越大越好的指标，其余（延迟类）越小越好
+HIGHER_IS_BETTER = {"throughput_rps"}
+
+
+def flatten(results: dict, prefix: str = "") -> dict[str, float]:
+    flat: dict[str, float] = {}
+    for key, value in results.items():
+        name = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            flat.update(flatten(value, name))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = float(value)
+    return flat
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("base")
+    parser.add_argument("head")
+    parser.add_argument(
+        "--threshold", type=float, default=10.0, help="标记为回退的变化百分比"
+    )
+    args = parser.parse_args()
+
+    base = flatten(json.loads(Path(args.base).read_text("utf-8"))["results"])
+    head = flatten(json.loads(Path(args.head).read_text("utf-8"))["results"])
+
+    regressions = 0
+    for name in sorted(base.keys() & head.keys()):
+        old, new = base[name], head[name]
+        if not old:
+            continue
+        change = (new - old) / old * 100
+        worse = -change if name.rsplit(".", 1)[-1] in HIGHER_IS_BETTER else change
+        flag = "REGRESSION" if worse > args.threshold else ""
+        regressions += bool(flag)
+        print(f"{name:<48} {old:>12.3f} -> {new:>12.3f}  {change:+7.1f}%  {flag}")
+    raise SystemExit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""启动耗时基准：基于 `python -X importtime` 统计导入开销
+
+每轮在新的子进程中执行一段启动代码，解析 stderr 中的 importtime 输出：
+
+- `import`：`import app.main`（迁移脚本、命令行工具、worker 进程启动都要付出的成本）
+- `startup`：在上面基础上挂载全部路由并生成 OpenAPI 文档，相当于开始接收请求前的成本
+
+分别在 `LAZY_ROUTERS=true/false` 下运行，输出各场景的中位耗时（墙钟时间与
+app.main 的累计导入时间）以及自身耗时最高的模块，并写出 JSON 报告。
+指定 `--budget-ms` 时，`import-lazy` 场景 app.main 的中位导入耗时超出预算则以
+非零状态码退出（墙钟计时受机器负载影响，放在基准里而不是单元测试中检查）。
+
+用法:
+    python -m benchmarks.importtime --rounds 5 --top 15
+    python -m benchmarks.importtime --rounds 5 --budget-ms 1500
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from benchmarks.common import write_report
+
+SCENARIOS = {
+    "import": "import app.main",
+    "startup": (
+        "import app.main\n"
+        "from app.core.routers import include_pending\n"
+        "include_pending(app.main.app)\n"
+        "app.main.app.openapi()"
+    ),
+}
+
+
+def parse_importtime(stderr: str) -> dict[str, tuple[int, int]]:
+    """importtime 输出 -> {模块: (自身微秒, 累计微秒)}；同一模块只出现一次"""
+    modules: dict[str, tuple[int, int]] = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|", 2)
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return modules
+
+
+def measure(code: str, env: dict[str, str] | None = None) -> dict:
+    """在子进程中执行一次，返回墙钟时间与各模块导入耗时"""
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        env={**os.environ, **(env or {})},
+        check=False,
+    )
+    wall_ms = (time.perf_counter() - started) * 1e3
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+    modules = parse_importtime(proc.stderr)
+    return {
+        "wall_ms": wall_ms,
+        "app_main_ms": modules.get("app.main", (0, 0))[1] / 1e3,
+        "modules": modules,
+    }
+
+
+def run_scenario(code: str, env: dict[str, str], rounds: int, top: int) -> dict:
+    runs = [measure(code, env) for _ in range(rounds)]
+    # 自身耗时取各轮中位数, 排除单次抖动
+    names = set().union(*(run["modules"] for run in runs))
+    self_ms = {
+        name: statistics.median(
+            run["modules"].get(name, (0, 0))[0] / 1e3 for run in runs
+        )
+        for name in names
+    }
+    heaviest = sorted(self_ms.items(), key=lambda item: item[1], reverse=True)[:top]
+    return {
+        "wall_ms": round(statistics.median(run["wall_ms"] for run in runs), 1),
+        "app_main_ms": round(statistics.median(run["app_main_ms"] for run in runs), 1),
+        "modules": len(names),
+        # 列表保持排序 (报告按键排序写出)
+        "top_self_ms": [[name, round(ms, 2)] for name, ms in heaviest],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="报告中列出的模块数")
+    parser.add_argument("--out", default="benchmarks/reports/importtime.json")
+    parser.add_argument(
+        "--budget-ms", type=float, help="import app.main（延迟挂载路由）的耗时上限"
+    )
+    args = parser.parse_args()
+
+    results = {}
+    for lazy in ("true", "false"):
+        for scenario, code in SCENARIOS.items():
+            name = f"{scenario}-{'lazy' if lazy == 'true' else 'eager'}"
+            results[name] = r = run_scenario(
+                code, {"LAZY_ROUTERS": lazy}, args.rounds, args.top
+            )
+            print(
+                f"[{name:<14}] wall {r['wall_ms']:>8.1f} ms  "
+                f"app.main {r['app_main_ms']:>8.1f} ms  modules {r['modules']}"
+            )
+
+    params = {k: v for k, v in vars(args).items() if k != "out"}
+    write_report(args.out, "importtime", params, results)
+    print(f"report written to {args.out}")
+
+    if args.budget_ms is not None:
+        spent = results["import-lazy"]["app_main_ms"]
+        if spent > args.budget_ms:
+            print(f"OVER BUDGET import app.main {spent} ms > {args.budget_ms} ms")
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""JSON 响应序列化基准
+
+对比 FastAPI 默认响应类 (标准库 json) 与各高性能后端，载荷为列表接口形态的
+ReminderResponse / ProfileResponse（含 datetime / date 字段）。
+
+每个后端各建一个只有一条路由的应用（`default_response_class` 不同），通过 ASGI
+直接调用路由：FastAPI 在响应类之前都会执行 `serialize_response` /
+`jsonable_encoder`，各组的差异只来自响应类本身的编码，加速比不会被高估。
+
+用法:
+    python -m benchmarks.json_response --items 500 --rounds 200
+"""
+
+import argparse
+import asyncio
+import time
+from datetime import date, datetime, timedelta, timezone
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+
+from app.core.responses import json_response_class, msgspec, orjson
+from app.profiles.schema import ProfileResponse
+from app.reminders.schema import ReminderResponse
+
+
+def build_payload(items: int) -> list[dict]:
+    now = datetime.now(timezone.utc)
+    payload = []
+    for i in range(items):
+        reminder = ReminderResponse(
+            id=i,
+            title=f"reminder-{i}",
+            type="feeding",
+            due_date=now + timedelta(hours=i),
+            is_done=i % 3 == 0,
+            description="每日喂食提醒" if i % 2 else None,
+            profile_id=i % 50,
+        )
+        profile = ProfileResponse(
+            id=i,
+            name=f"pet-{i}",
+            gender="female",
+            variety="柴犬",
+            birthday=date(2020, 1, 1) + timedelta(days=i),
+            meals_per_day=2,
+        )
+        # python 模式保留 datetime/date 对象，模拟路由直接返回 dict 的情况
+        payload.append(
+            {"reminder": reminder.model_dump(), "profile": profile.model_dump()}
+        )
+    return payload
+
+
+def build_app(payload: list[dict], response_class: type[JSONResponse]) -> FastAPI:
+    app = FastAPI(default_response_class=response_class)
+
+    @app.get("/items")
+    async def items() -> list[dict]:
+        return payload
+
+    return app
+
+
+async def call(app: FastAPI) -> bytes:
+    """以最小的 ASGI 调用请求一次路由，返回响应体"""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/items",
+        "raw_path": b"/items",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [],
+        "server": ("bench", 80),
+        "client": ("bench", 1234),
+    }
+    body = bytearray()
+
+    async def receive() -> dict:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: dict) -> None:
+        if message["type"] == "http.response.body":
+            body.extend(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return bytes(body)
+
+
+async def measure(app: FastAPI, rounds: int) -> float:
+    """三次重复取最快一次，返回每个响应的秒数"""
+    await call(app)  # 预热: 构建路由依赖等一次性开销
+    best = float("inf")
+    for _ in range(3):
+        started = time.perf_counter()
+        for _ in range(rounds):
+            await call(app)
+        best = min(best, (time.perf_counter() - started) / rounds)
+    return best
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    payload = build_payload(args.items)
+    cases = {"stdlib (FastAPI default)": JSONResponse}
+    if orjson is not None:
+        cases["orjson"] = json_response_class("orjson")
+    if msgspec is not None:
+        cases["msgspec"] = json_response_class("msgspec")
+
+    print(f"items={args.items} rounds={args.rounds}")
+    baseline = None
+    for name, response_class in cases.items():
+        seconds = await measure(build_app(payload, response_class), args.rounds)
+        baseline = baseline or seconds
+        print(
+            f"{name:<26} {seconds * 1e3:8.3f} ms/response  x{baseline / seconds:5.1f}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=500)
+    parser.add_argument("--rounds", type=int, default=200)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""进程内负载基准：通过 httpx ASGITransport 直接驱动 ASGI 应用
+
+为每个后端（SQLite，以及可连接时的 Postgres）用 `benchmarks.datagen` 重建并写入数据，
+然后以指定并发压测各路由，输出每个接口的吞吐与 p50/p95/p99，
+并写出 JSON 报告，便于在不同提交之间 diff。
+
+用法:
+    python -m benchmarks.load --concurrency 32 --requests 500
+    python -m benchmarks.load --postgres-url postgresql+asyncpg://u:p@localhost/bench
+    python -m benchmarks.compare old.json new.json
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.core.database import get_session, session_for
+from app.main import create_app
+from benchmarks.common import create_engine_or_none, sqlite_url, summarize, write_report
+from benchmarks.datagen import (
+    Scale,
+    brand_name,
+    food_name,
+    generate,
+    profile_name,
+    reminder_title,
+)
+
+# 接口名 -> 生成请求路径的函数（参数为随机数发生器与各表行数）
+Endpoint = Callable[[random.Random, dict], str]
+
+ENDPOINTS: dict[str, Endpoint] = {
+    "health": lambda rnd, n: "/healthz",
+    "foods.list": lambda rnd, n: "/foods/?limit=50",
+    "foods.search": lambda rnd, n: (
+        f"/foods/?search={brand_name(rnd.randrange(20))}&limit=20"
+    ),
+    "foods.detail": lambda rnd, n: f"/foods/{food_name(rnd.randrange(n['food']))}",
+    "profiles.list": lambda rnd, n: "/profiles/?limit=50&order_by=name",
+    "profiles.detail": lambda rnd, n: (
+        f"/profiles/{profile_name(rnd.randrange(n['profiles']))}"
+    ),
+    "reminders.list": lambda rnd, n: "/reminders/?limit=50&direction=desc",
+    "reminders.detail": lambda rnd, n: (
+        f"/reminders/{reminder_title(rnd.randrange(n['reminders']))}"
+    ),
+}
+
+
+async def drive(
+    client: AsyncClient, name: str, sizes: dict, requests: int, concurrency: int
+) -> dict:
+    """以固定并发发出 `requests` 个请求，返回该接口的统计结果"""
+    make_path = ENDPOINTS[name]
+    latencies: list[float] = []
+    errors = 0
+    remaining = requests
+
+    async def worker(seed_: int) -> None:
+        nonlocal remaining, errors
+        rnd = random.Random(seed_)
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter()
+            response = await client.get(make_path(rnd, sizes))
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    return summarize(latencies, time.perf_counter() - started, errors)
+
+
+async def run_backend(engine: AsyncEngine, args: argparse.Namespace) -> dict:
+    scale = Scale(
+        users=args.users,
+        foods=args.foods,
+        profiles=args.profiles,
+        reminders_per_profile=args.reminders_per_profile,
+    )
+    sizes = await generate(engine, scale, seed=args.seed)
+    factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def bench_get_session():
+        async with factory() as session:
+            yield session
+
+    app = create_app()
+    app.dependency_overrides[get_session] = bench_get_session
+    for pool in settings.db_pools:
+        app.dependency_overrides[session_for(pool)] = bench_get_session
+
+    results = {}
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://bench"
+    ) as client:
+        for name in args.endpoints:
+            # 预热：填充连接池与各类缓存，不计入结果
+            await drive(client, name, sizes, min(50, args.requests), args.concurrency)
+            results[name] = await drive(
+                client, name, sizes, args.requests, args.concurrency
+            )
+            r = results[name]
+            print(
+                f"  {name:<18} {r['throughput_rps']:>9.1f} req/s  "
+                f"p50 {r['p50_ms']:>8.2f}  p95 {r['p95_ms']:>8.2f}  "
+                f"p99 {r['p99_ms']:>8.2f} ms  errors {r['errors']}"
+            )
+    return results
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    backends: dict[str, str] = {}
+    if "sqlite" in args.db:
+        tmpdir = tempfile.mkdtemp(prefix="bench-")
+        backends["sqlite"] = sqlite_url(Path(tmpdir) / "bench.sqlite3")
+    if "postgres" in args.db:
+        url = args.postgres_url or os.environ.get("BENCH_POSTGRES_URL")
+        if not url and settings.db_type == "postgres":
+            url = settings.database_url
+        if url:
+            backends["postgres"] = url
+
+    results = {}
+    for backend, url in backends.items():
+        engine = await create_engine_or_none(url)
+        if engine is None:
+            continue
+        print(f"[{backend}] concurrency={args.concurrency} requests={args.requests}")
+        try:
+            results[backend] = await run_backend(engine, args)
+        finally:
+            await engine.dispose()
+
+    params = {k: v for k, v in vars(args).items() if k not in ("out", "postgres_url")}
+    write_report(args.out, "load", params, results)
+    print(f"report written to {args.out}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--db", nargs="+", default=["sqlite", "postgres"])
+    parser.add_argument("--postgres-url", default=None)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=500, help="每个接口的请求数")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--foods", type=int, default=5000)
+    parser.add_argument("--profiles", type=int, default=1000)
+    parser.add_argument("--reminders-per-profile", type=float, default=10.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--endpoints", nargs="+", default=list(ENDPOINTS), choices=list(ENDPOINTS)
+    )
+    parser.add_argument("--out", default="benchmarks/reports/load.json")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""PgBouncer 事务池模式基准：直连 Postgres 与经 PgBouncer 连接对比
+
+模拟大量 worker 进程各自持有连接池的场景：用 `--clients` 个引擎（每个代表一个
+worker 进程）并发执行热点查询，分别测量：
+
+- `direct`：直连 Postgres，使用默认引擎参数（应用侧连接池 + 预编译语句缓存）
+- `pgbouncer`：经 PgBouncer（`pool_mode = transaction`），使用 `PGBOUNCER_MODE`
+  的引擎参数（关闭语句缓存、唯一语句名、NullPool 或小连接池）
+- `pgbouncer-default`（`--include-default`）：经 PgBouncer 但仍用默认参数，
+  用于复现 `prepared statement "__asyncpg_stmt_1__" already exists` 一类错误
+
+输出每种方式的吞吐、p50/p95/p99、错误数与 Postgres 端的连接数
+（`pg_stat_activity`），并写出 JSON 报告。解读结果时注意：
+
+- 直连在低并发下延迟最低（无额外一跳、语句只准备一次），但服务端连接数
+  约为 clients x (pool_size + max_overflow)，worker 多时会先耗尽 `max_connections`
+- PgBouncer 模式每条语句都要重新准备（未命名语句），单次延迟略高，
+  但服务端连接数被 PgBouncer 的 `default_pool_size` 封顶
+
+用法:
+    python -m benchmarks.pgbouncer \\
+        --direct-url postgresql+asyncpg://u:p@localhost:5432/bench \\
+        --pgbouncer-url postgresql+asyncpg://u:p@localhost:6432/bench \\
+        --clients 50 --concurrency 4 --requests 200
+    python -m benchmarks.pgbouncer ... --app-pool-size 2 --include-default
+"""
+
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+
+from app.core.config import Settings
+from app.foods.repository import FoodRepository
+from benchmarks.common import create_engine_or_none, summarize, write_report
+from benchmarks.datagen import Scale, generate
+
+
+def engine_options(pgbouncer: bool, app_pool_size: int) -> dict:
+    config = Settings(
+        db_type="postgres",
+        pgbouncer_mode=pgbouncer,
+        pgbouncer_app_pool_size=app_pool_size,
+        pool_size=2,
+        max_overflow=2,
+    )
+    return config.engine_options
+
+
+async def server_connections(admin: AsyncEngine) -> int:
+    async with admin.connect() as conn:
+        return await conn.scalar(
+            text(
+                "SELECT count(*) FROM pg_stat_activity "
+                "WHERE datname = current_database() AND pid <> pg_backend_pid()"
+            )
+        )
+
+
+async def run_mode(
+    url: str, options: dict, admin: AsyncEngine, args: argparse.Namespace, foods: int
+) -> dict:
+    engines = [create_async_engine(url, **options) for _ in range(args.clients)]
+    latencies: list[float] = []
+    errors = 0
+    peak_connections = 0
+
+    async def worker(engine: AsyncEngine, seed: int) -> None:
+        nonlocal errors
+        factory = async_sessionmaker(engine, expire_on_commit=False)
+        for i in range(args.requests):
+            food_id = (seed * 7919 + i) % foods + 1
+            started = time.perf_counter()
+            try:
+                async with factory() as session:
+                    repository = FoodRepository(session)
+                    await repository.get_by_id(food_id)
+                    await repository.get_all(limit=20, offset=food_id % 100)
+            except Exception:  # noqa: BLE001 - 统计错误数，继续压测
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - started)
+
+    async def sample_connections() -> None:
+        nonlocal peak_connections
+        while True:
+            peak_connections = max(peak_connections, await server_connections(admin))
+            await asyncio.sleep(0.2)
+
+    sampler = asyncio.create_task(sample_connections())
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(
+            *(
+                worker(engine, c * args.concurrency + w)
+                for c, engine in enumerate(engines)
+                for w in range(args.concurrency)
+            )
+        )
+    finally:
+        elapsed = time.perf_counter() - started
+        sampler.cancel()
+        await asyncio.gather(sampler, return_exceptions=True)
+        await asyncio.gather(*(engine.dispose() for engine in engines))
+
+    result = summarize(latencies, elapsed, errors)
+    result["peak_server_connections"] = peak_connections
+    return result
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    admin = await create_engine_or_none(args.direct_url)
+    if admin is None:
+        return
+    try:
+        sizes = await generate(
+            admin, Scale(users=100, foods=args.foods, profiles=0), tables={"food"}
+        )
+        foods = sizes["food"]
+
+        modes = {
+            "direct": (args.direct_url, engine_options(False, 0)),
+            "pgbouncer": (
+                args.pgbouncer_url,
+                engine_options(True, args.app_pool_size),
+            ),
+        }
+        if args.include_default:
+            modes["pgbouncer-default"] = (args.pgbouncer_url, engine_options(False, 0))
+
+        results = {}
+        for name, (url, options) in modes.items():
+            print(f"[{name}] clients={args.clients} concurrency={args.concurrency}")
+            results[name] = r = await run_mode(url, options, admin, args, foods)
+            print(
+                f"  {r['throughput_rps']:>9.1f} req/s  p50 {r['p50_ms']:>8.2f}  "
+                f"p95 {r['p95_ms']:>8.2f}  p99 {r['p99_ms']:>8.2f} ms  "
+                f"errors {r['errors']}  server connections {r['peak_server_connections']}"
+            )
+    finally:
+        await admin.dispose()
+
+    params = {
+        k: v
+        for k, v in vars(args).items()
+        if k not in ("out", "direct_url", "pgbouncer_url")
+    }
+    write_report(args.out, "pgbouncer", params, results)
+    print(f"report written to {args.out}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--direct-url", required=True)
+    parser.add_argument("--pgbouncer-url", required=True)
+    parser.add_argument("--clients", type=int, default=50, help="模拟的 worker 进程数")
+    parser.add_argument("--concurrency", type=int, default=4, help="每个 worker 的并发")
+    parser.add_argument("--requests", type=int, default=200, help="每个协程的请求数")
+    parser.add_argument("--foods", type=int, default=5000)
+    parser.add_argument(
+        "--app-pool-size", type=int, default=0, help="PgBouncer 模式的应用侧连接池"
+    )
+    parser.add_argument("--include-default", action="store_true")
+    parser.add_argument("--out", default="benchmarks/reports/pgbouncer.json")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,373 @@
+"""仓储层微基准：逐个方法计时、统计 SQL 语句数，并与基线比较
+
+在 10k / 100k / 1M 行的 SQLite 数据库上分别测量各仓储方法，记录每次调用的
+耗时分位数、执行的语句数以及 SELECT 语句的 `EXPLAIN QUERY PLAN`。
+与已保存的基线（`benchmarks/baselines/repositories.json`，随仓库提交）相比，
+出现以下情况时以非零状态码退出：
+
+- 基线文件不存在，或缺少本次运行的某个规模 / 用例（先用 `--update-baseline` 补上）
+- p50 耗时超过基线 `margin` 比例（且绝对差值超过 `min-delta-ms`）
+- 单次调用的语句数增加（典型的 N+1 信号）
+- 查询计划发生变化（例如索引失效，SEARCH 退化为 SCAN）
+
+机器之间的绝对耗时不可比，基线中只保存相对值：每次运行先在同一台机器上执行
+固定的校准负载（`calibrate`，内存 SQLite 上的递归 CTE），各用例的 p50 以
+校准 p50 为单位记为 `p50_ratio`；比较时用本次的校准耗时换算回毫秒。
+更换 CI 机器、升级 Python / SQLite 或有意改变了性能特征时刷新基线：
+
+    python -m benchmarks.repositories --update-baseline
+
+种子数据由 `benchmarks.datagen` 生成并按规模缓存在 `benchmarks/.data/`，
+每次运行在临时副本上执行，写操作（create/update/cleanup）不会污染缓存。
+
+用法:
+    python -m benchmarks.repositories --scales 10000 100000 --update-baseline
+    python -m benchmarks.repositories --scales 10000 100000 --margin 0.25
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import shutil
+import statistics
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Awaitable, Callable
+
+from sqlalchemy import text, update
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+
+from app.auth.models import RefreshToken
+from app.auth.repo import RefreshTokenCRUD
+from app.foods.repository import FoodRepository
+from app.users.repo import UserRepository
+from benchmarks.common import StatementRecorder, percentile, sqlite_url, write_report
+from benchmarks.datagen import (
+    PASSWORD,
+    Scale,
+    brand_name,
+    generate,
+    token_value,
+    username,
+)
+
+DATA_DIR = Path(__file__).parent / ".data"
+BASELINE = Path(__file__).parent / "baselines" / "repositories.json"
+SEED_VERSION = 2  # 种子数据结构变化时递增，使缓存失效（同时作为生成种子）
+CLEANUP_BATCH = 100  # 每次 cleanup_expired 需要处理的过期令牌数
+CALIBRATION_ROWS = 20_000  # 校准负载的规模，单次耗时约为毫秒级
+CALIBRATION_KEY = "_calibration"  # 基线中记录校准信息的键（不是规模）
+BASELINE_FIELDS = ("p50_ratio", "statements", "plans")  # 写入基线的字段
+
+
+# ------------------ 数据准备 ------------------
+async def prepare_database(rows: int, workdir: Path) -> tuple[Path, dict]:
+    """返回已写入种子数据的数据库副本路径与各表行数（优先复用缓存）"""
+    DATA_DIR.mkdir(parents=True, exist_ok=True)
+    cached = DATA_DIR / f"repositories-v{SEED_VERSION}-{rows}.sqlite3"
+    counts_file = cached.with_suffix(".json")
+    if not (cached.exists() and counts_file.exists()):
+        print(f"seeding {rows} rows -> {cached}")
+        tmp = cached.with_suffix(".tmp")
+        tmp.unlink(missing_ok=True)
+        engine = create_async_engine(sqlite_url(tmp))
+        try:
+            counts = await generate(engine, Scale.from_rows(rows), seed=SEED_VERSION)
+        finally:
+            await engine.dispose()
+        tmp.replace(cached)
+        counts_file.write_text(json.dumps(counts), encoding="utf-8")
+    target = workdir / cached.name
+    shutil.copyfile(cached, target)
+    return target, json.loads(counts_file.read_text("utf-8"))
+
+
+# ------------------ 基准用例 ------------------
+# (session, 随机数发生器, 各表行数) -> 被测方法的返回值
+Call = Callable[[AsyncSession, random.Random, dict], Awaitable[object]]
+
+
+@dataclass
+class Case:
+    name: str
+    call: Call
+    setup: Call | None = None  # 每次调用前执行，不计时
+
+
+async def _restore_expired(session: AsyncSession, rnd: random.Random, n: dict):
+    # 让一批过期令牌重新变为未撤销，保证每次 cleanup 的工作量一致
+    await session.execute(
+        update(RefreshToken)
+        .where(
+            RefreshToken.expires_at < datetime.now(timezone.utc),
+            RefreshToken.id.in_(
+                RefreshToken.__table__.select()
+                .with_only_columns(RefreshToken.id)
+                .where(RefreshToken.expires_at < datetime.now(timezone.utc))
+                .limit(CLEANUP_BATCH)
+                .scalar_subquery()
+            ),
+        )
+        .values(is_revoked=False, revoked_at=None)
+    )
+    await session.commit()
+
+
+CASES = [
+    Case(
+        "food.get_all.search_sort",
+        lambda s, rnd, n: FoodRepository(s).get_all(
+            search=brand_name(rnd.randrange(50)),
+            order_by="name",
+            direction="desc",
+            limit=20,
+        ),
+    ),
+    Case(
+        "food.get_all.page",
+        lambda s, rnd, n: FoodRepository(s).get_all(
+            order_by="created_at",
+            limit=50,
+            offset=rnd.randrange(max(n["food"] - 50, 1)),
+        ),
+    ),
+    Case(
+        "food.create",
+        lambda s, rnd, n: FoodRepository(s).create(
+            {"name": f"bench-{rnd.getrandbits(64):x}", "brand": "bench", "price": 1.0}
+        ),
+    ),
+    Case(
+        "food.update",
+        lambda s, rnd, n: FoodRepository(s).update(
+            rnd.randrange(n["food"]) + 1, {"price": round(rnd.uniform(5, 300), 2)}
+        ),
+    ),
+    Case(
+        "refresh_token.get_by_token",
+        lambda s, rnd, n: RefreshTokenCRUD.get_by_token(
+            s, token_value(rnd.randrange(n["refresh_tokens"]))
+        ),
+    ),
+    Case(
+        "refresh_token.cleanup_expired",
+        lambda s, rnd, n: RefreshTokenCRUD.cleanup_expired(s),
+        setup=_restore_expired,
+    ),
+    Case(
+        "user.authenticate",
+        lambda s, rnd, n: UserRepository.authenticate(
+            s, username(rnd.randrange(n["users"])), PASSWORD
+        ),
+    ),
+]
+
+
+async def calibrate(iterations: int, warmup: int) -> float:
+    """在本机执行固定负载，返回 p50（毫秒），作为各用例耗时的换算单位"""
+    engine = create_async_engine("sqlite+aiosqlite://")
+    statement = text(
+        "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < :rows) "
+        "SELECT sum(i) FROM n"
+    )
+    timings: list[float] = []
+    try:
+        async with engine.connect() as conn:
+            for i in range(warmup + iterations):
+                start = time.perf_counter()
+                await conn.execute(statement, {"rows": CALIBRATION_ROWS})
+                if i >= warmup:
+                    timings.append(time.perf_counter() - start)
+    finally:
+        await engine.dispose()
+    timings.sort()
+    return percentile(timings, 50) * 1e3
+
+
+async def explain(engine: AsyncEngine, statements: list[tuple[str, object]]):
+    """对捕获到的 SELECT 语句执行 EXPLAIN QUERY PLAN，返回每条语句的计划"""
+    plans = []
+    async with engine.connect() as conn:
+        for statement, parameters in statements:
+            if not statement.lstrip().upper().startswith("SELECT"):
+                continue
+            result = await conn.exec_driver_sql(
+                f"EXPLAIN QUERY PLAN {statement}", parameters
+            )
+            plans.append([row[-1] for row in result])
+    return plans
+
+
+async def run_case(
+    engine: AsyncEngine, case: Case, n: dict, iterations: int, warmup: int
+) -> dict:
+    factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    rnd = random.Random(case.name)
+    timings: list[float] = []
+    counts: list[int] = []
+    captured: list[tuple[str, object]] = []
+
+    with StatementRecorder(engine) as recorder:
+        for i in range(warmup + iterations):
+            if case.setup is not None:
+                async with factory() as session:
+                    await case.setup(session, rnd, n)
+            async with factory() as session:
+                recorder.statements.clear()
+                recorder.active = True
+                start = time.perf_counter()
+                await case.call(session, rnd, n)
+                elapsed = time.perf_counter() - start
+                recorder.active = False
+            if i < warmup:
+                continue
+            if not captured:
+                captured = list(recorder.statements)
+            timings.append(elapsed)
+            counts.append(len(recorder.statements))
+
+    timings.sort()
+    return {
+        "p50_ms": round(percentile(timings, 50) * 1e3, 3),
+        "p95_ms": round(percentile(timings, 95) * 1e3, 3),
+        "mean_ms": round(statistics.fmean(timings) * 1e3, 3),
+        "statements": max(counts),
+        "plans": await explain(engine, captured),
+    }
+
+
+def check_regressions(
+    results: dict,
+    baseline: dict,
+    calibration_ms: float,
+    margin: float,
+    min_delta_ms: float,
+) -> list[str]:
+    problems = []
+    for scale, cases in results.items():
+        for name, current in cases.items():
+            base = baseline.get(scale, {}).get(name)
+            if not base or "p50_ratio" not in base:
+                problems.append(f"[{scale}] {name}: missing from baseline")
+                continue
+            # 基线换算到本机的耗时
+            expected_ms = base["p50_ratio"] * calibration_ms
+            if (
+                current["p50_ms"] > expected_ms * (1 + margin)
+                and current["p50_ms"] - expected_ms > min_delta_ms
+            ):
+                problems.append(
+                    f"[{scale}] {name}: p50 ratio {base['p50_ratio']} -> "
+                    f"{current['p50_ratio']} (~{expected_ms:.3f}ms -> "
+                    f"{current['p50_ms']}ms on this host)"
+                )
+            if current["statements"] > base["statements"]:
+                problems.append(
+                    f"[{scale}] {name}: statements {base['statements']} -> "
+                    f"{current['statements']} (possible N+1)"
+                )
+            if base.get("plans") and current["plans"] != base["plans"]:
+                problems.append(f"[{scale}] {name}: query plan changed")
+    return problems
+
+
+async def main_async(args: argparse.Namespace) -> int:
+    cases = [c for c in CASES if not args.cases or c.name in args.cases]
+    results: dict[str, dict] = {}
+    calibration_ms = await calibrate(args.iterations, args.warmup)
+    print(f"calibration p50 {calibration_ms:.3f} ms")
+
+    with tempfile.TemporaryDirectory(prefix="bench-repo-") as workdir:
+        for rows in args.scales:
+            path, n = await prepare_database(rows, Path(workdir))
+            engine = create_async_engine(sqlite_url(path))
+            scale = str(rows)
+            results[scale] = {}
+            print(f"[{rows} rows]")
+            try:
+                for case in cases:
+                    r = await run_case(engine, case, n, args.iterations, args.warmup)
+                    r["p50_ratio"] = round(r["p50_ms"] / calibration_ms, 3)
+                    results[scale][case.name] = r
+                    print(
+                        f"  {case.name:<30} p50 {r['p50_ms']:>9.3f} ms  "
+                        f"p95 {r['p95_ms']:>9.3f} ms  statements {r['statements']}"
+                    )
+            finally:
+                await engine.dispose()
+
+    params = {k: v for k, v in vars(args).items() if k not in ("out", "baseline")}
+    params["calibration_ms"] = round(calibration_ms, 3)
+    write_report(args.out, "repositories", params, results)
+
+    baseline_path = Path(args.baseline)
+    if args.update_baseline:
+        baseline = (
+            json.loads(baseline_path.read_text("utf-8"))
+            if baseline_path.exists()
+            else {}
+        )
+        # 只保存相对耗时与语句数 / 查询计划, 不保存本机的绝对毫秒数
+        for scale, cases in results.items():
+            baseline[scale] = {
+                name: {k: r[k] for k in BASELINE_FIELDS} for name, r in cases.items()
+            }
+        baseline[CALIBRATION_KEY] = {
+            "rows": CALIBRATION_ROWS,
+            "query": "recursive CTE sum on in-memory SQLite",
+        }
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        baseline_path.write_text(
+            json.dumps(baseline, indent=2, sort_keys=True, ensure_ascii=False) + "\n",
+            encoding="utf-8",
+        )
+        print(f"baseline updated: {baseline_path}")
+        return 0
+
+    if not baseline_path.exists():
+        print(f"no baseline at {baseline_path}, run with --update-baseline first")
+        return 1
+
+    problems = check_regressions(
+        results,
+        json.loads(baseline_path.read_text("utf-8")),
+        calibration_ms,
+        args.margin,
+        args.min_delta_ms,
+    )
+    for problem in problems:
+        print(f"REGRESSION {problem}")
+    return 1 if problems else 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--scales", type=int, nargs="+", default=[10_000, 100_000, 1_000_000]
+    )
+    parser.add_argument("--cases", nargs="*", choices=[c.name for c in CASES])
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument(
+        "--margin", type=float, default=0.25, help="允许超出基线 p50（换算后）的比例"
+    )
+    parser.add_argument(
+        "--min-delta-ms", type=float, default=0.5, help="忽略小于该值的绝对耗时差"
+    )
+    parser.add_argument("--baseline", default=str(BASELINE))
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--out", default="benchmarks/reports/repositories.json")
+    raise SystemExit(asyncio.run(main_async(parser.parse_args())))
+
+
+if __name__ == "__main__":
+    main()
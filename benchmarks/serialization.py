@@ -0,0 +1,81 @@
+"""列表接口序列化基准：二次验证 vs 单次验证管道
+
+- legacy: 服务层逐条 `FoodResponse.model_validate`，路由再按 `response_model`
+  验证并编码一遍（改造前的行为）
+- pipeline: `food_list_serializer.validate` 一次验证整个列表，
+  `food_list_serializer.response` 直接输出 JSON bytes，跳过 response_model
+
+两条路由共用同一批内存中的 ORM 对象，排除数据库耗时，只比较序列化路径。
+
+用法:
+    python -m benchmarks.serialization --items 500 --requests 200
+"""
+
+import argparse
+import asyncio
+import time
+
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from app.foods.model import Food
+from app.foods.schema import FoodResponse, food_list_serializer
+
+
+def build_foods(items: int) -> list[Food]:
+    return [
+        Food(
+            id=i,
+            name=f"food-{i}",
+            brand=f"brand-{i % 20}",
+            kcals_per_g=3.5,
+            price=12.0 + i % 7,
+            weight=1.5,
+            description="成犬粮",
+        )
+        for i in range(items)
+    ]
+
+
+def build_app(foods: list[Food]) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/legacy", response_model=list[FoodResponse])
+    async def legacy():
+        return [FoodResponse.model_validate(food) for food in foods]
+
+    @app.get("/pipeline", response_model=list[FoodResponse])
+    async def pipeline():
+        return food_list_serializer.response(food_list_serializer.validate(foods))
+
+    return app
+
+
+async def run(items: int, requests: int) -> None:
+    app = build_app(build_foods(items))
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://bench"
+    ) as client:
+        results = {}
+        for path in ("/legacy", "/pipeline"):
+            first = await client.get(path)  # 预热 + 校验输出一致
+            results[path] = first.json()
+            start = time.perf_counter()
+            for _ in range(requests):
+                await client.get(path)
+            elapsed = (time.perf_counter() - start) / requests
+            print(f"{path:<10} {elapsed * 1e3:8.3f} ms/request")
+        assert results["/legacy"] == results["/pipeline"], "输出不一致"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=500)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+    print(f"items={args.items} requests={args.requests}")
+    asyncio.run(run(args.items, args.requests))
+
+
+if __name__ == "__main__":
+    main()
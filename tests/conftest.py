@@ -3,14 +3,24 @@ import sys
 
 # Ensure project root is importable when running tests via `uv run pytest`
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+# 测试中超出语句预算或出现 N+1 直接失败
+os.environ.setdefault("QUERY_GUARD_MODE", "raise")
 
 import pytest
-from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.pool import StaticPool
-from sqlmodel import SQLModel
-from sqlmodel.ext.asyncio.session import AsyncSession
 
+# 注册全部模型到 Base.metadata
+import app.auth.models
+import app.foods.model
+import app.profiles.model
+import app.reminders.model
+import app.users.model
+from app.core.base_model import Base
+from app.core.config import settings
 from app.core.database import get_session as real_get_session
+from app.core.database import session_for
+from app.core.query_stats import track_statements
 from app.main import create_app
 
 TEST_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
@@ -28,8 +38,9 @@ async def engine():
         connect_args={"check_same_thread": False},
         poolclass=StaticPool,
     )
+    track_statements(engine, "test")
     async with engine.begin() as conn:
-        await conn.run_sync(SQLModel.metadata.create_all)
+        await conn.run_sync(Base.metadata.create_all)
     yield engine
     await engine.dispose()
 
@@ -48,6 +59,9 @@ async def app(session_factory):
             yield s
 
     app.dependency_overrides[real_get_session] = override_get_session
+    # 各命名连接池的会话依赖也统一指向测试数据库
+    for name in settings.db_pools:
+        app.dependency_overrides[session_for(name)] = override_get_session
     return app
 
 
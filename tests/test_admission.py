@@ -0,0 +1,102 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from app.core.admission import (
+    AdaptiveLimiter,
+    AdmissionControlMiddleware,
+    AdmissionRejected,
+)
+
+
+@pytest.mark.anyio
+async def test_priority_queue_and_eviction():
+    limiter = AdaptiveLimiter(initial_limit=1, max_queue=1, queue_timeout=1)
+    await limiter.acquire(1)
+
+    normal = asyncio.create_task(limiter.acquire(1))
+    await asyncio.sleep(0)
+    with pytest.raises(AdmissionRejected, match="queue_full"):
+        await limiter.acquire(1)
+
+    high = asyncio.create_task(limiter.acquire(0))  # 挤掉排队中的 normal
+    await asyncio.sleep(0)
+    with pytest.raises(AdmissionRejected, match="evicted"):
+        await normal
+
+    limiter.release(latency=0.01, pool_wait=0)
+    await high  # 名额转交给高优先级请求
+    assert limiter.in_flight == 1
+
+
+@pytest.mark.anyio
+async def test_slot_granted_in_same_iteration_as_timeout(monkeypatch):
+    limiter = AdaptiveLimiter(initial_limit=1, max_queue=1, queue_timeout=1)
+    await limiter.acquire(1)
+
+    async def racing_wait_for(future, timeout):
+        limiter.release_slot()  # 名额转交与超时在同一轮事件循环中发生
+        raise asyncio.TimeoutError
+
+    monkeypatch.setattr(asyncio, "wait_for", racing_wait_for)
+    await limiter.acquire(1)  # 已拿到名额, 不应返回 503
+    assert limiter.in_flight == 1 and limiter.waiting == 0
+
+    limiter.release(latency=0.01, pool_wait=0)
+    assert limiter.in_flight == 0  # 名额没有泄漏
+
+
+@pytest.mark.anyio
+async def test_aimd_limit():
+    now = [0.0]
+    limiter = AdaptiveLimiter(initial_limit=10, clock=lambda: now[0])
+    for _ in range(10):
+        await limiter.acquire(1)
+
+    limiter.release(latency=0.01, pool_wait=0.2)  # 取连接等待过久 -> 乘性下降
+    assert limiter.limit == 9
+    limiter.release(latency=2.0, pool_wait=0)  # 冷却期内不再下降
+    assert limiter.limit == 9
+
+    await limiter.acquire(1)  # 并发数达到上限 9
+    for _ in range(9):
+        # 快速完成 -> 加性增长，但只在并发数触及上限时增长
+        limiter.release(latency=0.01, pool_wait=0)
+    assert limiter._limit == pytest.approx(9 + 1 / 9)
+    assert limiter.in_flight == 0
+
+
+@pytest.mark.anyio
+async def test_middleware_sheds_with_retry_after():
+    release = asyncio.Event()
+    app = FastAPI()
+    app.add_middleware(
+        AdmissionControlMiddleware,
+        limiter=AdaptiveLimiter(initial_limit=1, max_queue=0),
+        priorities={"/healthz": "exempt"},
+    )
+
+    @app.get("/slow")
+    async def slow():
+        await release.wait()
+        return {}
+
+    @app.get("/healthz")
+    async def healthz():
+        return {}
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        first = asyncio.create_task(client.get("/slow"))
+        await asyncio.sleep(0.05)
+
+        shed = await client.get("/slow")
+        assert shed.status_code == 503
+        assert int(shed.headers["retry-after"]) >= 1
+        assert (await client.get("/healthz")).status_code == 200
+
+        release.set()
+        assert (await first).status_code == 200
@@ -0,0 +1,75 @@
+import gzip
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from httpx import ASGITransport, AsyncClient
+
+from app.core.compression import (
+    CompressionMiddleware,
+    _GzipCompressor,
+    negotiate_encoding,
+)
+
+
+def test_negotiate_encoding():
+    supported = ("zstd", "br", "gzip")
+    assert negotiate_encoding("gzip, br", supported) == "br"
+    assert negotiate_encoding("gzip;q=1.0, br;q=0.5", supported) == "gzip"
+    assert negotiate_encoding("br;q=0, gzip;q=0", supported) is None
+    assert negotiate_encoding("*", ("gzip",)) == "gzip"
+    assert negotiate_encoding("identity", supported) is None
+
+
+@pytest.fixture
+async def compress_client():
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=100, encodings=("gzip",))
+
+    @app.get("/small")
+    async def small():
+        return PlainTextResponse("ok")
+
+    @app.get("/large")
+    async def large():
+        return PlainTextResponse("x" * 1000)
+
+    @app.get("/stream")
+    async def stream():
+        async def chunks():
+            for i in range(3):
+                yield f"chunk-{i};".encode()
+
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as ac:
+        yield ac
+
+
+@pytest.mark.anyio
+async def test_compression_threshold_and_streaming(compress_client):
+    headers = {"Accept-Encoding": "gzip"}
+
+    r = await compress_client.get("/small", headers=headers)
+    assert "content-encoding" not in r.headers
+
+    r = await compress_client.get("/large", headers=headers)
+    assert r.headers["content-encoding"] == "gzip"
+    assert r.headers["vary"] == "Accept-Encoding"
+    assert r.text == "x" * 1000  # httpx 自动解压
+
+    r = await compress_client.get("/stream", headers=headers)
+    assert r.headers["content-encoding"] == "gzip"
+    assert "content-length" not in r.headers
+    assert r.text == "chunk-0;chunk-1;chunk-2;"
+
+    r = await compress_client.get("/large", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in r.headers
+
+
+def test_gzip_payload_is_valid():
+    c = _GzipCompressor(6)
+    data = c.compress(b"hello ") + c.compress(b"world") + c.finish()
+    assert gzip.decompress(data) == b"hello world"
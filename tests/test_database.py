@@ -0,0 +1,66 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.pool import NullPool
+
+from app.core.config import PoolSettings, Settings, unique_statement_name
+from app.core.database import DatabaseRegistry, get_session, session_for
+from app.core.metrics import DB_POOL_CHECKOUT, DB_QUERIES
+
+
+def test_pool_engine_options():
+    config = Settings(
+        db_type="postgres",
+        db_pools={"batch": PoolSettings(pool_size=2, max_overflow=0, pool_timeout=60)},
+    )
+    batch = config.pool_engine_options("batch")
+    assert batch["pool_size"] == 2
+    assert batch["pool_timeout"] == 60
+    assert config.pool_engine_options("other")["pool_size"] == config.pool_size
+
+
+@pytest.mark.anyio
+async def test_pgbouncer_mode():
+    registry = DatabaseRegistry(Settings(db_type="postgres", pgbouncer_mode=True))
+    try:
+        # NullPool: 连接复用交给 PgBouncer，命名连接池的容量设置不再生效
+        assert isinstance(registry.engine("catalog").pool, NullPool)
+        connect_args = registry.config.engine_options["connect_args"]
+        assert connect_args["statement_cache_size"] == 0
+        assert connect_args["prepared_statement_name_func"] is unique_statement_name
+        assert unique_statement_name() != unique_statement_name()
+    finally:
+        await registry.dispose_all()
+
+    config = Settings(
+        db_type="postgres", pgbouncer_mode=True, pgbouncer_app_pool_size=3
+    )
+    assert config.pool_engine_options("batch")["pool_size"] == 2  # 取较小值
+    assert config.pool_engine_options("catalog")["pool_size"] == 3
+    assert config.pool_engine_options("catalog")["max_overflow"] == 0
+
+
+def test_session_for_is_stable():
+    assert session_for("catalog") is session_for("catalog")
+    assert session_for("catalog") is not get_session
+    assert session_for("unknown") is get_session
+
+
+@pytest.mark.anyio
+async def test_named_pools_are_isolated(tmp_path):
+    registry = DatabaseRegistry(
+        Settings(db_type="sqlite", sqlite_db_path=str(tmp_path / "db.sqlite3"))
+    )
+    try:
+        catalog = registry.engine("catalog")
+        assert registry.engine("auth") is not catalog
+        assert registry.engine("unknown") is registry.engine("default")
+
+        before = DB_QUERIES._values.get(("catalog",), 0)
+        async with registry.session_factory("catalog")() as session:
+            await session.execute(text("SELECT 1"))
+        # 语句数与取连接耗时都按池名分别统计
+        assert DB_QUERIES._values[("catalog",)] == before + 1
+        assert ("catalog",) in DB_POOL_CHECKOUT._values
+        assert set(registry.engines()) == {"catalog", "auth", "default"}
+    finally:
+        await registry.dispose_all()
@@ -0,0 +1,106 @@
+import asyncio
+import time
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from app.core import deadline
+from app.core.deadline import DeadlineMiddleware, deadline_var
+from app.core.query_stats import UNTRACKED, track_queries
+
+# 递归 CTE 让 SQLite 长时间占用连接，模拟慢速的模糊搜索
+SLOW_QUERY = text(
+    "WITH RECURSIVE n(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM n) "
+    "SELECT count(*) FROM (SELECT x FROM n LIMIT 100000000)"
+)
+
+
+def test_timeout_for_route_and_header():
+    middleware = DeadlineMiddleware(
+        None, default_timeout=30, route_timeouts={"/foods": 5}
+    )
+
+    def scope(path, timeout=None):
+        headers = [(b"x-request-timeout", timeout.encode())] if timeout else []
+        return {"type": "http", "path": path, "headers": headers}
+
+    assert middleware.timeout_for(scope("/profiles/1")) == 30
+    assert middleware.timeout_for(scope("/foods/", "2.5")) == 2.5
+    assert middleware.timeout_for(scope("/foods/", "60")) == 5  # 不能超过路由上限
+    assert middleware.timeout_for(scope("/foods/", "abc")) == 5
+
+
+@pytest.mark.anyio
+async def test_sqlite_query_interrupted_at_deadline(session_factory):
+    deadline.install()
+    token = deadline_var.set(time.monotonic() + 0.1)
+    started = time.perf_counter()
+    try:
+        async with session_factory() as session:
+            with pytest.raises(OperationalError, match="interrupted"):
+                await session.execute(SLOW_QUERY)
+    finally:
+        deadline_var.reset(token)
+    assert time.perf_counter() - started < 2
+
+    # 连接被复用时不会残留上一个请求的截止时间
+    async with session_factory() as session:
+        assert (await session.execute(text("SELECT 1"))).scalar() == 1
+
+
+def test_postgres_timeout_uses_constant_statement():
+    executed = []
+
+    class Connection:
+        dialect = type("Dialect", (), {"name": "postgresql"})
+
+        def execute(self, statement, params, execution_options):
+            executed.append((str(statement), params, execution_options))
+
+    for seconds in (0.5, 2.0):
+        token = deadline_var.set(time.monotonic() + seconds)
+        try:
+            deadline._apply_to_connection(None, None, Connection())
+        finally:
+            deadline_var.reset(token)
+    # 语句文本不随剩余时间变化, 超时以绑定参数传入, 且不计入请求统计
+    (sql, first, options), (sql2, second, _) = executed
+    assert sql == sql2 and first != second
+    assert options == {UNTRACKED: True}
+
+
+@pytest.mark.anyio
+async def test_deadline_hook_adds_no_tracked_statements(session_factory):
+    deadline.install()
+    token = deadline_var.set(time.monotonic() + 5)
+    try:
+        with track_queries() as stats:
+            async with session_factory() as session:
+                await session.execute(text("SELECT 1"))
+                conn = await session.connection()
+                await conn.execute(
+                    text("SELECT 2"), execution_options={UNTRACKED: True}
+                )
+    finally:
+        deadline_var.reset(token)
+    assert stats.count == 1 and list(stats.statements) == ["SELECT 1"]
+
+
+@pytest.mark.anyio
+async def test_middleware_returns_504():
+    app = FastAPI()
+    app.add_middleware(DeadlineMiddleware, default_timeout=5)
+
+    @app.get("/slow")
+    async def slow():
+        await asyncio.sleep(1)
+        return {}
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        response = await client.get("/slow", headers={"X-Request-Timeout": "0.05"})
+    assert response.status_code == 504
@@ -0,0 +1,67 @@
+import asyncio
+
+import pytest
+
+from app.core.health import Degraded, HealthMonitor, database_check
+
+
+@pytest.mark.anyio
+async def test_component_states_and_cached_report(engine):
+    calls = []
+
+    async def cache():
+        calls.append("cache")
+        raise Degraded("evicting")
+
+    async def scheduler():
+        await asyncio.sleep(1)
+
+    monitor = HealthMonitor(interval=60, timeout=0.05)
+    monitor.add_check("database", database_check(lambda: engine))
+    monitor.add_check("cache", cache, critical=False)
+    monitor.add_check("scheduler", scheduler, critical=False)
+    await monitor.start()
+    try:
+        healthy, payload = monitor.report()
+        monitor.report()  # 只读缓存结果，不会再次检查
+        assert calls == ["cache"]
+    finally:
+        await monitor.stop()
+
+    assert healthy and payload["status"] == "degraded"
+    components = payload["components"]
+    assert components["database"]["state"] == "ok"
+    assert components["database"]["latency_ms"] >= 0
+    assert components["cache"]["error"] == "evicting"
+    assert components["scheduler"]["state"] == "down"
+
+
+@pytest.mark.anyio
+async def test_critical_failure_and_stale_results():
+    now = [0.0]
+
+    async def database():
+        raise ConnectionRefusedError("db unreachable")
+
+    monitor = HealthMonitor(interval=1, timeout=1, clock=lambda: now[0])
+    monitor.add_check("database", database)
+    await monitor.run_checks()
+    healthy, payload = monitor.report()
+    assert not healthy and payload["status"] == "down"
+
+    monitor.add_check("database", lambda: asyncio.sleep(0))
+    await monitor.start()
+    try:
+        assert monitor.report()[0]
+        now[0] = 10  # 检查循环长时间没有更新结果
+        healthy, payload = monitor.report()
+        assert not healthy and payload["status"] == "stale"
+    finally:
+        await monitor.stop()
+
+
+@pytest.mark.anyio
+async def test_healthz_served_from_cache(client):
+    response = await client.get("/healthz")
+    assert response.status_code == 200
+    assert response.json()["status"] == "ok"
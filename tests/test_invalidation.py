@@ -0,0 +1,99 @@
+import asyncio
+
+import pytest
+
+from app.core.cache import TTLCache
+from app.core.invalidation import InvalidationBus, LocalTransport
+from app.foods.catalog import FoodCatalog
+from app.foods.model import Food
+
+
+async def _node(hub, **kwargs) -> InvalidationBus:
+    bus = InvalidationBus(coalesce_ms=1, **kwargs)
+    await bus.start(LocalTransport(hub))
+    return bus
+
+
+@pytest.mark.anyio
+async def test_cache_invalidation_reaches_other_nodes():
+    hub = []
+    a, b = await _node(hub), await _node(hub)
+    cache_a, cache_b = TTLCache("p", ttl=60), TTLCache("p", ttl=60)
+    a.attach_cache(cache_a, "user")
+    b.attach_cache(cache_b, "user")
+    for cache in (cache_a, cache_b):
+        cache.set(1, "alice")
+        cache.set(2, "bob")
+
+    cache_a.invalidate(1)
+    await asyncio.sleep(0.05)
+    assert cache_a.get(1) is None and cache_b.get(1) is None
+    assert cache_b.get(2) == "bob"  # 其它条目不受影响
+
+    cache_b.clear()  # 整体失效同样广播, 且不会回传形成循环
+    await asyncio.sleep(0.05)
+    assert len(cache_a) == 0
+    await a.stop()
+    await b.stop()
+
+
+@pytest.mark.anyio
+async def test_event_storm_is_coalesced():
+    hub = []
+    sent = []
+    hub.append(sent.append)  # 记录经过 hub 的每条消息
+    a = await _node(hub, max_keys=10)
+    b = await _node(hub)
+    received = []
+    b.subscribe("food", received.append)
+    b.subscribe("profile", received.append)
+
+    for food_id in range(3):
+        a.publish("food", food_id)
+        a.publish("food", food_id)
+    a.publish("profile", 7)
+    await asyncio.sleep(0.05)
+    assert len(sent) == 1
+    assert sorted(received) == [0, 1, 2, 7]
+
+    received.clear()
+    for food_id in range(50):  # 超过 max_keys 时退化为整体失效
+        a.publish("food", food_id)
+    await a.stop()  # 停止前发出合并窗口内的事件
+    assert len(sent) == 2 and received == [None]
+    await b.stop()
+
+
+def test_bus_not_started_is_noop_and_reconnect_clears():
+    bus = InvalidationBus()
+    bus.publish("food", 1)  # 未启动: 直接忽略
+    cache = TTLCache("p", ttl=60)
+    bus.attach_cache(cache, "user")
+    cache.set(1, "alice")
+    bus.invalidate_all()
+    assert len(cache) == 0
+
+
+@pytest.mark.anyio
+async def test_food_catalog_rebuilds_on_remote_change(tmp_path, session_factory):
+    catalog = FoodCatalog(
+        tmp_path / "foods.table", session_factory=session_factory, debounce=0
+    )
+    await catalog.start()
+    try:
+        while not catalog.ready:
+            await asyncio.sleep(0.01)
+        # 其它节点写入: 本进程的 catalog 不知情
+        async with session_factory() as session:
+            session.add(Food(name="remote-treat", brand="acme"))
+            await session.commit()
+        assert catalog.get_by_name("remote-treat") is None
+
+        catalog.remote_changed()
+        for _ in range(200):
+            if catalog.get_by_name("remote-treat") is not None:
+                break
+            await asyncio.sleep(0.01)
+        assert catalog.get_by_name("remote-treat") is not None
+    finally:
+        await catalog.stop()
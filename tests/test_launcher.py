@@ -0,0 +1,72 @@
+import importlib.util
+import io
+
+from loguru import logger
+
+from app.core.config import PoolSettings, Settings
+from app.core.logging import LogPipeline
+from app.launcher import (
+    available_cpus,
+    build_config,
+    connections_per_worker,
+    worker_count,
+)
+
+
+def _postgres(**overrides) -> Settings:
+    return Settings(
+        db_type="postgres",
+        pool_size=5,
+        max_overflow=5,
+        db_pools={"catalog": PoolSettings(pool_size=10, max_overflow=0)},
+        **overrides,
+    )
+
+
+def test_available_cpus_respects_cgroup_quota(tmp_path):
+    (tmp_path / "cpu.max").write_text("150000 100000\n")
+    assert available_cpus(str(tmp_path)) <= 2
+    (tmp_path / "cpu.max").write_text("max 100000\n")
+    assert available_cpus(str(tmp_path)) >= 1
+
+
+def test_connections_per_worker():
+    assert connections_per_worker(_postgres()) == 5 + 5 + 10
+    assert connections_per_worker(Settings(db_type="sqlite")) == 0
+    # PgBouncer 模式且不保留连接 (NullPool) 时不限制 worker 数
+    assert connections_per_worker(_postgres(pgbouncer_mode=True)) == 0
+
+
+def test_worker_count_capped_by_connection_budget():
+    assert worker_count(_postgres(), cpus=8) == 8
+    assert worker_count(_postgres(db_connection_budget=50), cpus=8) == 2
+    assert worker_count(_postgres(db_connection_budget=10), cpus=8) == 1
+    assert worker_count(_postgres(workers=3, db_connection_budget=10), cpus=8) == 3
+
+
+def test_build_config_uses_fast_implementations_when_available():
+    config = build_config(
+        "127.0.0.1", 0, Settings(max_requests=1000, max_requests_jitter=50)
+    )
+    expected_loop = "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+    assert config.loop == expected_loop
+    assert config.limit_max_requests == 1000
+    assert config.limit_max_requests_jitter == 50
+    assert build_config("127.0.0.1", 0, Settings()).limit_max_requests is None
+
+
+def test_log_pipeline_restarts_writer_after_fork():
+    stream = io.StringIO()
+    pipeline = LogPipeline(stream=stream)
+    pipeline.start()
+    handler = logger.add(pipeline.sink, format="{message}")
+    try:
+        old_thread = pipeline._thread
+        pipeline._after_fork()  # 模拟子进程: 重建队列与写线程
+        assert pipeline._thread is not old_thread and pipeline._thread.is_alive()
+        logger.info("after fork")
+        pipeline.flush()
+        assert "after fork" in stream.getvalue()
+    finally:
+        logger.remove(handler)
+        pipeline.stop()
@@ -1,3 +1,5 @@
+import signal
+
 import pytest
 
 from app.core import config, lifespan
@@ -15,13 +17,41 @@ async def test_lifespan_calls(monkeypatch):
 
     monkeypatch.setattr("app.core.lifespan.create_db_and_tables", fake_create)
 
-    class FakeEngine:
-        async def dispose(self):
+    class FakeRegistry:
+        async def dispose_all(self):
             await fake_dispose()
 
-    monkeypatch.setattr("app.core.lifespan.engine", FakeEngine())
+    monkeypatch.setattr("app.core.lifespan.databases", FakeRegistry())
 
     config.settings.debug = True
     async with lifespan.lifespan(None):
         assert called["create"]
     assert called["dispose"]
+
+
+@pytest.mark.anyio
+async def test_lifespan_restores_default_for_foreign_handlers(monkeypatch):
+    async def noop():
+        pass
+
+    class FakeRegistry:
+        async def dispose_all(self):
+            pass
+
+    monkeypatch.setattr("app.core.lifespan.create_db_and_tables", noop)
+    monkeypatch.setattr("app.core.lifespan.databases", FakeRegistry())
+    installed = []
+
+    def fake_signal(sig, handler):
+        if handler is None:
+            raise TypeError(
+                "signal handler must be signal.SIG_IGN, SIG_DFL, or callable"
+            )
+        installed.append((sig, handler))
+        return None  # 原处理器不是从 Python 安装的
+
+    monkeypatch.setattr(signal, "signal", fake_signal)
+    async with lifespan.lifespan(None):
+        pass
+    assert (signal.SIGTERM, signal.SIG_DFL) in installed
+    assert (signal.SIGINT, signal.SIG_DFL) in installed
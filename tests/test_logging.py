@@ -0,0 +1,86 @@
+import io
+import json
+
+import pytest
+from loguru import logger
+
+from app.core.logging import LOG_DROPPED, LogPipeline, request_id_var
+from app.core.metrics import REGISTRY
+
+
+@pytest.fixture
+def capture():
+    handlers = []
+
+    def attach(pipeline: LogPipeline, level="DEBUG"):
+        handlers.append(
+            logger.add(pipeline.sink, level=level, format=lambda r: "{message}")
+        )
+        return pipeline
+
+    yield attach
+    for handler in handlers:
+        logger.remove(handler)
+
+
+def log_failure():
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        logger.exception("failed")
+
+
+def test_json_lines_with_request_id_and_dedup(capture):
+    now = [0.0]
+    stream = io.StringIO()
+    pipeline = capture(
+        LogPipeline(
+            stream=stream, json_format=True, dedup_burst=2, clock=lambda: now[0]
+        )
+    )
+    pipeline.start()
+
+    token = request_id_var.set("req-1")
+    try:
+        for _ in range(5):
+            log_failure()
+        now[0] = 61  # 进入新的时间窗口
+        log_failure()
+    finally:
+        request_id_var.reset(token)
+    pipeline.stop()
+
+    lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert len(lines) == 3  # 2 条突发 + 窗口恢复后的 1 条
+    assert all(line["request_id"] == "req-1" for line in lines)
+    assert "ValueError: boom" in lines[0]["exception"]
+    assert lines[-1]["suppressed_duplicates"] == 3
+
+
+def test_sampling_and_queue_overflow(capture):
+    stream = io.StringIO()
+    pipeline = capture(
+        LogPipeline(stream=stream, queue_size=1, sample_rates={"debug": 0})
+    )
+    REGISTRY.snapshot()
+    before = LOG_DROPPED._values.get(("queue_full",), 0)
+
+    logger.debug("sampled out")
+    logger.info("queued")
+    logger.info("dropped")  # 写线程未启动，队列已满
+    REGISTRY.snapshot()  # 丢弃数由采集器写入指标
+    assert LOG_DROPPED._values[("queue_full",)] == before + 1
+
+    pipeline.start()
+    pipeline.stop()
+    assert stream.getvalue().count("\n") == 1
+    assert "queued" in stream.getvalue()
+
+
+@pytest.mark.anyio
+async def test_request_id_header(client):
+    response = await client.get("/healthz")
+    assert len(response.headers["x-request-id"]) == 32
+
+    response = await client.get("/healthz", headers={"X-Request-ID": "abc"})
+    assert response.headers["x-request-id"] == "abc"
@@ -0,0 +1,108 @@
+import asyncio
+import os
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.metrics import (
+    DB_POOL_WAITING,
+    InstrumentedAsyncAdaptedQueuePool,
+    MultiprocessStore,
+    Registry,
+    instrument_engine,
+    render,
+)
+
+
+def test_histogram_render():
+    registry = Registry()
+    histogram = registry.histogram("latency", "demo", ("route",), buckets=(0.1, 1))
+    histogram.observe(0.05, ("/a",))
+    histogram.observe(0.5, ("/a",))
+    histogram.observe(5, ("/a",))
+
+    text = render(registry.snapshot())
+    assert 'latency_bucket{route="/a",le="0.1"} 1' in text
+    assert 'latency_bucket{route="/a",le="1"} 2' in text
+    assert 'latency_bucket{route="/a",le="+Inf"} 3' in text
+    assert 'latency_count{route="/a"} 3' in text
+    assert 'latency_sum{route="/a"} 5.55' in text
+
+
+def test_multiprocess_merge(tmp_path):
+    store = MultiprocessStore(tmp_path)
+    live, dead = os.getpid(), 4_194_305  # 超过 Linux pid_max 上限，视为已退出
+    for pid, value in ((live, 2), (dead, 3)):
+        registry = Registry()
+        registry.counter("requests_total", "demo").inc(value)
+        registry.gauge("in_flight", "demo").set(value)
+        store.write(registry.snapshot(), pid=pid)
+
+    text = render(store.collect())
+    assert "requests_total 5" in text  # 已退出 worker 的计数保留
+    assert "in_flight 2" in text  # 仪表盘只统计存活 worker
+
+
+def test_multiprocess_pid_reuse_keeps_counters(tmp_path):
+    pid = 4_194_306
+    (tmp_path / f"metrics-{pid}.json").write_text(  # 已退出的 worker 留下的文件
+        '{"requests_total": {"type": "counter", "help": "demo", '
+        '"labelnames": [], "values": [[[], 7]]}}'
+    )
+    registry = Registry()
+    registry.counter("requests_total", "demo").inc(1)
+    # 复用 pid 的新 worker: 首次写入先归档旧文件, 之后照常覆盖自己的文件
+    MultiprocessStore(tmp_path).write(registry.snapshot(), pid=pid)
+    MultiprocessStore(tmp_path).write(registry.snapshot(), pid=pid)
+    assert "requests_total 8" in render(MultiprocessStore(tmp_path).collect())
+
+
+@pytest.mark.anyio
+async def test_pool_waiting_counts_only_queued_checkouts(tmp_path):
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'pool.sqlite3'}",
+        poolclass=InstrumentedAsyncAdaptedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+    )
+    instrument_engine(engine, "waiting-test")
+    labels = ("waiting-test",)
+    seen = []
+    event.listen(
+        engine.sync_engine,
+        "connect",
+        lambda *args: seen.append(DB_POOL_WAITING._values.get(labels, 0)),
+    )
+    try:
+        held = await engine.connect()
+        assert seen == [0]  # 有空闲容量时新建连接不算排队
+        waiter = asyncio.ensure_future(engine.connect())
+        await asyncio.sleep(0.05)
+        assert DB_POOL_WAITING._values[labels] == 1
+        await held.close()
+        await (await waiter).close()
+        assert DB_POOL_WAITING._values[labels] == 0
+    finally:
+        await engine.dispose()
+
+
+@pytest.mark.anyio
+async def test_metrics_endpoint(client, engine):
+    instrument_engine(engine, "test")
+    assert (await client.get("/foods/")).status_code == 200
+    assert (await client.get("/nope")).status_code == 404
+
+    response = await client.get("/metrics")
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = response.text
+    assert (
+        'http_request_duration_seconds_count{method="GET",route="/foods/",status="200"}'
+        in text
+    )
+    assert 'route="<unmatched>",status="404"' in text
+    assert (
+        'http_request_db_queries_bucket{method="GET",route="/foods/",le="0"} 0' in text
+    )
+    assert 'db_queries_total{pool="test"}' in text
+    assert 'cache_entries{cache="principal"}' in text
@@ -0,0 +1,89 @@
+import pytest
+
+from app.core.cache import TTLCache
+from app.core.security import create_access_token
+from app.users.principal import principal_cache
+from app.users.repo import user_repository
+from app.users.schema import UserCreate, UserUpdate
+
+
+def test_ttl_cache_expiry_and_hooks():
+    now = [0.0]
+    cache = TTLCache("t", maxsize=2, ttl=10, clock=lambda: now[0])
+    events = []
+    cache.add_invalidation_hook(lambda name, key: events.append((name, key)))
+
+    cache.set(1, "a")
+    cache.set(2, "b")
+    cache.set(3, "c")  # 超出容量，淘汰最久未使用的 1
+    assert cache.get(1) is None
+    assert cache.get(3) == "c"
+
+    now[0] = 11
+    assert cache.get(3) is None
+
+    cache.invalidate(2)
+    cache.invalidate(3, propagate=False)
+    assert events == [("t", 2)]
+
+
+def test_ttl_cache_skips_set_invalidated_during_load():
+    cache = TTLCache("t", maxsize=10, ttl=10)
+    version = cache.version()  # 开始回源加载
+    cache.invalidate(1)  # 加载期间用户被修改
+    cache.set(1, "stale", version=version)
+    cache.set(2, "fresh", version=version)  # 其它 key 不受影响
+    hits, misses = cache.hits, cache.misses
+    assert 1 not in cache and 2 in cache
+    assert (cache.hits, cache.misses) == (hits, misses)  # `in` 不计入命中统计
+
+    version = cache.version()
+    cache.clear(propagate=False)
+    cache.set(3, "stale", version=version)
+    assert 3 not in cache
+    cache.set(3, "fresh", version=cache.version())
+    assert cache.get(3) == "fresh"
+
+
+@pytest.mark.anyio
+async def test_principal_cache_invalidated_on_update(session_factory):
+    principal_cache.clear(propagate=False)
+    async with session_factory() as session:
+        user = await user_repository.create(
+            session,
+            UserCreate(username="carol", email="carol@example.com", password="secret1"),
+        )
+        principal = await user_repository.get_principal(session, user.id)
+        assert principal.is_active and principal_cache.get(user.id) is principal
+
+        await user_repository.update(session, user.id, UserUpdate(is_active=False))
+        assert principal_cache.get(user.id) is None
+        principal = await user_repository.get_principal(session, user.id)
+        assert principal.is_active is False
+
+        await user_repository.delete(session, user.id)
+        assert await user_repository.get_principal(session, user.id) is None
+
+
+@pytest.mark.anyio
+async def test_current_user_route_uses_principal_cache(client, session_factory):
+    principal_cache.clear(propagate=False)
+    async with session_factory() as session:
+        user = await user_repository.create(
+            session,
+            UserCreate(username="dave", email="dave@example.com", password="secret1"),
+        )
+    headers = {"Authorization": f"Bearer {create_access_token(str(user.id))}"}
+
+    assert (await client.get("/users/me")).status_code == 401
+    bad = {"Authorization": "Bearer not-a-token"}
+    assert (await client.get("/users/me", headers=bad)).status_code == 401
+
+    first = await client.get("/users/me", headers=headers)
+    assert first.status_code == 200 and first.json()["username"] == "dave"
+    second = await client.get("/users/me", headers=headers)
+    assert '"0 queries"' in second.headers["server-timing"]  # 命中缓存, 不查数据库
+
+    async with session_factory() as session:
+        await user_repository.update(session, user.id, UserUpdate(is_active=False))
+    assert (await client.get("/users/me", headers=headers)).status_code == 401
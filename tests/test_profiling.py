@@ -0,0 +1,35 @@
+import json
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from app.core.profiling import ProfilingMiddleware, profiling_available
+
+pytestmark = pytest.mark.skipif(
+    not profiling_available(), reason="pyinstrument not installed"
+)
+
+
+@pytest.mark.anyio
+async def test_profile_written_only_with_token(tmp_path):
+    app = FastAPI()
+    app.add_middleware(ProfilingMiddleware, directory=tmp_path, token="s3cret")
+
+    @app.get("/foods/{food_id}")
+    async def read(food_id: int):
+        return {"total": sum(range(100_000))}
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        assert (await client.get("/foods/1")).status_code == 200
+        assert not list(tmp_path.iterdir())
+
+        headers = {"X-Profile": "s3cret"}
+        assert (await client.get("/foods/1", headers=headers)).status_code == 200
+
+    [path] = tmp_path.iterdir()
+    assert "-GET-foods-food-id-" in path.name
+    assert path.name.endswith("ms.speedscope.json")
+    assert "speedscope" in json.loads(path.read_text())["$schema"]
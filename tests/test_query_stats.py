@@ -0,0 +1,84 @@
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import select, text
+from sqlalchemy.exc import OperationalError
+
+from app.core.query_stats import (
+    QueryBudgetExceeded,
+    QueryStatsMiddleware,
+    fingerprint,
+    query_budget,
+    track_queries,
+)
+from app.foods.model import Food
+
+
+def test_fingerprint_merges_literals_and_in_lists():
+    a = fingerprint("SELECT * FROM food WHERE id IN (?, ?, ?) AND name = 'x'")
+    b = fingerprint("SELECT *  FROM food\nWHERE id IN ($1, $2) AND name = 'yy'")
+    assert a == "SELECT * FROM food WHERE id IN (...) AND name = ?"
+    assert b == "SELECT * FROM food WHERE id IN (...) AND name = ?"
+
+
+@pytest.mark.anyio
+async def test_server_timing_header(client):
+    response = await client.get("/foods/")
+    assert response.status_code == 200
+    assert response.headers["server-timing"].endswith('desc="1 queries"')
+
+
+@pytest.fixture
+async def guarded_client(session_factory):
+    app = FastAPI()
+    app.add_middleware(QueryStatsMiddleware, n_plus_one_threshold=3, mode="raise")
+
+    @app.get("/loop/{n}")
+    async def loop(n: int):
+        async with session_factory() as session:
+            for i in range(n):
+                await session.execute(select(Food).where(Food.id == i))
+        return {"n": n}
+
+    @app.get("/budget")
+    @query_budget(1)
+    async def budget():
+        async with session_factory() as session:
+            await session.execute(select(Food))
+            await session.execute(select(Food.id))
+        return {}
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as ac:
+        yield ac
+
+
+@pytest.mark.anyio
+async def test_n_plus_one_and_budget_raise(guarded_client):
+    assert (await guarded_client.get("/loop/2")).status_code == 200
+    with pytest.raises(QueryBudgetExceeded, match="possible N\\+1, 3x"):
+        await guarded_client.get("/loop/3")
+    with pytest.raises(QueryBudgetExceeded, match="2 queries, budget 1"):
+        await guarded_client.get("/budget")
+
+
+@pytest.mark.anyio
+async def test_track_queries(session_factory):
+    with track_queries() as stats:
+        async with session_factory() as session:
+            await session.execute(select(Food))
+    assert stats.count == 1 and stats.duration > 0
+
+
+@pytest.mark.anyio
+async def test_failed_statement_is_not_counted(session_factory):
+    with track_queries() as stats:
+        async with session_factory() as session:
+            with pytest.raises(OperationalError):
+                await session.execute(text("SELECT * FROM no_such_table"))
+            await session.rollback()
+            await session.execute(select(Food))
+            # 出错语句的开始时间不残留在 (会被复用的) 连接上, 后续语句照常计时
+            assert not (await session.connection()).info.get("query_start")
+    assert stats.count == 1 and stats.duration > 0
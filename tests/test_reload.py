@@ -0,0 +1,134 @@
+import asyncio
+
+import pytest
+from sqlalchemy import text
+
+from app.core.cache import TTLCache
+from app.core.config import Settings, settings
+from app.core.database import DatabaseRegistry
+from app.users.principal import principal_cache
+
+
+def test_cache_reconfigure():
+    now = [0.0]
+    cache = TTLCache("test", maxsize=3, ttl=60, clock=lambda: now[0])
+    for key in range(3):
+        cache.set(key, key)
+
+    cache.reconfigure(maxsize=2, ttl=5)
+    assert 0 not in cache  # 超出新容量的最旧条目被淘汰
+    now[0] = 6
+    assert 1 not in cache and 2 not in cache  # 已有条目按新的 TTL 过期
+
+
+@pytest.mark.anyio
+async def test_registry_swaps_engine_and_drains_old(tmp_path):
+    config = Settings(db_type="sqlite", sqlite_db_path=str(tmp_path / "db.sqlite3"))
+    registry = DatabaseRegistry(config)
+    prepared = []
+
+    async def prepare(name, engine):
+        prepared.append(name)
+
+    try:
+        old = registry.engine("catalog")
+        in_flight = await old.connect()  # 切换时仍在使用旧连接池的请求
+
+        assert await registry.reload(config, prepare=prepare) == ["catalog"]
+        new = registry.engine("catalog")
+        assert new is not old and prepared == ["catalog"]
+        async with registry.session_factory("catalog")() as session:
+            assert session.bind is new
+
+        await in_flight.execute(text("SELECT 1"))  # 旧连接不受影响
+        await asyncio.sleep(0.1)
+        # 借出的连接归还前旧引擎不会释放，归还后才移除采集并释放
+        assert old.sync_engine._metrics_collector is not None
+        await in_flight.close()
+        await asyncio.sleep(0.1)
+        assert old.sync_engine._metrics_collector is None
+    finally:
+        await registry.dispose_all()
+
+
+@pytest.mark.anyio
+async def test_registry_reload_is_atomic(tmp_path):
+    config = Settings(db_type="sqlite", sqlite_db_path=str(tmp_path / "db.sqlite3"))
+    registry = DatabaseRegistry(config)
+    old = registry.engine()
+    interim = []
+
+    async def failing(name, engine):
+        interim.append(registry.session_factory().kw["bind"])  # 预热期间到达的请求
+        raise RuntimeError("warmup failed")
+
+    async def prepare(name, engine):
+        interim.append(registry.engine("catalog"))  # 预热期间首次使用的连接池
+
+    try:
+        with pytest.raises(RuntimeError):
+            await registry.reload(config, prepare=failing)
+        # 预热失败: 旧引擎继续服务, 新引擎的采集已移除
+        assert registry.engine() is old and interim == [old]
+        assert old.sync_engine._metrics_collector is not None
+
+        replaced = await registry.reload(config, prepare=prepare)
+        # 预热期间新建的引擎同样退役, 会话工厂与引擎一起切换
+        assert sorted(replaced) == ["catalog", "default"]
+        assert registry.engines().keys() == {"default"}
+        assert registry.session_factory().kw["bind"] is registry.engine()
+        await asyncio.sleep(0.1)
+        assert old.sync_engine._metrics_collector is None
+        assert interim[-1].sync_engine._metrics_collector is None
+    finally:
+        await registry.dispose_all()
+
+
+@pytest.mark.anyio
+async def test_admin_reload(client, monkeypatch):
+    monkeypatch.setattr(settings, "admin_token", "s3cret")
+    monkeypatch.setattr(settings, "principal_cache_ttl", settings.principal_cache_ttl)
+    monkeypatch.setattr(settings, "principal_cache_size", settings.principal_cache_size)
+    original = (principal_cache.maxsize, principal_cache.ttl)
+    headers = {"X-Admin-Token": "s3cret"}
+    try:
+        response = await client.post(
+            "/admin/reload", json={"principal_cache_ttl": 5}, headers=headers
+        )
+        assert response.status_code == 200
+        assert response.json()["changed"] == {"principal_cache_ttl": 5}
+        assert principal_cache.ttl == 5
+
+        response = await client.post(
+            "/admin/reload", json={"jwt_secret": "x"}, headers=headers
+        )
+        assert response.status_code == 400
+    finally:
+        principal_cache.reconfigure(maxsize=original[0], ttl=original[1])
+
+
+@pytest.mark.anyio
+async def test_failed_pool_rebuild_keeps_settings(client, monkeypatch):
+    from app.core import reload as reload_module
+
+    monkeypatch.setattr(settings, "admin_token", "s3cret")
+    monkeypatch.setattr(settings, "pool_timeout", settings.pool_timeout)
+    original = settings.pool_timeout
+    calls = []
+
+    async def failing(config, **kwargs):
+        calls.append(config.pool_timeout)
+        raise RuntimeError("warmup failed")
+
+    monkeypatch.setattr(reload_module.databases, "reload", failing)
+    headers = {"X-Admin-Token": "s3cret"}
+    body = {"pool_timeout": original + 7}
+
+    response = await client.post("/admin/reload", json=body, headers=headers)
+    assert response.status_code == 503
+    assert "warmup failed" in response.json()["detail"]
+    # 配置保持不变, 重试时仍能看到差异并再次重建
+    assert settings.pool_timeout == original
+    response = await client.post("/admin/reload", json=body, headers=headers)
+    assert response.status_code == 503
+    assert calls == [original + 7, original + 7]
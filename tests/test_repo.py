@@ -1,14 +1,32 @@
+import asyncio
+
 import pytest
 
-from app.profiles import repo
+from app.profiles.repository import ProfileRepository
 from app.profiles.schema import ProfileCreate
 
 
 @pytest.mark.anyio
 async def test_create_and_get(session_factory):
     async with session_factory() as session:
+        repo = ProfileRepository(session)
         p_in = ProfileCreate(name="alice", gender="female", variety="v1", birthday=None)
-        created = await repo.create(session, p_in)
+        created = await repo.create(p_in.model_dump())
         assert created.id is not None
-        got = await repo.get_by_name(session, "alice")
+        got = await repo.get_by_name("alice")
         assert got and got.id == created.id
+
+
+@pytest.mark.anyio
+async def test_timestamps_taken_per_row(session_factory):
+    async with session_factory() as session:
+        repo = ProfileRepository(session)
+        first = await repo.create(
+            ProfileCreate(name="ts-1", gender="male", variety="v1").model_dump()
+        )
+        await asyncio.sleep(0.01)
+        second = await repo.create(
+            ProfileCreate(name="ts-2", gender="male", variety="v1").model_dump()
+        )
+    # SQLite 下默认值由 Python 生成, 必须在插入时取值而不是导入时
+    assert second.created_at > first.created_at
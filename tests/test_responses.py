@@ -0,0 +1,36 @@
+import json
+from datetime import date, datetime, timezone
+
+import pytest
+
+from app.core import responses
+from app.profiles.schema import ProfileResponse
+from app.reminders.schema import ReminderResponse
+
+BACKENDS = [
+    b
+    for b, mod in (("orjson", responses.orjson), ("msgspec", responses.msgspec))
+    if mod is not None
+] + ["stdlib"]
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_json_backend_encodes_dates(backend):
+    due = datetime(2025, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+    content = {
+        "reminder": ReminderResponse(
+            id=1, title="喂食", type="feeding", due_date=due, profile_id=1
+        ).model_dump(),
+        "profile": ProfileResponse(
+            id=1, name="旺财", gender="male", variety="v", birthday=date(2020, 5, 1)
+        ).model_dump(),
+    }
+    body = responses.json_response_class(backend)(content).body
+    data = json.loads(body)
+    assert "旺财" in body.decode("utf-8")  # 非 ASCII 原样输出
+    assert datetime.fromisoformat(data["reminder"]["due_date"]) == due
+    assert data["profile"]["birthday"] == "2020-05-01"
+
+
+def test_create_app_uses_fast_response_class(app):
+    assert app.router.default_response_class.json_backend in BACKENDS
@@ -3,11 +3,12 @@ import pytest
 
 @pytest.mark.anyio
 async def test_create_and_read_profile(client):
-    payload = {"name": "bob", "gender": "male", "variety": "v2", "birthday": None}
-    r = await client.post("/profile/", json=payload)
+    # ProfileCreate 以 Depends() 注入，字段通过查询参数传递
+    payload = {"name": "bob", "gender": "male", "variety": "v2"}
+    r = await client.post("/profiles/", params=payload)
     assert r.status_code in (200, 201)
 
-    r2 = await client.get("/profile/bob")
+    r2 = await client.get("/profiles/bob")
     assert r2.status_code == 200
     data = r2.json()
     assert data["name"] == "bob"
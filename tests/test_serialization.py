@@ -0,0 +1,26 @@
+import pytest
+
+from app.foods.model import Food
+from app.foods.schema import FoodResponse, food_list_serializer
+
+
+def test_list_serializer_validates_orm_rows_once():
+    foods = [Food(id=i, name=f"f{i}", brand="b", price=1.0) for i in range(3)]
+    validated = food_list_serializer.validate(foods)
+    assert all(isinstance(f, FoodResponse) for f in validated)
+
+    response = food_list_serializer.response(validated)
+    assert response.media_type == "application/json"
+    assert response.body.startswith(b'[{"name":"f0"')
+
+
+@pytest.mark.anyio
+async def test_food_list_endpoint(client):
+    for name in ("kibble", "jerky"):
+        r = await client.post("/foods/", params={"name": name, "brand": "acme"})
+        assert r.status_code == 201
+        assert r.json()["name"] == name
+
+    r = await client.get("/foods/", params={"search": "kib", "limit": 500})
+    assert r.status_code == 200
+    assert [f["name"] for f in r.json()] == ["kibble"]
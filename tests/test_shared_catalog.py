@@ -0,0 +1,106 @@
+import asyncio
+import json
+
+import pytest
+
+from app.core import shared_table
+from app.core.query_stats import track_queries
+from app.core.shared_table import SharedTableReader, WriterLock, write_table
+from app.foods.catalog import FoodCatalog
+from app.foods.repository import FoodRepository
+from app.foods.schema import FoodCreate, FoodUpdate
+from app.foods.service import FoodService
+
+
+def test_shared_table_lookup_and_versioning(tmp_path):
+    path = tmp_path / "t.table"
+    reader = SharedTableReader(path)
+    assert reader.get(1) is None  # 尚未写出
+
+    with WriterLock(path):
+        write_table(path, [(3, "苹果", b'{"id":3}'), (1, "banana", b'{"id":1}')])
+    assert reader.get(1) == b'{"id":1}'
+    assert reader.get_by_key("苹果") == b'{"id":3}'
+    assert reader.get(2) is None and reader.get_by_key("cherry") is None
+    first = reader.generation
+
+    # 另一个读取方 (模拟其它 worker) 看到新版本, 已删除的记录不再可见
+    other = SharedTableReader(path)
+    with WriterLock(path):
+        write_table(path, [(1, "banana", b'{"id":1,"v":2}')])
+    assert other.get(1) == b'{"id":1,"v":2}'
+    assert reader.get_by_key("苹果") is None
+    assert reader.generation == first + 1
+    reader.close()
+    other.close()
+
+
+def test_reader_checks_stale_control_generation_once(tmp_path, monkeypatch):
+    path = tmp_path / "t.table"
+    reader = SharedTableReader(path)
+    with WriterLock(path):
+        write_table(path, [(1, "a", b"1")])
+    assert reader.get(1) == b"1"
+
+    # 写入方替换文件后、更新控制文件前退出 (这里反过来模拟: 控制文件领先于文件)
+    control = shared_table._open_control(path)
+    shared_table.GENERATION.pack_into(control, 0, reader.generation + 5)
+    control.close()
+    loads = []
+    load = reader._load
+    monkeypatch.setattr(reader, "_load", lambda: (loads.append(1), load()))
+    for _ in range(3):
+        assert reader.get(1) == b"1"
+    assert len(loads) == 1  # 每次控制 generation 变化只重新打开一次
+
+    path.unlink()  # 文件缺失时同样不会反复尝试
+    other = SharedTableReader(path)
+    other_load = other._load
+    monkeypatch.setattr(other, "_load", lambda: (loads.append(2), other_load()))
+    assert other.get(1) is None and other.get(1) is None
+    assert loads.count(2) == 1
+    reader.close()
+    other.close()
+
+
+async def _wait_ready(catalog: FoodCatalog) -> None:
+    for _ in range(200):
+        if catalog.ready:
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("catalog not ready")
+
+
+@pytest.mark.anyio
+async def test_food_catalog_serves_reads_and_follows_writes(tmp_path, session_factory):
+    catalog = FoodCatalog(
+        tmp_path / "foods.table", session_factory=session_factory, debounce=0
+    )
+    async with session_factory() as session:
+        service = FoodService(FoodRepository(session), catalog)
+        assert catalog.get_by_name("catalog-kibble") is None  # 未启动时总是查数据库
+        await catalog.start()
+        try:
+            await _wait_ready(catalog)
+            food = await service.create_food(
+                FoodCreate(name="catalog-kibble", brand="acme", price=9.5)
+            )
+            assert not catalog.ready  # 重建完成前本 worker 不读共享表
+            await _wait_ready(catalog)
+
+            with track_queries() as stats:
+                body = await service.get_food_json_by_name("catalog-kibble")
+                by_id = await service.get_food_by_id(food.id)
+            assert stats.count == 0
+            assert json.loads(body)["price"] == 9.5
+            assert by_id == food
+
+            await service.update_food(food.id, FoodUpdate(price=7.0))
+            await _wait_ready(catalog)
+            assert json.loads(catalog.get(food.id))["price"] == 7.0
+
+            await service.delete_food(food.id)
+            await _wait_ready(catalog)
+            assert catalog.get_by_name("catalog-kibble") is None
+        finally:
+            await catalog.stop()
@@ -0,0 +1,55 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from app.core.shutdown import ShutdownManager, ShutdownMiddleware
+
+
+@pytest.mark.anyio
+async def test_drains_in_flight_before_callbacks():
+    manager = ShutdownManager()
+    release = asyncio.Event()
+    calls = []
+    app = FastAPI()
+    app.add_middleware(ShutdownMiddleware, manager=manager)
+
+    @app.get("/slow")
+    async def slow():
+        await release.wait()
+        calls.append("request")
+        return {}
+
+    async def dispose():
+        calls.append("dispose")
+
+    manager.on_shutdown(dispose)
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        first = asyncio.create_task(client.get("/slow"))
+        await asyncio.sleep(0.05)
+
+        stopping = asyncio.create_task(manager.shutdown(timeout=5))
+        await asyncio.sleep(0)
+        rejected = await client.get("/slow")
+        assert rejected.status_code == 503
+        assert rejected.headers["connection"] == "close"
+
+        release.set()
+        assert (await first).status_code == 200
+        await stopping
+        await manager.shutdown(timeout=5)  # 重复调用不会再次释放
+
+    assert calls == ["request", "dispose"]
+
+
+@pytest.mark.anyio
+async def test_budget_cancels_background_tasks():
+    manager = ShutdownManager()
+    job = manager.track(asyncio.create_task(asyncio.sleep(10)))
+    manager.request_started()  # 一个永远不结束的请求
+
+    await asyncio.wait_for(manager.shutdown(timeout=0.05), 1)
+    assert job.cancelled()
@@ -0,0 +1,38 @@
+import pytest
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.core.query_stats import track_queries
+from app.core.slow_query import SlowQueryLog
+from app.foods.model import Food
+
+
+@pytest.mark.anyio
+async def test_slow_queries_aggregated_with_plan(session_factory):
+    log = SlowQueryLog(threshold_ms=0, explain_sample_rate=1)
+    log.install()
+    try:
+        with track_queries() as stats:
+            async with session_factory() as session:
+                for name in ("a", "b", "c"):
+                    await session.execute(select(Food).where(Food.name == name))
+            await log.wait_explains()
+    finally:
+        log.uninstall()
+    assert stats.count == 3  # 后台 EXPLAIN 不计入触发请求的统计
+
+    [entry] = [q for q in log.top() if "FROM food WHERE food.name" in q["fingerprint"]]
+    assert entry["count"] == 3
+    assert entry["p95_ms"] <= entry["max_ms"]
+    assert any("food" in line for line in entry["plan"])  # EXPLAIN QUERY PLAN 输出
+
+
+@pytest.mark.anyio
+async def test_admin_slow_queries_requires_token(client, monkeypatch):
+    monkeypatch.setattr(settings, "admin_token", "s3cret")
+    assert (await client.get("/admin/slow-queries")).status_code == 403
+    response = await client.get(
+        "/admin/slow-queries", headers={"X-Admin-Token": "s3cret"}
+    )
+    assert response.status_code == 200
+    assert "queries" in response.json()
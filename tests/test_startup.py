@@ -0,0 +1,45 @@
+import pytest
+
+from app.core.routers import discover, include_pending
+from app.main import create_app
+from benchmarks.importtime import measure
+
+
+def _paths(app) -> set[str]:
+    return {getattr(route, "path", "") for route in app.routes}
+
+
+def test_discover_finds_domain_routers():
+    packages = [spec.package for spec in discover()]
+    assert packages == [
+        "foods",
+        "profiles",
+        "reminders",
+        "users",
+    ]  # auth 尚无 router.py
+
+
+def test_lazy_routers_mounted_on_demand():
+    app = create_app()
+    assert "/foods/" not in _paths(app)
+    include_pending(app)
+    mounted = len(app.routes)
+    include_pending(app)  # 重复调用不会重复挂载
+    assert len(app.routes) == mounted
+    assert {"/foods/", "/profiles/", "/reminders/", "/users/me"} <= _paths(app)
+
+
+@pytest.mark.anyio
+async def test_first_request_mounts_routers(client):
+    r = await client.get("/openapi.json")
+    assert r.status_code == 200
+    assert "/foods/" in r.json()["paths"]
+
+
+def test_import_does_not_load_domain_routers():
+    code = (
+        "import sys, app.main\n"
+        "loaded = [m for m in sys.modules if m.endswith('.router')]\n"
+        "assert not loaded, loaded"
+    )
+    measure(code, {"LAZY_ROUTERS": "true"})
@@ -0,0 +1,41 @@
+import pytest
+from sqlalchemy import text
+
+from app.core.config import Settings
+from app.core.database import DatabaseRegistry
+from app.core.warmup import warm_pool
+
+
+@pytest.mark.anyio
+async def test_warm_pool_opens_connections_and_runs_queries(tmp_path):
+    registry = DatabaseRegistry(
+        Settings(db_type="sqlite", sqlite_db_path=str(tmp_path / "db.sqlite3"))
+    )
+    seen = []
+
+    async def hot_query(session):
+        seen.append((await session.execute(text("SELECT 1"))).scalar())
+
+    async def broken_query(session):
+        raise RuntimeError("table missing")
+
+    try:
+        warmed = await warm_pool(
+            registry, "catalog", connections=3, queries=[hot_query, broken_query]
+        )
+        assert warmed == 3
+        assert seen == [1, 1, 1]  # 每个连接执行一次
+        assert registry.engine("catalog").pool.checkedin() == 3
+    finally:
+        await registry.dispose_all()
+
+
+@pytest.mark.anyio
+async def test_readyz_after_warmup(app, client):
+    assert (await client.get("/healthz")).status_code == 200
+    response = await client.get("/readyz")
+    assert response.status_code == 503
+    assert response.json()["status"] == "warming_up"
+
+    app.state.warmed_up = True
+    assert (await client.get("/readyz")).json() == {"status": "ready"}
@@ -0,0 +1,31 @@
+import asyncio
+import time
+
+import pytest
+
+from app.core.metrics import EVENT_LOOP_BLOCKS
+from app.core.watchdog import EventLoopBlocked, LoopWatchdog
+
+
+def blocking_call():
+    time.sleep(0.2)  # 模拟在事件循环中执行的同步调用
+
+
+@pytest.mark.anyio
+async def test_blocking_call_captured_and_raised():
+    watchdog = LoopWatchdog(threshold_ms=50, interval=0.01, raise_on_block=True)
+    before = EVENT_LOOP_BLOCKS._values.get((), 0)
+    with pytest.raises(EventLoopBlocked, match="blocking_call"):
+        async with watchdog:
+            await asyncio.sleep(0.05)
+            blocking_call()
+            await asyncio.sleep(0.05)
+    # 计数由事件循环线程在阻塞结束后执行
+    assert EVENT_LOOP_BLOCKS._values[()] == before + 1
+
+
+@pytest.mark.anyio
+async def test_non_blocking_code_passes():
+    async with LoopWatchdog(threshold_ms=50, interval=0.01, raise_on_block=True) as w:
+        await asyncio.to_thread(blocking_call)
+    assert not w.stalls